@@ -0,0 +1,55 @@
+"""Compares the speed of the direct and FFT similarity methods.
+
+Run with ``python benchmarks/bench_similarity.py`` from the project's folder. The
+direct method's cost grows with the base size while the FFT method's does not, so for
+each history length the smallest base size for which the FFT method is faster is
+printed. ``AUTO_FFT_WINDOW_SIZE`` in ``marketmaster.similarity`` is based on this.
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marketmaster.similarity import cosine_similarities  # noqa: E402
+
+
+LENGTHS = (1_000, 5_000, 10_000, 25_000, 100_000, 1_000_000)
+WINDOW_SIZES = (8, 16, 24, 32, 48, 63, 126, 252)
+
+
+def get_random_walk(length: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+
+
+def time_method(close: np.ndarray, window_size: int, method: str) -> float:
+    """Returns the best time in seconds of several runs."""
+    base = close[-window_size:]
+    timer = timeit.Timer(lambda: cosine_similarities(close, base, method=method))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number
+
+
+def main() -> None:
+    print(f"{'length':>10} {'window':>7} {'direct ms':>10} {'fft ms':>10} faster")
+    for length in LENGTHS:
+        close = get_random_walk(length)
+        crossover = None
+        for window_size in WINDOW_SIZES:
+            direct = time_method(close, window_size, "direct")
+            fft = time_method(close, window_size, "fft")
+            faster = "fft" if fft < direct else "direct"
+            if faster == "fft" and crossover is None:
+                crossover = window_size
+            print(
+                f"{length:>10} {window_size:>7} {direct * 1000:>10.2f}"
+                f" {fft * 1000:>10.2f} {faster}"
+            )
+        print(f"length {length}: fft is faster from window size {crossover}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Measures how long the app takes to start.
+
+Run with ``python benchmarks/bench_startup.py`` from the project's folder. Each run
+starts a new Python process so that nothing is imported already, and reports:
+
+* how long importing ``marketmaster.app`` takes, and
+* how long it takes until the start menu is first painted, including the imports.
+
+The medians of the runs are printed. If ``--max-import-ms`` or ``--max-paint-ms`` is
+given and the median is slower, or if a module that only the graph menu needs was
+imported before the first paint, the exit code is 1.
+
+Set ``QT_QPA_PLATFORM=offscreen`` to run without a display.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+SRC_PATH = Path(__file__).parent.parent / "src"
+
+# Modules that only the graph menu needs. None of them should be imported before
+# the start menu is painted.
+GRAPH_MENU_MODULES = ("FinanceDataReader", "matplotlib", "pandas", "pyqtgraph")
+
+CHILD_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import marketmaster.app  # noqa: F401
+
+imported = time.perf_counter()
+from marketmaster.main_window import MainWindow
+from PySide6 import QtCore
+from PySide6 import QtWidgets
+
+QtCore.QCoreApplication.setOrganizationName("MarketMasterBenchmark")
+app = QtWidgets.QApplication(sys.argv)
+result = {}
+
+
+class PaintFilter(QtCore.QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QtCore.QEvent.Paint and not result:
+            result["import_ms"] = (imported - start) * 1000
+            result["paint_ms"] = (time.perf_counter() - start) * 1000
+            result["loaded"] = [m for m in %r if m in sys.modules]
+            QtCore.QTimer.singleShot(0, app.quit)
+        return False
+
+
+paint_filter = PaintFilter()
+app.installEventFilter(paint_filter)
+main_window = MainWindow()
+app.exec()
+print(json.dumps(result))
+"""
+
+
+def measure() -> dict:
+    env = dict(os.environ, PYTHONPATH=str(SRC_PATH))
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT % (GRAPH_MENU_MODULES,)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-paint-ms", type=float)
+    args = parser.parse_args()
+
+    results = [measure() for _ in range(args.runs)]
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    paint_ms = statistics.median(r["paint_ms"] for r in results)
+    loaded = sorted({m for r in results for m in r["loaded"]})
+    print(f"import marketmaster.app: {import_ms:.0f} ms")
+    print(f"first paint:             {paint_ms:.0f} ms")
+    print(f"graph menu modules loaded before the first paint: {loaded or 'none'}")
+
+    failed = bool(loaded)
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failed = True
+    if args.max_paint_ms is not None and paint_ms > args.max_paint_ms:
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
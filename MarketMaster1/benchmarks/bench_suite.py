@@ -0,0 +1,316 @@
+"""Times the app's hot paths and compares the times with a saved run.
+
+Run with ``python benchmarks/bench_suite.py`` from the project's folder. Every
+benchmark uses deterministic synthetic data, so no network access is needed and two
+runs with the same options measure the same work.
+
+To catch performance regressions, save a run before a change and compare after it:
+
+    python benchmarks/bench_suite.py --save before.json
+    python benchmarks/bench_suite.py --compare before.json
+
+When comparing, the exit code is 1 if any benchmark is slower than the saved run by
+more than ``--threshold`` (a fraction, 0.2 by default). ``-k`` runs only the
+benchmarks whose names contain the given text, and ``--length`` sets the length of
+the synthetic price histories.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from marketmaster.backtest import backtest  # noqa: E402
+from marketmaster.common import get_number_suffix  # noqa: E402
+from marketmaster.common import round_  # noqa: E402
+from marketmaster.common import round_array  # noqa: E402
+from marketmaster.downsampling import downsample  # noqa: E402
+from marketmaster.price_store import PriceHistory  # noqa: E402
+from marketmaster.similarity import cosine_similarities  # noqa: E402
+from marketmaster.similarity import find_analogs  # noqa: E402
+from marketmaster.similarity import find_top_matches  # noqa: E402
+from marketmaster.similarity import IncrementalScores  # noqa: E402
+
+
+WINDOW_SIZE = 63
+PREDICTION_DAYS = 5
+K = 10
+# The number of inputs per call of each formatting and validation benchmark.
+BATCH_SIZE = 1000
+
+# Each benchmark takes the options and returns the function to time, so that its
+# setup is not timed.
+BENCHMARKS: dict[str, Callable[[argparse.Namespace], Callable[[], object]]] = {}
+
+_application = None
+
+
+def benchmark(name: str):
+    def decorator(setup: Callable[[argparse.Namespace], Callable[[], object]]):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def get_random_walk(length: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+
+
+@benchmark("similarity.direct")
+def similarity_direct(options: argparse.Namespace) -> Callable[[], object]:
+    close = get_random_walk(options.length, options.seed)
+    base = close[-WINDOW_SIZE:]
+    return lambda: cosine_similarities(close, base, method="direct")
+
+
+@benchmark("similarity.fft")
+def similarity_fft(options: argparse.Namespace) -> Callable[[], object]:
+    close = get_random_walk(options.length, options.seed)
+    base = close[-WINDOW_SIZE:]
+    return lambda: cosine_similarities(close, base, method="fft")
+
+
+@benchmark("similarity.incremental")
+def similarity_incremental(options: argparse.Namespace) -> Callable[[], object]:
+    """Updates the scores for a new last price, as after a day's close."""
+    close = get_random_walk(options.length, options.seed)
+    revised = close.copy()
+    revised[-1] *= 1.01
+    incremental = IncrementalScores(close, WINDOW_SIZE)
+    histories = itertools.cycle([revised, close])
+    return lambda: incremental.update(next(histories))
+
+
+@benchmark("similarity.find_analogs")
+def similarity_find_analogs(options: argparse.Namespace) -> Callable[[], object]:
+    close = get_random_walk(options.length, options.seed)
+    return lambda: find_analogs(close, WINDOW_SIZE, PREDICTION_DAYS, K)
+
+
+@benchmark("top_k.find_top_matches")
+def top_k_find_top_matches(options: argparse.Namespace) -> Callable[[], object]:
+    close = get_random_walk(options.length, options.seed)
+    scores = cosine_similarities(close, close[-WINDOW_SIZE:])
+    return lambda: find_top_matches(scores, K, WINDOW_SIZE)
+
+
+@benchmark("backtest.backtest")
+def backtest_backtest(options: argparse.Namespace) -> Callable[[], object]:
+    close = get_random_walk(options.length, options.seed)
+    return lambda: backtest(close, PREDICTION_DAYS, 1, WINDOW_SIZE)
+
+
+# The number of points each downsampling benchmark keeps, about a plot's width.
+PLOT_WIDTH = 1000
+
+
+@benchmark("downsampling.minmax")
+def downsampling_minmax(options: argparse.Namespace) -> Callable[[], object]:
+    close = get_random_walk(options.length, options.seed)
+    return lambda: downsample(close, 0, len(close), PLOT_WIDTH, "minmax")
+
+
+@benchmark("downsampling.lttb")
+def downsampling_lttb(options: argparse.Namespace) -> Callable[[], object]:
+    close = get_random_walk(options.length, options.seed)
+    return lambda: downsample(close, 0, len(close), PLOT_WIDTH, "lttb")
+
+
+@benchmark("price_store.to_frame")
+def price_store_to_frame(options: argparse.Namespace) -> Callable[[], object]:
+    """Rebuilds the DataFrame a worker reads from a history kept in memory."""
+    close = get_random_walk(options.length, options.seed)
+    index = pd.bdate_range("1990-01-01", periods=len(close), name="Date")
+    data = pd.DataFrame(
+        {
+            "Open": close,
+            "High": close,
+            "Low": close,
+            "Close": close,
+            "Adj Close": close,
+            "Volume": np.arange(len(close)),
+        },
+        index=index,
+    )
+    history = PriceHistory.from_frame(data)
+    return history.to_frame
+
+
+def get_numbers(seed: int) -> list[str]:
+    """Returns prices, volumes, and halfway cases like those the info panel shows."""
+    rng = np.random.default_rng(seed)
+    prices = [f"{x:.4f}" for x in rng.uniform(0, 5000, BATCH_SIZE // 2)]
+    volumes = [str(x) for x in rng.integers(0, 10**14, BATCH_SIZE // 2)]
+    return prices + volumes
+
+
+@benchmark("common.round_")
+def common_round(options: argparse.Namespace) -> Callable[[], object]:
+    numbers = get_numbers(options.seed)
+    return lambda: [round_(number) for number in numbers]
+
+
+@benchmark("common.round_array")
+def common_round_array(options: argparse.Namespace) -> Callable[[], object]:
+    numbers = np.array(get_numbers(options.seed), dtype=np.float64)
+    return lambda: round_array(numbers)
+
+
+@benchmark("common.get_number_suffix")
+def common_get_number_suffix(options: argparse.Namespace) -> Callable[[], object]:
+    rng = np.random.default_rng(options.seed)
+    numbers = [str(x) for x in rng.integers(0, 10**15, BATCH_SIZE)]
+    return lambda: [get_number_suffix(number) for number in numbers]
+
+
+def get_symbol_inputs(seed: int) -> list[str]:
+    """Returns a mix of symbols, prefixes of symbols, and invalid text."""
+    from marketmaster.symbol_index import get_symbol_index
+
+    rng = np.random.default_rng(seed)
+    symbols = get_symbol_index().symbols
+    inputs = []
+    for i in rng.integers(0, len(symbols), BATCH_SIZE):
+        symbol = symbols[i]
+        kind = len(inputs) % 3
+        if kind == 0:
+            inputs.append(symbol)
+        elif kind == 1:
+            inputs.append(symbol[: max(1, len(symbol) // 2)].lower())
+        else:
+            inputs.append(symbol + "Q9")
+    return inputs
+
+
+def start_application() -> None:
+    """Creates the QApplication that widgets need, if it does not exist yet."""
+    global _application
+    from PySide6 import QtWidgets
+
+    # The line edit is never shown, so no display is needed.
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if QtWidgets.QApplication.instance() is None:
+        _application = QtWidgets.QApplication([])
+
+
+@benchmark("symbols.validate")
+def symbols_validate(options: argparse.Namespace) -> Callable[[], object]:
+    from marketmaster.symbol_index import get_symbol_index
+    from marketmaster.symbol_line_edit import SymbolValidator
+
+    inputs = get_symbol_inputs(options.seed)
+    validator = SymbolValidator(get_symbol_index())
+    return lambda: [validator.validate(text, len(text)) for text in inputs]
+
+
+@benchmark("symbols.line_edit")
+def symbols_line_edit(options: argparse.Namespace) -> Callable[[], object]:
+    from marketmaster.symbol_line_edit import SymbolLineEdit
+    from PySide6 import QtCore
+    from PySide6 import QtGui
+    from PySide6 import QtWidgets
+
+    start_application()
+    inputs = get_symbol_inputs(options.seed)
+    line_edit = SymbolLineEdit()
+
+    def press(key: int, text: str = "", modifiers=QtCore.Qt.NoModifier) -> None:
+        event = QtGui.QKeyEvent(QtCore.QEvent.KeyPress, key, modifiers, text)
+        QtWidgets.QApplication.sendEvent(line_edit, event)
+
+    # Each input is typed one key at a time, as a user types it, so the validator
+    # runs on every prefix. (Key events are also used rather than setText because
+    # some PySide6 versions leak a reference to None on every call of setText.)
+    def run() -> None:
+        for text in inputs:
+            for character in text:
+                press(0, character)
+            line_edit.has_valid_input()
+            press(QtCore.Qt.Key_A, modifiers=QtCore.Qt.ControlModifier)
+            press(QtCore.Qt.Key_Backspace)
+
+    return run
+
+
+def time_benchmark(function: Callable[[], object]) -> float:
+    """Returns the best time in seconds of several runs."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Prints each benchmark's change and returns whether any regressed."""
+    for key in ("length", "seed"):
+        if results["options"][key] != baseline["options"][key]:
+            print(f"warning: the saved run used a different --{key}")
+    regressed = False
+    print(f"{'benchmark':<28} {'saved ms':>10} {'now ms':>10} {'change':>8}")
+    for name, seconds in results["times"].items():
+        saved = baseline["times"].get(name)
+        if saved is None:
+            print(f"{name:<28} {'':>10} {seconds * 1000:>10.3f}      new")
+            continue
+        change = seconds / saved - 1
+        flag = ""
+        if change > threshold:
+            flag = " SLOWER"
+            regressed = True
+        print(
+            f"{name:<28} {saved * 1000:>10.3f} {seconds * 1000:>10.3f}"
+            f" {change:>+8.1%}{flag}"
+        )
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-k", dest="filter", default="")
+    parser.add_argument("--save", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    options = parser.parse_args()
+
+    times = {}
+    for name, setup in BENCHMARKS.items():
+        if options.filter in name:
+            times[name] = time_benchmark(setup(options))
+            if options.compare is None:
+                print(f"{name:<28} {times[name] * 1000:>10.3f} ms")
+    results = {
+        "options": {"length": options.length, "seed": options.seed},
+        "environment": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "times": times,
+    }
+    if options.save is not None:
+        with open(options.save, "w", encoding="utf8") as file:
+            json.dump(results, file, indent=4)
+    if options.compare is not None:
+        with open(options.compare, "r", encoding="utf8") as file:
+            baseline = json.load(file)
+        return 1 if compare(results, baseline, options.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
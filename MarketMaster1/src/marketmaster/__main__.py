@@ -1,4 +1,14 @@
-from marketmaster.app import main
+import sys
 
 if __name__ == "__main__":
-    main()
+    # A first argument that is not an option, such as "scan" or "download", is a
+    # command. Options starting with "-" are left for Qt. The command-line interface
+    # does not import the GUI, and reports unknown commands itself.
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+        from marketmaster.cli import main as cli_main
+
+        sys.exit(cli_main(sys.argv[1:]))
+    else:
+        from marketmaster.app import main
+
+        main()
@@ -0,0 +1,149 @@
+"""Walk-forward backtests of the analog forecast.
+
+At each tested date, the forecast is made again using only the prices up to that
+date, and its predictions for the following days are compared with what happened.
+
+Searching the whole history again for every date would repeat most of the work, so
+every window's minimum, maximum, and length are computed once with rolling
+statistics, and the windows ending on a block of dates are scored against all the
+earlier windows with one matrix product. Each date's scores are the same as
+``cosine_similarities`` would give for the prices up to that date.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from marketmaster.similarity import find_top_matches
+from marketmaster.similarity import get_analog_returns
+from marketmaster.similarity import rolling_min
+from numpy.lib.stride_tricks import sliding_window_view
+
+# The number of dates scored per matrix product. Larger blocks are faster but need
+# more temporary memory (BLOCK_SIZE floats per price).
+BLOCK_SIZE = 256
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    """The predicted and actual returns of every tested date.
+
+    Row i of ``predicted_returns`` and ``actual_returns`` is for ``dates[i]``, and
+    column h is for ``h + 1`` days after that date. Returns are fractions of the
+    date's closing price.
+    """
+
+    dates: list[str]
+    predicted_returns: np.ndarray
+    actual_returns: np.ndarray
+
+    @property
+    def horizons(self) -> np.ndarray:
+        return np.arange(1, self.predicted_returns.shape[1] + 1)
+
+    @property
+    def hit_rate(self) -> np.ndarray:
+        """The fraction of dates whose predicted direction was right, by horizon."""
+        hits = np.sign(self.predicted_returns) == np.sign(self.actual_returns)
+        return hits.mean(axis=0)
+
+    @property
+    def up_rate(self) -> np.ndarray:
+        """The fraction of dates with a rise, by horizon.
+
+        This is the hit rate of always predicting a rise, which the forecast's hit
+        rate must beat to be better than a guess.
+        """
+        return (self.actual_returns > 0).mean(axis=0)
+
+    @property
+    def mean_absolute_error(self) -> np.ndarray:
+        """The mean absolute difference of the predicted and actual returns."""
+        return np.abs(self.predicted_returns - self.actual_returns).mean(axis=0)
+
+
+def backtest(
+    close: "np.ndarray | pd.Series",
+    prediction_days: int,
+    analog_count: int = 1,
+    window_size: int = 63,
+    min_history: int = 500,
+    step: int = 1,
+) -> BacktestResult:
+    """Forecasts every ``step``-th date with the prices up to it.
+
+    The base pattern is the last ``window_size`` prices up to each date, about the
+    90 calendar days that the app uses. Like ``compute_forecast``, one analog is
+    found with ``find_best_match``, and several with ``find_analogs`` and their
+    returns after their windows combined into their median, like the command-line
+    interface's records. Only analogs whose continuations end before
+    the tested date are used, so no prediction sees a later price.
+
+    The first tested date is the one with ``min_history`` prices up to it, and the
+    last is the one followed by ``prediction_days`` more prices. ``close`` can be a
+    Series of closing prices indexed by date, or an array.
+    """
+    dates = close.index if isinstance(close, pd.Series) else None
+    close = np.asarray(close, dtype=np.float64)
+    length = len(close)
+    days = prediction_days
+    # Each date's windows are searched like a history ending on that date would
+    # be: with one analog, the windows that end at least ``days + 1`` prices before
+    # it, and with several, the windows whose continuations end before the base.
+    if analog_count == 1:
+        first_excluded = window_size + days
+    else:
+        first_excluded = 2 * window_size + days - 2
+    first = max(min_history - 1, first_excluded + 1)
+    tested = np.arange(first, length - days, step)
+    if not len(tested):
+        raise ValueError("The price history is too short to backtest.")
+
+    mins = rolling_min(close, window_size)
+    # Cosine similarity ignores scale, so each window only needs to be shifted by
+    # its minimum to be compared with a normalized base.
+    shifted = sliding_window_view(close, window_size) - mins[:, np.newaxis]
+    lengths = np.sqrt(np.einsum("ij,ij->i", shifted, shifted))
+    offsets = np.arange(window_size + days)
+
+    predicted = np.empty((len(tested), days))
+    for block_start in range(0, len(tested), BLOCK_SIZE):
+        block = tested[block_start : block_start + BLOCK_SIZE]  # noqa: E203
+        bases = block - window_size + 1
+        counts = block - first_excluded
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = (shifted[bases] @ shifted[: counts[-1]].T) / (
+                lengths[bases, np.newaxis] * lengths[: counts[-1]]
+            )
+        scores[np.arange(counts[-1]) >= counts[:, np.newaxis]] = np.nan
+        scores = np.nan_to_num(scores, nan=-np.inf)
+        # Each analog's returns are relative to the last price of its window, as
+        # in ``compute_forecast``.
+        if analog_count == 1:
+            paths = close[np.argmax(scores, axis=1)[:, np.newaxis] + offsets]
+            last = paths[:, window_size - 1, np.newaxis]
+            returns = paths[:, window_size:] / last - 1
+        else:
+            returns = np.array(
+                [
+                    np.median(
+                        get_analog_returns(
+                            close,
+                            find_top_matches(row, analog_count, window_size),
+                            window_size,
+                            days,
+                        ),
+                        axis=0,
+                    )
+                    for row in scores
+                ]
+            )
+        predicted[block_start : block_start + len(block)] = returns  # noqa: E203
+
+    actual = close[tested[:, np.newaxis] + np.arange(1, days + 1)]
+    actual = actual / close[tested, np.newaxis] - 1
+    if dates is None:
+        date_strings = [str(i) for i in tested]
+    else:
+        date_strings = [str(dates[i]).split(" ")[0] for i in tested]
+    return BacktestResult(date_strings, predicted, actual)
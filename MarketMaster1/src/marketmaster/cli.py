@@ -0,0 +1,366 @@
+"""The command-line interface, for running forecasts without a display.
+
+Run ``python -m marketmaster scan --help``, ``python -m marketmaster backtest
+--help``, or ``python -m marketmaster download --help`` for their options. For
+example, to forecast the next 10 days of every S&P 500 symbol with 4 processes:
+
+    python -m marketmaster scan --universe --days 10 --workers 4 -o scan.jsonl
+
+One record is written per symbol as soon as its forecast finishes, so the output can
+be read while the scan runs and memory use does not grow with the number of symbols.
+
+To bring the cached prices of every S&P 500 symbol up to date first, 16 at a time:
+
+    python -m marketmaster download --universe --concurrency 16
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from pathlib import Path
+from typing import Iterable
+from typing import Iterator
+from typing import TextIO
+
+import pandas as pd
+from marketmaster.backtest import backtest
+from marketmaster.data_providers import DataProvider
+from marketmaster.data_providers import FinanceDataReaderProvider
+from marketmaster.data_providers import get_configured_provider
+from marketmaster.data_providers import get_provider
+from marketmaster.forecast import get_record
+from marketmaster.listing import download_symbol_names
+from marketmaster.listing import is_stale
+from marketmaster.listing import read_symbol_names
+from marketmaster.price_cache import PriceCache
+
+FIELDS = (
+    "symbol",
+    "date",
+    "close",
+    "prediction_days",
+    "analog_count",
+    "predicted_close",
+    "predicted_return",
+    "low_close",
+    "high_close",
+    "error",
+)
+
+# Each process has its own price cache, created by the pool's initializer.
+_price_cache: PriceCache | None = None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m marketmaster",
+        description="Stock predictions made with cosine similarity.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    scan_parser = subparsers.add_parser(
+        "scan", help="forecast many symbols and write one record per symbol"
+    )
+    _add_symbol_arguments(scan_parser, "forecast")
+    scan_parser.add_argument("--days", type=int, default=5, help="days to predict")
+    scan_parser.add_argument(
+        "--analogs", type=int, default=1, help="the number of analogs to combine"
+    )
+    scan_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="the number of processes (default: one per CPU)",
+    )
+    scan_parser.add_argument(
+        "--format",
+        choices=("jsonl", "csv"),
+        help="the output format (default: from the output file's extension, or jsonl)",
+    )
+    scan_parser.add_argument(
+        "-o", "--output", type=Path, help="the output file (default: stdout)"
+    )
+    _add_data_arguments(scan_parser)
+    backtest_parser = subparsers.add_parser(
+        "backtest",
+        help="forecast every past date of a symbol and report how often the"
+        " forecast was right",
+    )
+    backtest_parser.add_argument("symbol", help="the symbol to backtest")
+    backtest_parser.add_argument("--days", type=int, default=5, help="days to predict")
+    backtest_parser.add_argument(
+        "--analogs", type=int, default=1, help="the number of analogs to combine"
+    )
+    backtest_parser.add_argument(
+        "--window", type=int, default=63, help="the base pattern's number of prices"
+    )
+    backtest_parser.add_argument(
+        "--min-history",
+        type=int,
+        default=500,
+        help="the number of prices before the first tested date",
+    )
+    backtest_parser.add_argument(
+        "--step", type=int, default=1, help="test every STEP-th date"
+    )
+    backtest_parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="a CSV file for every tested date's predicted and actual returns",
+    )
+    _add_data_arguments(backtest_parser)
+    download_parser = subparsers.add_parser(
+        "download",
+        help="bring the cached prices of many symbols up to date, several at once",
+    )
+    _add_symbol_arguments(download_parser, "download")
+    download_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="the number of symbols downloaded at once (default: 8)",
+    )
+    _add_data_arguments(download_parser)
+    args = parser.parse_args(argv)
+
+    set_application_names()
+    try:
+        if args.provider is None:
+            provider = get_configured_provider()
+        else:
+            provider = get_provider(args.provider)
+    except ValueError as e:
+        parser.error(str(e))
+    cache_directory = provider.get_cache_directory(
+        args.cache_dir or get_default_cache_directory()
+    )
+    if args.command == "backtest":
+        return run_backtest(
+            args, PriceCache(cache_directory / "prices", provider.fetch)
+        )
+
+    symbols = list(args.symbols)
+    if args.symbols_file is not None:
+        symbols += read_symbols_file(args.symbols_file)
+    if args.universe:
+        symbols += list(get_universe(cache_directory, provider))
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    if not symbols:
+        parser.error("no symbols were given")
+    if args.command == "download":
+        return download(
+            symbols,
+            PriceCache(cache_directory / "prices", provider.fetch),
+            args.concurrency,
+        )
+
+    format_ = args.format
+    if format_ is None:
+        is_csv = args.output is not None and args.output.suffix == ".csv"
+        format_ = "csv" if is_csv else "jsonl"
+    records = scan(
+        symbols,
+        args.days,
+        args.analogs,
+        cache_directory / "prices",
+        args.workers,
+        provider,
+    )
+    if args.output is None:
+        failures = write_records(records, sys.stdout, format_)
+    else:
+        with open(args.output, "w", encoding="utf8", newline="") as file:
+            failures = write_records(records, file, format_)
+    return 1 if failures == len(symbols) else 0
+
+
+def _add_symbol_arguments(parser: argparse.ArgumentParser, verb: str) -> None:
+    parser.add_argument("symbols", nargs="*", help=f"the symbols to {verb}")
+    parser.add_argument(
+        "--universe",
+        action="store_true",
+        help=f"also {verb} every S&P 500 symbol",
+    )
+    parser.add_argument(
+        "--symbols-file",
+        type=Path,
+        help=f"a file of symbols to {verb}, one per line",
+    )
+
+
+def _add_data_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="the folder of cached prices (default: the app's cache)",
+    )
+    parser.add_argument(
+        "--provider",
+        help="where to get prices: financedatareader, local:FOLDER, http(s)://URL,"
+        " or synthetic[:SEED] (default: $MARKETMASTER_DATA_PROVIDER or the app's"
+        " setting)",
+    )
+
+
+def run_backtest(args: argparse.Namespace, price_cache: PriceCache) -> int:
+    """Backtests one symbol and prints its hit rates and errors by horizon."""
+    symbol = args.symbol.upper()
+    try:
+        close = price_cache.read(symbol)["Close"]
+        result = backtest(
+            close, args.days, args.analogs, args.window, args.min_history, args.step
+        )
+    except Exception as e:
+        print(f"{symbol}: {type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    analogs = "1 analog" if args.analogs == 1 else f"{args.analogs} analogs"
+    print(
+        f"{symbol}: {len(result.dates)} dates from {result.dates[0]} to"
+        f" {result.dates[-1]}, {analogs}, {args.window}-price window"
+    )
+    print(f"{'days':>4} {'hit rate':>9} {'up rate':>8} {'mean abs error':>15}")
+    for days, hit_rate, up_rate, error in zip(
+        result.horizons, result.hit_rate, result.up_rate, result.mean_absolute_error
+    ):
+        print(f"{days:>4} {hit_rate:>9.1%} {up_rate:>8.1%} {error:>15.2%}")
+    if args.output is not None:
+        columns = {"date": result.dates}
+        for i, days in enumerate(result.horizons):
+            columns[f"predicted_{days}"] = result.predicted_returns[:, i]
+            columns[f"actual_{days}"] = result.actual_returns[:, i]
+        pd.DataFrame(columns).to_csv(args.output, index=False)
+    return 0
+
+
+def download(symbols: list[str], price_cache: PriceCache, concurrency: int) -> int:
+    """Brings the symbols' cached prices up to date, ``concurrency`` at a time.
+
+    A line is printed per symbol as soon as it finishes, and failures are printed to
+    stderr. The exit code is 1 if every symbol failed.
+    """
+    failures = 0
+    for symbol, data in price_cache.read_many(symbols, concurrency):
+        if isinstance(data, Exception):
+            print(f"{symbol}: {type(data).__name__}: {data}", file=sys.stderr)
+            failures += 1
+        elif data.empty:
+            print(f"{symbol}: no prices")
+        else:
+            print(f"{symbol}: {len(data)} prices to {data.index[-1]:%Y-%m-%d}")
+    return 1 if failures == len(symbols) else 0
+
+
+def set_application_names() -> None:
+    """Sets the names that the app's settings and cache folder are found by."""
+    from PySide6 import QtCore
+
+    # These must match the names the app sets.
+    QtCore.QCoreApplication.setOrganizationName("MarketMaster")
+    QtCore.QCoreApplication.setApplicationName("MarketMaster")
+
+
+def get_default_cache_directory() -> Path:
+    """Returns the cache folder that the app uses."""
+    from PySide6 import QtCore
+
+    set_application_names()
+    return Path(
+        QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.CacheLocation)
+    )
+
+
+def read_symbols_file(path: Path) -> list[str]:
+    """Reads one symbol per line, ignoring blank lines and lines starting with #."""
+    with open(path, "r", encoding="utf8") as file:
+        lines = (line.strip() for line in file)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def get_universe(cache_directory: Path, provider: DataProvider) -> dict[str, str]:
+    """Returns the S&P 500's symbol-to-name dictionary, downloading it if stale."""
+    listing_path = cache_directory / "sp500_listing.json"
+    if is_stale(listing_path):
+        try:
+            return download_symbol_names(listing_path, provider.fetch_listing)
+        except Exception:
+            pass  # A stale listing is better than none.
+    symbol_to_name = read_symbol_names(listing_path)
+    if not symbol_to_name:
+        raise SystemExit("The S&P 500 listing could not be downloaded.")
+    return symbol_to_name
+
+
+def scan(
+    symbols: Iterable[str],
+    prediction_days: int,
+    analog_count: int,
+    price_directory: Path,
+    max_workers: int = 1,
+    provider: DataProvider | None = None,
+) -> Iterator[dict]:
+    """Forecasts each symbol and yields its record as soon as it is ready.
+
+    With more than one worker, records are yielded in the order the forecasts
+    finish and at most two forecasts per worker are in progress or waiting to be
+    yielded at once. Prices not in ``price_directory`` are fetched from
+    ``provider``, by default FinanceDataReader.
+    """
+    if provider is None:
+        provider = FinanceDataReaderProvider()
+    if max_workers == 1:
+        _init_worker(price_directory, provider)
+        for symbol in symbols:
+            yield _forecast_symbol(symbol, prediction_days, analog_count)
+        return
+    with ProcessPoolExecutor(
+        max_workers, initializer=_init_worker, initargs=(price_directory, provider)
+    ) as pool:
+        pending: set[Future] = set()
+        for symbol in symbols:
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+            pending.add(
+                pool.submit(_forecast_symbol, symbol, prediction_days, analog_count)
+            )
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from (future.result() for future in done)
+
+
+def _init_worker(price_directory: Path, provider: DataProvider) -> None:
+    global _price_cache
+    _price_cache = PriceCache(price_directory, provider.fetch)
+
+
+def _forecast_symbol(symbol: str, prediction_days: int, analog_count: int) -> dict:
+    assert _price_cache is not None
+    try:
+        symbol_data = _price_cache.read(symbol)
+        return get_record(symbol, symbol_data, prediction_days, analog_count)
+    except Exception as e:
+        return {"symbol": symbol, "error": f"{type(e).__name__}: {e}"}
+
+
+def write_records(records: Iterable[dict], file: TextIO, format_: str) -> int:
+    """Writes each record as soon as it is received and returns how many failed."""
+    failures = 0
+    writer = None
+    if format_ == "csv":
+        writer = csv.DictWriter(file, FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    for record in records:
+        if record.get("error"):
+            failures += 1
+        if writer is None:
+            file.write(json.dumps(record) + "\n")
+        else:
+            writer.writerow(record)
+        file.flush()
+    return failures
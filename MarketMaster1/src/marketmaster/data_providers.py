@@ -0,0 +1,294 @@
+"""Sources of price histories and market listings.
+
+Every provider has the same two methods, ``fetch`` and ``fetch_listing``, that work
+like ``FinanceDataReader.DataReader`` and ``FinanceDataReader.StockListing``, so the
+price cache, the listing, and the command-line interface do not need to know where
+the data comes from. The provider is chosen with a spec string:
+
+* ``financedatareader``: downloads from the internet (the default).
+* ``local:FOLDER``: reads a folder of ``SYMBOL.csv`` or ``SYMBOL.parquet`` files
+  of daily or intraday bars.
+* ``synthetic`` or ``synthetic:SEED``: generates random prices that are the same
+  every time for the same symbol and seed, without any files or network access.
+* ``http://URL`` or ``https://URL``: downloads ``SYMBOL.csv`` files from a server
+  laid out like a local folder, over a pool of keep-alive connections.
+
+The app reads the spec from the ``MARKETMASTER_DATA_PROVIDER`` environment variable,
+or else from the ``data/provider`` setting.
+"""
+
+import hashlib
+import io
+import os
+import zlib
+from pathlib import Path
+from urllib.parse import quote
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+from marketmaster.downloader import Downloader
+from marketmaster.intraday import CHUNK_SIZE
+from marketmaster.intraday import load_bars
+
+ENVIRONMENT_VARIABLE = "MARKETMASTER_DATA_PROVIDER"
+SETTINGS_KEY = "data/provider"
+DEFAULT_SPEC = "financedatareader"
+
+
+class DataProvider:
+    """A source of price histories and market listings.
+
+    Subclasses implement ``fetch`` and ``fetch_listing``. Providers must be picklable
+    so that they can be sent to the processes of a process pool.
+    """
+
+    spec = ""
+
+    def fetch(self, symbol: str, start=None) -> pd.DataFrame:
+        """Returns the symbol's daily prices from ``start`` onward, indexed by date.
+
+        The columns are Open, High, Low, Close, Adj Close, and Volume.
+        """
+        raise NotImplementedError
+
+    def fetch_listing(self, market: str) -> pd.DataFrame:
+        """Returns the market's symbols and names in Symbol and Name columns."""
+        raise NotImplementedError
+
+    def get_cache_directory(self, root: Path) -> Path:
+        """Returns the folder in ``root`` for caching this provider's data.
+
+        Each provider has its own folder so that, for example, synthetic prices are
+        never shown as a real symbol's.
+        """
+        digest = hashlib.sha1(self.spec.encode()).hexdigest()[:12]
+        return Path(root) / "providers" / digest
+
+
+class FinanceDataReaderProvider(DataProvider):
+    """Downloads prices and listings with FinanceDataReader."""
+
+    spec = DEFAULT_SPEC
+
+    def fetch(self, symbol: str, start=None) -> pd.DataFrame:
+        import FinanceDataReader as fdr
+
+        if start is None:
+            return fdr.DataReader(symbol)
+        return fdr.DataReader(symbol, start=start)
+
+    def fetch_listing(self, market: str) -> pd.DataFrame:
+        import FinanceDataReader as fdr
+
+        return fdr.StockListing(market)
+
+    def get_cache_directory(self, root: Path) -> Path:
+        # Downloads were cached in the root before there were other providers.
+        return Path(root)
+
+
+class LocalProvider(DataProvider):
+    """Reads prices from a folder of CSV or Parquet files, one per symbol.
+
+    Each file is named after its symbol, such as ``AAPL.csv``, with any characters
+    that are not valid in file names percent-encoded like the price cache does. Its
+    first column is the date. A missing Adj Close column is copied from Close.
+
+    Files are read ``chunk_size`` rows at a time. Intraday bars, such as years of
+    1-minute bars, are resampled to daily bars as they are read, so the whole file
+    is never in memory at once.
+
+    The listing is read from ``listing.csv`` or ``listing.parquet`` if the folder has
+    one, and is otherwise every symbol in the folder named after itself.
+    """
+
+    def __init__(self, directory: str | Path, chunk_size: int = CHUNK_SIZE):
+        self.directory = Path(directory)
+        self.chunk_size = chunk_size
+        self.spec = f"local:{self.directory}"
+
+    def fetch(self, symbol: str, start=None) -> pd.DataFrame:
+        path = self.__get_path(quote(symbol, safe=""))
+        if path is None:
+            raise FileNotFoundError(
+                f"There are no prices for {symbol} in {self.directory}"
+            )
+        data = load_bars(path, "1D", start, self.chunk_size).sort_index()
+        if "Adj Close" not in data.columns and "Close" in data.columns:
+            data["Adj Close"] = data["Close"]
+        return data
+
+    def fetch_listing(self, market: str) -> pd.DataFrame:
+        listing = self.__read("listing")
+        if listing is not None:
+            return listing.reset_index()[["Symbol", "Name"]]
+        stems = sorted(
+            {path.stem for path in self.directory.glob("*.csv")}
+            | {path.stem for path in self.directory.glob("*.parquet")}
+        )
+        symbols = [unquote(stem) for stem in stems if stem != "listing"]
+        return pd.DataFrame({"Symbol": symbols, "Name": symbols})
+
+    def __read(self, stem: str) -> pd.DataFrame | None:
+        path = self.__get_path(stem)
+        if path is None:
+            return None
+        if path.suffix == ".parquet":
+            return pd.read_parquet(path)
+        return pd.read_csv(path, index_col=0)
+
+    def __get_path(self, stem: str) -> Path | None:
+        for suffix in (".parquet", ".csv"):
+            path = self.directory / f"{stem}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+
+class HttpProvider(DataProvider):
+    """Downloads prices and listings from an HTTP server laid out like a local
+    provider's folder.
+
+    Each symbol's daily prices are ``SYMBOL.csv`` under ``url``, requested with a
+    ``start`` query parameter so that the server can send only the newer prices, and
+    the listing is ``listing.csv``. A static file server, such as ``python -m
+    http.server`` in a folder of CSV files, also works, because prices before
+    ``start`` are dropped after they are downloaded.
+
+    All requests share one ``Downloader``, so the workers' concurrent reads reuse up
+    to ``max_connections`` keep-alive connections instead of connecting once per
+    symbol. The downloader does not retry, because the price cache retries every
+    provider's failed fetches with the same backoff.
+    """
+
+    def __init__(self, url: str, max_connections: int = 8):
+        self.url = url.rstrip("/")
+        self.max_connections = max_connections
+        self.spec = self.url
+        self.downloader = Downloader(self.url, max_connections, retries=0)
+
+    def __getstate__(self) -> dict:
+        # Connections cannot be sent to another process, so each process has its
+        # own downloader.
+        return {"url": self.url, "max_connections": self.max_connections}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["url"], state["max_connections"])  # type: ignore
+
+    def fetch(self, symbol: str, start=None) -> pd.DataFrame:
+        # The file's name is percent-encoded like a local provider's, and the URL
+        # encodes the name again.
+        path = quote(f"{quote(symbol, safe='')}.csv")
+        if start is not None:
+            start = pd.Timestamp(start)
+            path += f"?start={start:%Y-%m-%d}"
+        data = pd.read_csv(
+            io.BytesIO(self.downloader.get(path)), index_col=0, parse_dates=True
+        )
+        data.index.name = "Date"
+        if start is not None:
+            data = data[data.index >= start]
+        if "Adj Close" not in data.columns and "Close" in data.columns:
+            data["Adj Close"] = data["Close"]
+        return data
+
+    def fetch_listing(self, market: str) -> pd.DataFrame:
+        listing = pd.read_csv(io.BytesIO(self.downloader.get("listing.csv")))
+        return listing[["Symbol", "Name"]]
+
+
+class SyntheticProvider(DataProvider):
+    """Generates random daily prices for any symbol.
+
+    Each symbol's prices are a random walk of business days from ``start`` to
+    ``end`` (by default, today) that depends only on the seed and the symbol, so a
+    price on a given date is the same every time it is generated. The listing has
+    ``symbol_count`` symbols named SYN000, SYN001, and so on.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        start: str = "2000-01-03",
+        end: str | None = None,
+        symbol_count: int = 500,
+    ):
+        self.seed = seed
+        self.start = start
+        self.end = end
+        self.symbol_count = symbol_count
+        self.spec = f"synthetic:{seed}"
+
+    def fetch(self, symbol: str, start=None) -> pd.DataFrame:
+        end = pd.Timestamp.today().normalize() if self.end is None else self.end
+        index = pd.bdate_range(self.start, end, name="Date")
+        key = zlib.crc32(symbol.encode())
+        length = len(index)
+        # Each column has its own generator so that a later end date adds prices
+        # without changing the earlier ones.
+        rngs = [np.random.default_rng([self.seed, key, i]) for i in range(6)]
+        returns = rngs[0].normal(0.0003, 0.015, length)
+        gaps = rngs[1].normal(0, 0.003, length)
+        highs = np.abs(rngs[2].normal(0, 0.006, length))
+        lows = np.abs(rngs[3].normal(0, 0.006, length))
+        volumes = rngs[4].lognormal(15, 0.5, length)
+        close = rngs[5].uniform(10, 500) * np.exp(np.cumsum(returns))
+        open_ = np.concatenate(([close[0]], close[:-1])) * np.exp(gaps)
+        data = pd.DataFrame(
+            {
+                "Open": open_,
+                "High": np.maximum(open_, close) * (1 + highs),
+                "Low": np.minimum(open_, close) * (1 - lows),
+                "Close": close,
+                "Adj Close": close,
+                "Volume": volumes.astype(np.int64),
+            },
+            index=index,
+        )
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start)]
+        return data
+
+    def fetch_listing(self, market: str) -> pd.DataFrame:
+        symbols = [f"SYN{i:03}" for i in range(self.symbol_count)]
+        names = [f"Synthetic {i}" for i in range(self.symbol_count)]
+        return pd.DataFrame({"Symbol": symbols, "Name": names})
+
+
+def get_provider(spec: str) -> DataProvider:
+    """Returns the provider that the spec string describes.
+
+    Raises ValueError if the spec is not valid.
+    """
+    name, _, argument = spec.strip().partition(":")
+    name = name.lower()
+    if name in ("", "financedatareader", "fdr") and not argument:
+        return FinanceDataReaderProvider()
+    if name == "local" and argument:
+        return LocalProvider(argument)
+    if name in ("http", "https") and argument.startswith("//"):
+        return HttpProvider(spec.strip())
+    if name == "synthetic":
+        try:
+            return SyntheticProvider(int(argument or 0))
+        except ValueError:
+            pass
+    raise ValueError(
+        f"Unknown data provider: {spec!r}. Use financedatareader, local:FOLDER,"
+        " http(s)://URL, or synthetic[:SEED]."
+    )
+
+
+def get_configured_provider() -> DataProvider:
+    """Returns the provider from the environment variable or else the app's settings.
+
+    The application's organization and name must be set before this is called so
+    that the right settings are read.
+    """
+    spec = os.environ.get(ENVIRONMENT_VARIABLE)
+    if not spec:
+        from PySide6 import QtCore
+
+        spec = str(QtCore.QSettings().value(SETTINGS_KEY, DEFAULT_SPEC))
+    return get_provider(spec)
@@ -0,0 +1,280 @@
+"""Downloads many files from one HTTP server at once.
+
+Downloading prices one symbol at a time pays for a new connection per symbol and
+waits for each response before sending the next request. A ``Downloader`` keeps a
+pool of keep-alive connections, so each connection is set up once and reused by
+later requests from any thread, and ``map_unordered`` runs a bounded number of
+downloads at once and yields each result as soon as it finishes.
+
+Requests that may have failed only for the moment are retried with exponential
+backoff: connection errors, timeouts, and the ``RETRY_STATUSES`` responses.
+``call_with_retries`` applies the same policy to any function, such as a data
+provider's ``fetch``.
+
+Only the standard library is used, so a local ``http.server`` can stand in for the
+real server in tests.
+"""
+
+import http.client
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Callable
+from typing import Generator
+from typing import Iterable
+from typing import Iterator
+from typing import TypeVar
+from urllib.parse import urlsplit
+
+# Responses that mean the server is busy or briefly unavailable.
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# File system errors are OSErrors too, but sending the request again does not help.
+_PERMANENT_ERRORS = (
+    FileNotFoundError,
+    IsADirectoryError,
+    NotADirectoryError,
+    PermissionError,
+)
+
+
+class HTTPError(OSError):
+    """A response whose status is not a success.
+
+    ``retry_after`` is the number of seconds the server asked to wait before trying
+    again, or None.
+    """
+
+    def __init__(
+        self, status: int, reason: str, url: str, retry_after: float | None = None
+    ):
+        super().__init__(f"HTTP {status} {reason}: {url}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def is_transient(error: Exception) -> bool:
+    """Returns whether the error may not happen again if the request is retried:
+    a connection error, a timeout, or one of the ``RETRY_STATUSES``.
+    """
+    if isinstance(error, HTTPError):
+        return error.status in RETRY_STATUSES
+    # The HTTP errors of requests, which FinanceDataReader uses, have the response.
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status in RETRY_STATUSES
+    if isinstance(error, _PERMANENT_ERRORS):
+        return False
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+def get_backoff(attempt: int, backoff: float = 0.5, max_backoff: float = 10.0) -> float:
+    """Returns how many seconds to wait before the retry after ``attempt`` failed
+    attempts, counting from 0.
+
+    The first retry waits ``backoff`` seconds and each next one twice as long, up to
+    ``max_backoff``, less a random part so that threads that failed together do not
+    retry together.
+    """
+    return min(max_backoff, backoff * 2**attempt) * random.uniform(0.5, 1)
+
+
+def call_with_retries(
+    function: Callable[[], R],
+    retries: int = 3,
+    backoff: float = 0.5,
+    max_backoff: float = 10.0,
+) -> R:
+    """Returns ``function()``, calling it up to ``retries`` more times while it
+    raises an error for which ``is_transient`` is true.
+
+    Retries wait as long as ``get_backoff`` returns, or as long as the error's
+    ``retry_after``. The last error is raised if every attempt fails.
+    """
+    for attempt in range(retries):
+        try:
+            return function()
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            delay = getattr(e, "retry_after", None)
+        time.sleep(
+            get_backoff(attempt, backoff, max_backoff) if delay is None else delay
+        )
+    return function()
+
+
+class Downloader:
+    """Sends GET requests to one HTTP or HTTPS server over keep-alive connections.
+
+    It can be used from several threads. Each request takes an idle connection, or
+    opens a new one if there is none, and gives it back afterward unless the server
+    closed it. At most ``max_connections`` idle connections are kept.
+
+    A request that fails with a connection error, a timeout, or one of the
+    ``RETRY_STATUSES`` is retried up to ``retries`` times, waiting as long as
+    ``get_backoff`` returns. A Retry-After header in seconds is waited instead.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 8,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        timeout: float = 30.0,
+    ):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Not an HTTP or HTTPS URL: {base_url!r}")
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.__https = parts.scheme == "https"
+        self.__host = parts.hostname
+        self.__port = parts.port
+        self.__prefix = parts.path.rstrip("/")
+        self.__idle: list[http.client.HTTPConnection] = []
+        self.__opened = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def connection_count(self) -> int:
+        """The number of connections opened so far."""
+        return self.__opened
+
+    def get(self, path: str) -> bytes:
+        """Returns the body of the response to a GET request for ``path``, which is
+        relative to the base URL and may have a query.
+
+        Raises HTTPError if the response is not a success after any retries, or the
+        last connection error.
+        """
+        url_path = f"{self.__prefix}/{path.lstrip('/')}"
+
+        def get_once() -> bytes:
+            status, reason, retry_after, body = self.__request(url_path)
+            if not 200 <= status < 300:
+                url = f"{self.base_url}/{path}"
+                raise HTTPError(status, reason, url, retry_after)
+            return body
+
+        return call_with_retries(get_once, self.retries, self.backoff, self.max_backoff)
+
+    def get_backoff(self, attempt: int) -> float:
+        """Returns how many seconds to wait before the retry after ``attempt``
+        failed attempts, counting from 0.
+        """
+        return get_backoff(attempt, self.backoff, self.max_backoff)
+
+    def close(self) -> None:
+        """Closes the idle connections."""
+        with self.__lock:
+            idle, self.__idle = self.__idle, []
+        for connection in idle:
+            connection.close()
+
+    def __enter__(self) -> "Downloader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __request(self, path: str) -> tuple[int, str, float | None, bytes]:
+        connection, reused = self.__acquire()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            if not reused:
+                raise
+            # The server may have closed the connection while it was idle, so the
+            # request is sent again at once on another connection.
+            return self.__request(path)
+        if response.will_close:
+            connection.close()
+        else:
+            self.__release(connection)
+        retry_after = self.__parse_retry_after(response.getheader("Retry-After"))
+        return response.status, response.reason, retry_after, body
+
+    def __acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        with self.__lock:
+            if self.__idle:
+                return self.__idle.pop(), True
+            self.__opened += 1
+        if self.__https:
+            connection: http.client.HTTPConnection = http.client.HTTPSConnection(
+                self.__host, self.__port, timeout=self.timeout
+            )
+        else:
+            connection = http.client.HTTPConnection(
+                self.__host, self.__port, timeout=self.timeout
+            )
+        return connection, False
+
+    def __release(self, connection: http.client.HTTPConnection) -> None:
+        with self.__lock:
+            if len(self.__idle) < self.max_connections:
+                self.__idle.append(connection)
+                return
+        connection.close()
+
+    def __parse_retry_after(self, value: str | None) -> float | None:
+        # Retry-After can also be a date, which is rare enough to back off instead.
+        try:
+            return min(self.max_backoff, max(0.0, float(value)))  # type: ignore
+        except (TypeError, ValueError):
+            return None
+
+
+def map_unordered(
+    function: Callable[[T], R], items: Iterable[T], max_concurrent: int = 8
+) -> Generator[tuple[T, R | Exception], None, None]:
+    """Calls ``function`` on each item in a thread pool and yields each item with
+    its result as soon as the call finishes.
+
+    A call that raises yields its exception as the result, so one failure does not
+    stop the others. At most ``max_concurrent`` calls run at once, and items are
+    taken only as they are needed, so ``items`` can be a long generator. Calls that
+    have not started are canceled if the iterator is closed early.
+    """
+    pool = ThreadPoolExecutor(max_concurrent)
+    pending: dict[Future, T] = {}
+    try:
+        for item in items:
+            if len(pending) >= 2 * max_concurrent:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from _get_results(done, pending)
+            pending[pool.submit(function, item)] = item
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from _get_results(done, pending)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _get_results(
+    done: Iterable[Future], pending: dict[Future, T]
+) -> Iterator[tuple[T, object]]:
+    for future in done:
+        item = pending.pop(future)
+        try:
+            result = future.result()
+        except Exception as e:
+            result = e
+        yield item, result
@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from marketmaster.score_cache import ScoreCache
+from marketmaster.similarity import find_analogs
+from marketmaster.similarity import find_best_match
+from marketmaster.similarity import get_analog_paths
+from marketmaster.similarity import get_analog_returns
+from marketmaster.similarity import get_percentile_bands
+from marketmaster.timing import span
+
+
+@dataclass
+class Forecast:
+    """Everything needed to show a symbol's graph and info panel.
+
+    ``actual`` is the normalized base pattern, ``predicted`` starts with the
+    normalized analog window and continues for ``prediction_days`` more days. When
+    several analogs are combined, ``predicted`` is their median and ``low`` and
+    ``high`` are their 10th and 90th percentiles. ``history`` is every closing price
+    of the symbol, for the full-history plot.
+
+    ``predicted_returns`` are the analog's own returns on each predicted day,
+    relative to the last price of its window, or the median of the analogs' returns,
+    with ``low_returns`` and ``high_returns`` as their 10th and 90th percentiles.
+    Unlike the normalized paths, they do not depend on where the base ended in its
+    range.
+    """
+
+    symbol: str
+    prediction_days: int
+    dates: list[str]
+    actual: np.ndarray
+    predicted: np.ndarray
+    low: np.ndarray | None
+    high: np.ndarray | None
+    analog_count: int
+    latest: pd.Series
+    predicted_returns: np.ndarray
+    history: pd.Series | None = None
+    low_returns: np.ndarray | None = None
+    high_returns: np.ndarray | None = None
+
+
+def compute_forecast(
+    symbol: str,
+    symbol_data: pd.DataFrame,
+    prediction_days: int,
+    analog_count: int = 1,
+    today: datetime | None = None,
+    score_cache: ScoreCache | None = None,
+) -> Forecast:
+    """Searches the symbol's price history for the periods most like the last 90
+    days.
+
+    If a ``score_cache`` is given, the similarity scores are reused from it when the
+    symbol was searched before with the same prices.
+    """
+    # select only the close column
+    close = symbol_data["Close"]
+
+    base = get_base(close, today)
+    base_norm = (base - base.min()) / (base.max() - base.min())
+
+    # window size: number of past days to see the pattern
+    window_size = len(base)
+
+    # how many days you wanna predict
+    next_date = prediction_days  # 5 means one week, 10 means two weeks, etc.
+
+    scores = None
+    if score_cache is not None:
+        with span("forecast.scores", symbol=symbol):
+            scores = score_cache.get(symbol, close.to_numpy(), window_size)
+
+    low = high = low_returns = high_returns = None
+    if analog_count == 1:
+        idx = find_best_match(close.to_numpy(), window_size, next_date, scores=scores)
+        top_ = close[idx : idx + window_size + next_date]  # noqa: E203
+        top_norm = (top_ - top_.min()) / (top_.max() - top_.min())
+        predicted = top_norm.to_numpy()
+        predicted_returns = get_analog_returns(
+            close.to_numpy(), np.array([idx]), window_size, next_date
+        )[0]
+    else:
+        starts = find_analogs(
+            close.to_numpy(), window_size, next_date, analog_count, scores=scores
+        )
+        if not len(starts):
+            # Every window's score is NaN, e.g. when the prices never change.
+            raise ValueError("No analogs were found.")
+        paths = get_analog_paths(close.to_numpy(), starts, window_size, next_date)
+        low, predicted, high = get_percentile_bands(paths)
+        low_returns, predicted_returns, high_returns = get_percentile_bands(
+            get_analog_returns(close.to_numpy(), starts, window_size, next_date)
+        )
+        analog_count = len(paths)
+
+    return Forecast(
+        symbol=symbol,
+        prediction_days=prediction_days,
+        dates=get_dates(base_norm.index),
+        actual=base_norm.to_numpy(),
+        predicted=predicted,
+        low=low,
+        high=high,
+        analog_count=analog_count,
+        latest=symbol_data.iloc[-1],
+        history=close,
+        predicted_returns=predicted_returns,
+        low_returns=low_returns,
+        high_returns=high_returns,
+    )
+
+
+def get_record(
+    symbol: str,
+    symbol_data: pd.DataFrame,
+    prediction_days: int,
+    analog_count: int,
+    score_cache: ScoreCache | None = None,
+) -> dict:
+    """Forecasts the symbol and returns the forecast's summary, as the
+    command-line interface and the watchlist show it.
+
+    The predicted prices are the last close moved by the analogs' own returns after
+    their windows, so they do not depend on where the last close is in the range of
+    the last 90 days.
+    """
+    forecast = compute_forecast(
+        symbol, symbol_data, prediction_days, analog_count, score_cache=score_cache
+    )
+    close = float(symbol_data["Close"].iloc[-1])
+
+    def to_price(returns: np.ndarray) -> float:
+        return close * (1 + float(returns[-1]))
+
+    predicted_close = to_price(forecast.predicted_returns)
+    return {
+        "symbol": symbol,
+        "date": str(symbol_data.index[-1]).split(" ")[0],
+        "close": close,
+        "prediction_days": prediction_days,
+        "analog_count": forecast.analog_count,
+        "predicted_close": predicted_close,
+        "predicted_return": predicted_close / close - 1,
+        "low_close": (
+            None if forecast.low_returns is None else to_price(forecast.low_returns)
+        ),
+        "high_close": (
+            None if forecast.high_returns is None else to_price(forecast.high_returns)
+        ),
+        "error": None,
+    }
+
+
+def get_base(close: pd.Series, today: datetime | None = None) -> pd.Series:
+    """Returns the closing prices of the 90 days up to today, the pattern to search
+    for.
+    """
+    # set a period for comparing
+    end_datetime = today or datetime.today()
+    end_date = end_datetime.strftime("%Y-%m-%d")
+    start_datetime = end_datetime - timedelta(days=90)
+    start_date = start_datetime.strftime("%Y-%m-%d")
+    return close[start_date:end_date]  # type: ignore
+
+
+def get_dates(index) -> list[str]:
+    datetime_index = index
+    dates: list[str] = [str(datetime_index[i]) for i in range(len(datetime_index))]
+    return [x.split(" ")[0] for x in dates]
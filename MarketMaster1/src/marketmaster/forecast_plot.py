@@ -0,0 +1,177 @@
+import math
+
+import numpy as np
+import pyqtgraph as pg
+from marketmaster.forecast import Forecast
+from PySide6 import QtCore
+from PySide6 import QtGui
+
+
+ACTUAL_COLOR = "#1f77b4"
+PREDICTED_COLOR = "#ff7f0e"
+BAND_COLOR = (255, 127, 14, 64)
+FUTURE_COLOR = (255, 255, 0, 77)
+TODAY_COLOR = "r"
+
+
+class DateAxisItem(pg.AxisItem):
+    """An axis that labels a plot's x positions with trading days.
+
+    Position ``i`` is labeled with ``dates[i]``. Positions after the last date are
+    labeled with the business days that follow it.
+    """
+
+    # The widest label, used to space the ticks.
+    label_sample = "0000-00-00"
+
+    def __init__(self, orientation: str = "bottom"):
+        super().__init__(orientation)
+        self.dates: list[str] = []
+
+    def set_dates(self, dates: list[str], count: int) -> None:
+        """Sets the labels of the positions from 0 to ``count`` - 1."""
+        if len(dates) < count and dates:
+            future = np.busday_offset(
+                np.datetime64(dates[-1], "D"),
+                np.arange(1, count - len(dates) + 1),
+                roll="forward",
+            )
+            dates = dates + [str(date) for date in future]
+        self.dates = dates
+        self.picture = None  # The labels are cached until the next update.
+        self.update()
+
+    def tickSpacing(self, minVal, maxVal, size):
+        # Dates are too long for minor ticks, so there is only one level of ticks,
+        # spaced so that their labels do not overlap.
+        font = self.style["tickFont"] or QtGui.QFont()
+        label_width = QtGui.QFontMetrics(font).horizontalAdvance(
+            self.label_sample + "   "
+        )
+        max_ticks = max(1, int(size // label_width))
+        return [(max(1, math.ceil((maxVal - minVal) / max_ticks)), 0)]
+
+    def tickStrings(self, values, scale, spacing) -> list[str]:
+        strings = []
+        for value in values:
+            i = int(round(value))
+            if 0 <= i < len(self.dates) and abs(value - i) < 1e-6:
+                strings.append(self.dates[i])
+            else:
+                strings.append("")
+        return strings
+
+
+class ForecastPlot(pg.PlotWidget):
+    """Shows a forecast with pyqtgraph.
+
+    All of the plot's items are created once and updated in place, so showing
+    another forecast only repaints the plot. The x axis can be panned and zoomed
+    with the mouse and the y axis follows the visible data.
+    """
+
+    def __init__(self, parent: QtCore.QObject | None = None):
+        self.date_axis = DateAxisItem()
+        super().__init__(parent, axisItems={"bottom": self.date_axis})
+        self.plot_item: pg.PlotItem = self.getPlotItem()
+        self.plot_item.setLabel("left", "Normalized Price")
+        self.plot_item.showGrid(x=True, y=True, alpha=0.3)
+        self.plot_item.setMouseEnabled(x=True, y=False)
+        self.plot_item.setAutoVisible(y=True)
+        # Only the visible part of each curve is drawn, at most one point per pixel.
+        self.plot_item.setClipToView(True)
+        self.plot_item.setDownsampling(auto=True, mode="peak")
+        self.legend = self.plot_item.addLegend(offset=(-10, 10))
+        self.foreground = "k"
+        self.title_size = "16pt"
+
+        self.future_region = pg.LinearRegionItem(
+            brush=pg.mkBrush(FUTURE_COLOR), pen=pg.mkPen(None), movable=False
+        )
+        self.plot_item.addItem(self.future_region)
+        self.band_low = pg.PlotCurveItem()
+        self.band_high = pg.PlotCurveItem()
+        self.band = pg.FillBetweenItem(
+            self.band_low, self.band_high, brush=pg.mkBrush(BAND_COLOR)
+        )
+        self.plot_item.addItem(self.band)
+        self.actual_curve = self.plot_item.plot(
+            pen=pg.mkPen(ACTUAL_COLOR, width=2), name="actual"
+        )
+        self.predicted_curve = self.plot_item.plot(
+            pen=pg.mkPen(PREDICTED_COLOR, width=2), name="predicted"
+        )
+        today_pen = pg.mkPen(TODAY_COLOR, width=2, style=QtCore.Qt.DashLine)
+        self.today_line = pg.InfiniteLine(angle=90, pen=today_pen, movable=False)
+        self.plot_item.addItem(self.today_line)
+        # The line and the band cannot be added to the legend directly, so it shows
+        # items that look like them instead.
+        self.legend.addItem(pg.PlotDataItem(pen=today_pen), "today")
+        self.band_sample = pg.PlotDataItem(
+            pen=None, fillLevel=0, fillBrush=pg.mkBrush(BAND_COLOR)
+        )
+        self.band_label = ""
+
+    def show_forecast(self, forecast: Forecast) -> None:
+        today = len(forecast.actual) - 1
+        end = len(forecast.predicted) - 1
+        self.plot_item.setTitle(
+            forecast.symbol, color=self.foreground, size=self.title_size
+        )
+        self.date_axis.set_dates(forecast.dates, len(forecast.predicted))
+        self.actual_curve.setData(forecast.actual)
+        self.predicted_curve.setData(forecast.predicted)
+        self.today_line.setValue(today)
+        self.future_region.setRegion((today, end))
+        if forecast.low is None:
+            self.band.setVisible(False)
+            self.__set_band_label("")
+        else:
+            self.band_low.setData(forecast.low)
+            self.band_high.setData(forecast.high)
+            self.band.setVisible(True)
+            self.__set_band_label(
+                f"{forecast.analog_count} analogs, 10th to 90th percentile"
+            )
+        self.plot_item.setLimits(xMin=0, xMax=end)
+        self.plot_item.setXRange(0, end, padding=0)
+        self.plot_item.enableAutoRange(y=True)
+
+    def __set_band_label(self, label: str) -> None:
+        if label == self.band_label:
+            return
+        if self.band_label:
+            self.legend.removeItem(self.band_sample)
+        if label:
+            self.legend.addItem(self.band_sample, label)
+        self.band_label = label
+
+    def set_dark_mode(self, dark_mode: bool) -> None:
+        if dark_mode:
+            background, foreground = "#2d2d30", "#e1e1e1"
+        else:
+            background, foreground = "w", "k"
+        self.setBackground(background)
+        for name in ("left", "bottom"):
+            axis = self.plot_item.getAxis(name)
+            axis.setPen(foreground)
+            axis.setTextPen(foreground)
+        self.foreground = foreground
+        self.legend.setBrush(pg.mkBrush(background))
+        self.legend.setLabelTextColor(foreground)
+        self.__redraw_labels()
+
+    def set_font(self, font: QtGui.QFont) -> None:
+        for name in ("left", "bottom"):
+            axis = self.plot_item.getAxis(name)
+            axis.setTickFont(font)
+            axis.label.setFont(font)
+        self.title_size = f"{font.pointSize()}pt"
+        self.__redraw_labels()
+
+    def __redraw_labels(self) -> None:
+        """Applies the current color and size to the title and legend's labels."""
+        title = self.plot_item.titleLabel
+        title.setText(title.text, color=self.foreground, size=self.title_size)
+        for _, label in self.legend.items:
+            label.setText(label.text)
@@ -1,31 +1,63 @@
-from datetime import datetime
-from datetime import timedelta
-
-import FinanceDataReader as fdr
-import matplotlib
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
+import threading
+import time
+from pathlib import Path
+
+from marketmaster.data_providers import DataProvider
+from marketmaster.data_providers import get_configured_provider
+from marketmaster.forecast import Forecast
+from marketmaster.forecast_plot import ForecastPlot
+from marketmaster.history_plot import HistoryPlot
 from marketmaster.info_panel import InfoPanel
-from marketmaster.progress_dialog import ProgressDialog
+from marketmaster.listing import download_symbol_names
+from marketmaster.listing import is_stale
+from marketmaster.listing import read_symbol_names
+from marketmaster.prefetch import BOOKMARK_PRIORITY
+from marketmaster.prefetch import HISTORY_PRIORITY
+from marketmaster.prefetch import Prefetcher
+from marketmaster.prefetch import REQUEST_PRIORITY
+from marketmaster.price_cache import PriceCache
+from marketmaster.price_store import PriceStore
 from marketmaster.resources import folder_icon_path
 from marketmaster.resources import history_icon_path
 from marketmaster.resources import light_folder_icon_path
 from marketmaster.resources import light_history_icon_path
 from marketmaster.resources import light_settings_icon_path
 from marketmaster.resources import settings_icon_path
-from pyqtgraph.widgets.MatplotlibWidget import MatplotlibWidget
+from marketmaster.score_cache import ScoreCache
+from marketmaster.timing import record
+from marketmaster.timing import span
+from marketmaster.watchlist import WatchlistView
+from marketmaster.workers import ForecastWorker
+from marketmaster.workers import ListingWorker
+from marketmaster.workers import UniverseWorker
+from marketmaster.workers import WatchlistWorker
 from PySide6 import QtCore
 from PySide6 import QtGui
 from PySide6 import QtWidgets
 
-matplotlib.use("Qt5Agg")
 
-plt.rcParams["figure.figsize"] = (14, 8)
-plt.rcParams["font.size"] = 16
-plt.rcParams["lines.linewidth"] = 2
-plt.rcParams["axes.grid"] = True
-plt.rcParams["axes.axisbelow"] = True
+def get_cache_location(data_provider: DataProvider) -> Path:
+    """Returns the folder where the data provider's prices and listing are saved."""
+    return data_provider.get_cache_directory(
+        Path(
+            QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.CacheLocation)
+        )
+    )
+
+
+def load_symbol_names() -> dict[str, str]:
+    """Returns the configured data provider's saved listing, even if it is stale.
+
+    The listing is downloaded if none is saved.
+    """
+    data_provider = get_configured_provider()
+    listing_path = get_cache_location(data_provider) / "sp500_listing.json"
+    symbol_to_name = read_symbol_names(listing_path)
+    if not symbol_to_name:
+        symbol_to_name = download_symbol_names(
+            listing_path, data_provider.fetch_listing
+        )
+    return symbol_to_name
 
 
 class GraphMenu(QtWidgets.QWidget):
@@ -50,28 +82,98 @@ class GraphMenu(QtWidgets.QWidget):
             self.history_qmenu.setIcon(QtGui.QIcon(history_icon_path))
             self.bookmarks_qmenu.setIcon(QtGui.QIcon(folder_icon_path))
         main_window.menuBar().addAction(self.settings_action)
+        self.watchlist_action = QtGui.QAction("watchlist", self)
+        self.watchlist_action.setCheckable(True)
+        main_window.menuBar().addAction(self.watchlist_action)
+        self.full_history_action = QtGui.QAction("full history", self)
+        self.full_history_action.setCheckable(True)
+        main_window.menuBar().addAction(self.full_history_action)
         self.main_window.menuBar().addMenu(self.bookmarks_qmenu)
         self.bookmarks_qmenu.menuAction().setVisible(False)
         self.settings_action.triggered.connect(main_window.show_settings_menu)
 
         self.history: list[tuple[str, QtGui.QAction]] = []
+        self.data_provider = get_configured_provider()
+        cache_location = get_cache_location(self.data_provider)
+        self.price_cache = PriceCache(
+            cache_location / "prices", self.data_provider.fetch
+        )
+        # The workers and the prefetcher share one byte budget of prices in memory.
+        self.price_store = PriceStore(self.price_cache)
+        self.score_cache = ScoreCache()
+        self.index_directory = cache_location / "window_index"
+        self.prefetcher = Prefetcher(
+            self.price_store,
+            int(QtCore.QSettings().value("prefetch/max_concurrent", 2)),
+            parent=self,
+            score_cache=self.score_cache,
+        )
+        self.__job_id = 0
+        self.__job_start = 0.0
+        self.__cancel_event: threading.Event | None = None
+        # Each unfinished forecast or universe search holds a token that pauses
+        # prefetching until the job finishes or is replaced.
+        self.__pause_token: int | None = None
+        self.__universe_job_id = 0
+        self.__universe_cancel_event: threading.Event | None = None
+        self.__universe_pause_token: int | None = None
+        self.__watchlist_job_id = 0
+        self.__watchlist_cancel_event: threading.Event | None = None
 
         self.splitter = QtWidgets.QSplitter()
         self.layout.addWidget(self.splitter)
         qApp.aboutToQuit.connect(self._save_splitter_state)  # type: ignore # noqa: F821
 
-        symbol_to_name: dict[str, str] = (
-            fdr.StockListing("S&P500").set_index("Symbol")["Name"].to_dict()
-        )
+        # The listing is only needed for the info panel's header, so a saved one is
+        # used even if it is stale while a new one downloads.
+        listing_path = cache_location / "sp500_listing.json"
+        symbol_to_name: dict[str, str] = read_symbol_names(listing_path)
         self.info_panel = InfoPanel(
             symbol, symbol_to_name, self.show_graph_and_info_panel, self, main_window
         )
+        if is_stale(listing_path):
+            listing_worker = ListingWorker(
+                listing_path, self.data_provider.fetch_listing
+            )
+            listing_worker.signals.finished.connect(self.info_panel.set_symbol_names)
+            QtCore.QThreadPool.globalInstance().start(listing_worker)
         self.splitter.addWidget(self.info_panel)
-        self.plot = MatplotlibWidget()
-        self.splitter.addWidget(self.plot)
+        self.__prefetch_bookmarks_and_history()
         settings = QtCore.QSettings()
+        if settings.value("plot/mode", "pyqtgraph") == "matplotlib":
+            from marketmaster.matplotlib_plot import MatplotlibForecastPlot
+
+            self.plot: ForecastPlot | MatplotlibForecastPlot = MatplotlibForecastPlot()
+        else:
+            self.plot = ForecastPlot()
+        self.plot.set_dark_mode(dark_mode)
+        # The full history is shown below the forecast, so the outer splitter's
+        # saved state still fits.
+        self.plot_splitter = QtWidgets.QSplitter(QtCore.Qt.Vertical)
+        self.plot_splitter.addWidget(self.plot)
+        if settings.value("plot/downsampling", "minmax") == "lttb":
+            self.history_plot = HistoryPlot(method="lttb")
+        else:
+            self.history_plot = HistoryPlot()
+        self.history_plot.set_dark_mode(dark_mode)
+        self.plot_splitter.addWidget(self.history_plot)
+        self.history_plot.setVisible(False)
+        self.full_history_action.toggled.connect(self.__toggle_full_history)
+        self.splitter.addWidget(self.plot_splitter)
+        self.watchlist = WatchlistView(
+            self.refresh_watchlist, self.show_graph_and_info_panel
+        )
+        self.splitter.addWidget(self.watchlist)
+        self.watchlist.setVisible(False)
+        self.watchlist_action.toggled.connect(self.__toggle_watchlist)
         if settings.contains("splitter_state"):
             self.splitter.restoreState(settings.value("splitter_state"))
+        self.watchlist_action.setChecked(
+            settings.value("watchlist/visible", False, type=bool)
+        )
+        self.full_history_action.setChecked(
+            settings.value("full_history/visible", False, type=bool)
+        )
 
         self.show_graph_and_info_panel(symbol)
         self.set_font(main_window.font())
@@ -82,7 +184,9 @@ class GraphMenu(QtWidgets.QWidget):
     def show_graph_and_info_panel(self, symbol: str | None = None) -> None:
         """Shows the table and graph for the given symbol.
 
-        Depends on the info panel's symbol line edit and prediction days spin box.
+        Depends on the info panel's symbol line edit, prediction days spin box, and
+        analog count spin box. The graph and table are shown when the forecast's
+        worker finishes, unless another symbol is requested first.
         """
         if isinstance(symbol, bool):
             symbol = None
@@ -94,112 +198,233 @@ class GraphMenu(QtWidgets.QWidget):
             return
         assert len(symbol) > 0
         prediction_days: int = self.info_panel.prediction_days_spin_box.value()
-        symbol_data: pd.DataFrame = fdr.DataReader(symbol)
-        todays_symbol_data: pd.DataFrame = symbol_data.iloc[-1]
-
-        with ProgressDialog():
-            s_history: tuple[str, ...] = tuple(s[0] for s in self.history)
-            if symbol not in s_history:
-                new_action = QtGui.QAction(symbol, self)
-                new_action.triggered.connect(
-                    lambda self=self, symbol=symbol: self.show_graph_and_info_panel(
-                        symbol
-                    )
+        analog_count: int = self.info_panel.analog_count_spin_box.value()
+
+        s_history: tuple[str, ...] = tuple(s[0] for s in self.history)
+        if symbol not in s_history:
+            new_action = QtGui.QAction(symbol, self)
+            new_action.triggered.connect(
+                lambda self=self, symbol=symbol: self.show_graph_and_info_panel(symbol)
+            )
+            if self.history:
+                self.history_qmenu.insertAction(
+                    self.history_qmenu.actions()[0], new_action
                 )
-                if self.history:
-                    self.history_qmenu.insertAction(
-                        self.history_qmenu.actions()[0], new_action
-                    )
-                else:
-                    self.history_qmenu.addAction(new_action)
-                self.history.append((symbol, new_action))
-                if len(self.history) == 2:
-                    self.main_window.menuBar().addMenu(self.history_qmenu)
             else:
-                i = s_history.index(symbol)
-                e = self.history[i]
-                del self.history[i]
-                self.history.append(e)
-                self.history_qmenu.removeAction(e[1])
-                history_actions = self.history_qmenu.actions()
-                if history_actions:
-                    self.history_qmenu.insertAction(history_actions[0], e[1])
-                else:
-                    self.history_qmenu.addAction(e[1])
-            self.__load_and_show_graph(symbol, prediction_days, symbol_data)
-            self.info_panel.show_info_panel(symbol, todays_symbol_data)
-
-    def __load_and_show_graph(
-        self, symbol: str, prediction_days: int, symbol_data: pd.DataFrame
+                self.history_qmenu.addAction(new_action)
+            self.history.append((symbol, new_action))
+            if len(self.history) == 2:
+                self.main_window.menuBar().addMenu(self.history_qmenu)
+        else:
+            i = s_history.index(symbol)
+            e = self.history[i]
+            del self.history[i]
+            self.history.append(e)
+            self.history_qmenu.removeAction(e[1])
+            history_actions = self.history_qmenu.actions()
+            if history_actions:
+                self.history_qmenu.insertAction(history_actions[0], e[1])
+            else:
+                self.history_qmenu.addAction(e[1])
+        self.__start_forecast(symbol, prediction_days, analog_count)
+
+    def __start_forecast(
+        self, symbol: str, prediction_days: int, analog_count: int
     ) -> None:
-        """Creates and displays the graph."""
+        """Starts computing a forecast in the thread pool.
+
+        Any unfinished forecast is canceled so that switching symbols quickly does
+        not queue up work for symbols that will never be shown.
+        """
+        if self.__cancel_event is not None:
+            self.__cancel_event.set()
+        # The new job pauses before the replaced one's pause is released, so that
+        # prefetching does not start in between.
+        token = self.prefetcher.pause(symbol)
+        self.__release_pause()
+        self.__pause_token = token
+        self.__job_id += 1
+        self.__job_start = time.perf_counter()
+        worker = ForecastWorker(
+            self.__job_id,
+            symbol,
+            prediction_days,
+            analog_count,
+            self.price_store,
+            self.score_cache,
+        )
+        worker.signals.progress.connect(self.__on_forecast_progress)
+        worker.signals.finished.connect(self.__on_forecast_finished)
+        worker.signals.failed.connect(self.__on_forecast_failed)
+        # The thread pool deletes the worker when it finishes, so only its event is
+        # kept for canceling it.
+        self.__cancel_event = worker.cancelled
+        QtCore.QThreadPool.globalInstance().start(worker, REQUEST_PRIORITY)
+
+    def search_universe(self) -> None:
+        """Searches every S&P 500 symbol's history for periods like the current
+        symbol's last 90 days and shows the best in the info panel.
+
+        Depends on the info panel's symbol line edit, prediction days spin box, and
+        analog count spin box.
+        """
         if not self.info_panel.is_valid_symbol():
             return
+        symbols = list(self.info_panel.SYMBOL_TO_NAME)
+        if not symbols:
+            self.info_panel.show_status("The S&P 500 listing has not loaded yet.")
+            return
+        if self.__universe_cancel_event is not None:
+            self.__universe_cancel_event.set()
+        self.__universe_job_id += 1
+        worker = UniverseWorker(
+            self.__universe_job_id,
+            self.info_panel.symbol_line_edit.text(),
+            symbols,
+            self.info_panel.prediction_days_spin_box.value(),
+            self.info_panel.analog_count_spin_box.value(),
+            self.price_store,
+            self.index_directory,
+        )
+        worker.signals.progress.connect(self.__on_universe_progress)
+        worker.signals.finished.connect(self.__on_universe_finished)
+        worker.signals.failed.connect(self.__on_universe_failed)
+        self.__universe_cancel_event = worker.cancelled
+        token = self.prefetcher.pause()
+        self.__release_universe_pause()
+        self.__universe_pause_token = token
+        QtCore.QThreadPool.globalInstance().start(worker, REQUEST_PRIORITY)
 
-        # select only the close column
-        close = symbol_data["Close"]
+    def __on_universe_progress(self, job_id: int, message: str) -> None:
+        if job_id == self.__universe_job_id:
+            self.info_panel.show_status(message)
 
-        # set a period for comparing
-        end_datetime = datetime.today()
-        end_date = end_datetime.strftime("%Y-%m-%d")
-        start_datetime = end_datetime - timedelta(days=90)
-        start_date = start_datetime.strftime("%Y-%m-%d")
+    def __on_universe_failed(self, job_id: int, message: str) -> None:
+        if job_id == self.__universe_job_id:
+            self.info_panel.show_status(message)
+            self.__release_universe_pause()
 
-        base = close[start_date:end_date]  # type: ignore
-        base_norm = (base - base.min()) / (base.max() - base.min())
+    def __on_universe_finished(self, job_id: int, matches: list) -> None:
+        if job_id != self.__universe_job_id:
+            return
+        self.__universe_cancel_event = None
+        self.__release_universe_pause()
+        self.info_panel.show_status(f"{len(matches)} analogs found in the S&P 500")
+        self.info_panel.show_universe_matches(matches)
 
-        # window size: number of past days to see the pattern
-        window_size = len(base)
+    def refresh_watchlist(self, source: str | None = None) -> None:
+        """Loads the latest prices and forecasts of the watchlist's symbols.
 
-        # how many days you wanna predict
-        next_date = prediction_days  # 5 means one week, 10 means two weeks, etc.
+        ``source`` is "bookmarks" or "S&P 500", by default the watchlist's choice.
+        Depends on the info panel's prediction days and analog count spin boxes.
+        """
+        if source is None:
+            source = self.watchlist.source()
+        if source == "bookmarks":
+            symbols = [s[0] for s in self.info_panel.bookmarks]
+        else:
+            symbols = list(self.info_panel.SYMBOL_TO_NAME)
+        if self.__watchlist_cancel_event is not None:
+            self.__watchlist_cancel_event.set()
+        self.__watchlist_job_id += 1
+        self.watchlist.model.set_symbols(symbols)
+        if not symbols:
+            self.watchlist.show_status(f"There are no {source} symbols yet.")
+            return
+        worker = WatchlistWorker(
+            self.__watchlist_job_id,
+            symbols,
+            self.info_panel.prediction_days_spin_box.value(),
+            self.info_panel.analog_count_spin_box.value(),
+            self.price_store,
+            self.score_cache,
+        )
+        worker.signals.progress.connect(self.__on_watchlist_progress)
+        worker.signals.rows.connect(self.__on_watchlist_rows)
+        worker.signals.finished.connect(self.__on_watchlist_finished)
+        worker.signals.failed.connect(self.__on_watchlist_progress)
+        self.__watchlist_cancel_event = worker.cancelled
+        QtCore.QThreadPool.globalInstance().start(worker)
 
-        # number of search
-        moving_cnt = len(close) - window_size - next_date - 1
+    def __toggle_watchlist(self, visible: bool) -> None:
+        QtCore.QSettings().setValue("watchlist/visible", visible)
+        self.watchlist.setVisible(visible)
+        if visible and not self.watchlist.model.rowCount():
+            self.refresh_watchlist()
 
-        def cosine_similarity(x, y):
-            return np.dot(x, y) / (np.sqrt(np.dot(x, x)) * np.sqrt(np.dot(y, y)))
+    def __toggle_full_history(self, visible: bool) -> None:
+        QtCore.QSettings().setValue("full_history/visible", visible)
+        self.history_plot.setVisible(visible)
 
-        sim_list = []  # similarity
+    def __on_watchlist_progress(self, job_id: int, message: str) -> None:
+        if job_id == self.__watchlist_job_id:
+            self.watchlist.show_status(message)
 
-        for i in range(moving_cnt):
-            target = close[i : i + window_size]  # noqa: E203
-            target_norm = (target - target.min()) / (target.max() - target.min())
-            cos_similarity = cosine_similarity(base_norm, target_norm)
-            sim_list.append(cos_similarity)
+    def __on_watchlist_rows(self, job_id: int, rows: tuple) -> None:
+        if job_id == self.__watchlist_job_id:
+            self.watchlist.model.update_rows(*rows)
 
-        idx = pd.Series(sim_list).sort_values(ascending=False).head(1).index[0]
-        # print(pd.Series(sim_list).sort_values(ascending = False).head(20))
+    def __on_watchlist_finished(self, job_id: int, count: int) -> None:
+        if job_id != self.__watchlist_job_id:
+            return
+        self.__watchlist_cancel_event = None
+        self.watchlist.model.flush()
+        self.watchlist.show_status(f"{count} symbols")
 
-        top_ = close[idx : idx + window_size + next_date]  # noqa: E203
-        top_norm = (top_ - top_.min()) / (top_.max() - top_.min())
+    def __release_pause(self) -> None:
+        if self.__pause_token is not None:
+            self.prefetcher.resume(self.__pause_token)
+            self.__pause_token = None
 
-        dates: list[str] = self.get_dates(base_norm.index)
+    def __release_universe_pause(self) -> None:
+        if self.__universe_pause_token is not None:
+            self.prefetcher.resume(self.__universe_pause_token)
+            self.__universe_pause_token = None
 
-        figure = self.plot.getFigure()
-        figure.clear()  # clear the graph's title
-        subplot = figure.add_subplot(1, 1, 1)
-        subplot.set_title(symbol)
-        subplot.set_ylabel("Normalized Price")
-        subplot.plot(dates, base_norm.values, top_norm.values)
-        subplot.tick_params(axis="x", labelrotation=30, labelsize=10)
-        subplot.xaxis.set_major_locator(plt.MaxNLocator(10))
-        subplot.axvline(x=len(base_norm) - 1, c="r", linestyle="--", label="today")
-        subplot.axvspan(
-            len(base_norm.values) - 1,
-            len(top_norm.values) - 1,
-            facecolor="yellow",
-            alpha=0.3,
+    def __prefetch_bookmarks_and_history(self) -> None:
+        """Queues the symbols the user is likely to open next for prefetching."""
+        self.prefetcher.prefetch(
+            (s[0] for s in self.info_panel.bookmarks), BOOKMARK_PRIORITY
         )
-        subplot.legend(["actual", "predicted", "today"])
-        self.plot.draw()  # required for changing from one graph to another
+        self.prefetcher.prefetch(
+            (s[0] for s in reversed(self.history)), HISTORY_PRIORITY
+        )
+
+    def __on_forecast_progress(self, job_id: int, message: str) -> None:
+        if job_id == self.__job_id:
+            self.info_panel.show_status(message)
+
+    def __on_forecast_failed(self, job_id: int, message: str) -> None:
+        if job_id == self.__job_id:
+            self.info_panel.show_status(message)
+            self.__release_pause()
 
-    def get_dates(self, index) -> list[str]:
-        datetime_index = index
-        dates: list[str] = [str(datetime_index[i]) for i in range(len(datetime_index))]
-        return [x.split(" ")[0] for x in dates]
+    def __on_forecast_finished(self, job_id: int, forecast: Forecast) -> None:
+        if job_id != self.__job_id:
+            return
+        self.__cancel_event = None
+        self.__release_pause()
+        self.__prefetch_bookmarks_and_history()
+        with span("gui.plot", symbol=forecast.symbol):
+            self.plot.show_forecast(forecast)
+        if forecast.history is not None:
+            with span("gui.history_plot", symbol=forecast.symbol):
+                self.history_plot.set_history(forecast.symbol, forecast.history)
+        with span("gui.info_panel", symbol=forecast.symbol):
+            self.info_panel.show_info_panel(forecast.symbol, forecast.latest)
+        # From the request to the shown forecast, including any time the worker
+        # waited in the thread pool's queue.
+        record(
+            "forecast.total",
+            self.__job_start,
+            time.perf_counter(),
+            symbol=forecast.symbol,
+        )
 
     def set_font(self, font: QtGui.QFont) -> None:
         """Sets the font for this widget and all its children."""
         self.setFont(font)
         self.info_panel.set_font(font)
+        self.plot.set_font(font)
+        self.history_plot.set_font(font)
+        self.watchlist.set_font(font)
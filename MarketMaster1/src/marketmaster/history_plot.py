@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pyqtgraph as pg
+from marketmaster.downsampling import downsample
+from marketmaster.forecast_plot import ACTUAL_COLOR
+from marketmaster.forecast_plot import DateAxisItem
+from PySide6 import QtCore
+from PySide6 import QtGui
+
+# How long to wait after the visible range changes before decimating again, in
+# milliseconds, so that a drag or a scroll decimates once per frame at most.
+REDRAW_DELAY = 15
+
+
+class TimestampAxisItem(DateAxisItem):
+    """An axis that labels a plot's x positions with the times of a series.
+
+    Position ``i`` is labeled with ``timestamps[i]``. Only the labels of the visible
+    ticks are formatted, so a series can have millions of times. Intraday times are
+    labeled to the minute.
+    """
+
+    def __init__(self, orientation: str = "bottom"):
+        super().__init__(orientation)
+        self.timestamps = np.empty(0, dtype="datetime64[m]")
+        self.unit = "D"
+
+    def set_timestamps(self, timestamps: np.ndarray) -> None:
+        timestamps = np.asarray(timestamps).astype("datetime64[m]")
+        intraday = (timestamps != timestamps.astype("datetime64[D]")).any()
+        self.unit = "m" if intraday else "D"
+        self.label_sample = "0000-00-00 00:00" if intraday else "0000-00-00"
+        self.timestamps = timestamps
+        self.picture = None  # The labels are cached until the next update.
+        self.update()
+
+    def tickStrings(self, values, scale, spacing) -> list[str]:
+        strings = []
+        for value in values:
+            i = int(round(value))
+            if 0 <= i < len(self.timestamps) and abs(value - i) < 1e-6:
+                label = np.datetime_as_string(self.timestamps[i], unit=self.unit)
+                strings.append(label.replace("T", " "))
+            else:
+                strings.append("")
+        return strings
+
+
+class HistoryPlot(pg.PlotWidget):
+    """Shows a symbol's whole price history, however long it is.
+
+    The raw closing prices are kept, and only the visible range is drawn, decimated
+    to about one point per pixel by ``downsample`` with ``method``. When the range
+    is zoomed, panned, or resized, the points are decimated again from the raw
+    prices, so zooming in shows every price and the cost of a redraw depends on the
+    plot's width rather than the history's length. Half a range on each side of the
+    visible one is also drawn, so panning does not show a gap before the redraw.
+    """
+
+    def __init__(self, parent: QtCore.QObject | None = None, method: str = "minmax"):
+        self.date_axis = TimestampAxisItem()
+        super().__init__(parent, axisItems={"bottom": self.date_axis})
+        self.method = method
+        self.values = np.empty(0)
+        self.plot_item: pg.PlotItem = self.getPlotItem()
+        self.plot_item.setLabel("left", "Close")
+        self.plot_item.showGrid(x=True, y=True, alpha=0.3)
+        self.plot_item.setMouseEnabled(x=True, y=False)
+        self.plot_item.setAutoVisible(y=True)
+        self.curve = pg.PlotCurveItem(pen=pg.mkPen(ACTUAL_COLOR, width=1))
+        self.plot_item.addItem(self.curve)
+        self.foreground = "k"
+        self.title_size = "16pt"
+        self.__redraw_timer = QtCore.QTimer(self)
+        self.__redraw_timer.setSingleShot(True)
+        self.__redraw_timer.setInterval(REDRAW_DELAY)
+        self.__redraw_timer.timeout.connect(self.redraw)
+        self.plot_item.sigXRangeChanged.connect(self.__redraw_timer.start)
+        self.plot_item.vb.sigResized.connect(self.__redraw_timer.start)
+
+    def set_history(self, symbol: str, close: pd.Series) -> None:
+        """Shows all of the closing prices, zoomed out to the whole history."""
+        self.values = close.to_numpy(dtype=np.float64)
+        self.date_axis.set_timestamps(close.index.to_numpy())
+        self.plot_item.setTitle(symbol, color=self.foreground, size=self.title_size)
+        end = max(len(self.values) - 1, 1)
+        self.plot_item.setLimits(xMin=0, xMax=end)
+        self.plot_item.setXRange(0, end, padding=0)
+        self.plot_item.enableAutoRange(y=True)
+        self.redraw()
+
+    def close(self) -> None:
+        self.__redraw_timer.stop()
+        super().close()
+
+    def redraw(self) -> None:
+        """Decimates the visible range of the prices again."""
+        self.__redraw_timer.stop()
+        low, high = self.plot_item.viewRange()[0]
+        margin = (high - low) / 2
+        width = max(1, int(self.plot_item.vb.width()))
+        positions, values = downsample(
+            self.values,
+            math.floor(low - margin),
+            math.ceil(high + margin) + 1,
+            2 * width,
+            self.method,
+        )
+        self.curve.setData(positions, values)
+
+    def set_dark_mode(self, dark_mode: bool) -> None:
+        if dark_mode:
+            background, foreground = "#2d2d30", "#e1e1e1"
+        else:
+            background, foreground = "w", "k"
+        self.setBackground(background)
+        for name in ("left", "bottom"):
+            axis = self.plot_item.getAxis(name)
+            axis.setPen(foreground)
+            axis.setTextPen(foreground)
+        self.foreground = foreground
+        self.__redraw_title()
+
+    def set_font(self, font: QtGui.QFont) -> None:
+        for name in ("left", "bottom"):
+            axis = self.plot_item.getAxis(name)
+            axis.setTickFont(font)
+            axis.label.setFont(font)
+        self.title_size = f"{font.pointSize()}pt"
+        self.__redraw_title()
+
+    def __redraw_title(self) -> None:
+        title = self.plot_item.titleLabel
+        title.setText(title.text, color=self.foreground, size=self.title_size)
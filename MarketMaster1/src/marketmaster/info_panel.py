@@ -8,7 +8,10 @@ from marketmaster.resources import light_search_icon_path
 from marketmaster.resources import light_star_icon_path
 from marketmaster.resources import search_icon_path
 from marketmaster.resources import star_icon_path
+from marketmaster.symbol_index import get_symbol_index
+from marketmaster.symbol_line_edit import add_symbols
 from marketmaster.symbol_line_edit import SymbolLineEdit
+from marketmaster.universe import UniverseMatch
 from PySide6 import QtCore
 from PySide6 import QtGui
 from PySide6 import QtWidgets
@@ -31,7 +34,12 @@ class InfoPanel(QtWidgets.QWidget):
     ):
         super().__init__()
         self.SYMBOL_TO_NAME: dict[str, str] = symbol_to_name
+        # The data provider's listing may have symbols that are not bundled, such as
+        # the synthetic provider's.
+        add_symbols(symbol_to_name)
         self.show_graph_and_info_panel = show_graph_and_info_panel
+        self.symbol: str | None = None
+        self.data: pd.Series | None = None
         self.main_window = main_window
         self.graph_menu = graph_menu
         self.layout = QtWidgets.QVBoxLayout(self)
@@ -41,8 +49,8 @@ class InfoPanel(QtWidgets.QWidget):
         top_row_layout.setAlignment(QtCore.Qt.AlignLeft)
         self.symbol_line_edit = SymbolLineEdit()
         top_row_layout.addWidget(self.symbol_line_edit)
-        self.symbol_line_edit.returnPressed.connect(self.show_graph_and_info_panel)
-        self.symbol_line_edit.returnPressed.connect(self.__load_and_show_table)
+        self.symbol_line_edit.submitted.connect(self.show_graph_and_info_panel)
+        self.symbol_line_edit.submitted.connect(self.__load_and_show_table)
         self.symbol_line_edit.setText(symbol)
         self.bookmarks: list[tuple[str, QtGui.QAction]] = self.__load_bookmarks()
         self.bookmark_action = QtGui.QAction(self)
@@ -80,9 +88,38 @@ class InfoPanel(QtWidgets.QWidget):
         )
         self.prediction_days_spin_box.setRange(1, 365)
         self.prediction_days_spin_box.setValue(5)
-        self.prediction_days_spin_box.lineEdit().returnPressed.connect(
-            self.show_graph_and_info_panel
+        # The search's scores are cached, so the graph can follow the spin box. Enter
+        # is not connected too, since it would start the same forecast again.
+        self.prediction_days_spin_box.valueChanged.connect(
+            lambda: self.show_graph_and_info_panel()
         )
+        analogs_hbox_layout = QtWidgets.QHBoxLayout()
+        self.layout.addLayout(analogs_hbox_layout)
+        self.analogs_label = QtWidgets.QLabel("analogs:")
+        self.analogs_label.setSizePolicy(
+            QtWidgets.QSizePolicy.Maximum, QtWidgets.QSizePolicy.Maximum
+        )
+        analogs_hbox_layout.addWidget(self.analogs_label)
+        self.analog_count_spin_box = QtWidgets.QSpinBox(self)
+        analogs_hbox_layout.addWidget(self.analog_count_spin_box)
+        self.analog_count_spin_box.setSizePolicy(
+            QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Minimum
+        )
+        self.analog_count_spin_box.setRange(1, 50)
+        self.analog_count_spin_box.setValue(1)
+        self.analog_count_spin_box.setToolTip(
+            "The number of similar past periods to combine into the prediction"
+        )
+        self.analog_count_spin_box.valueChanged.connect(
+            lambda: self.show_graph_and_info_panel()
+        )
+        self.universe_button = QtWidgets.QPushButton("search all of the S&&P 500")
+        self.universe_button.setToolTip(
+            "Search every S&P 500 symbol's history for periods like this symbol's"
+            " last 90 days"
+        )
+        self.universe_button.clicked.connect(lambda: self.graph_menu.search_universe())
+        self.layout.addWidget(self.universe_button)
         self.layout.addSpacing(30)
 
         self.label = QtWidgets.QLabel("Loading...")
@@ -125,6 +162,25 @@ class InfoPanel(QtWidgets.QWidget):
             QtWidgets.QHeaderView.Stretch
         )
 
+        self.universe_table = QtWidgets.QTableWidget()
+        self.layout.addWidget(self.universe_table)
+        self.universe_table.setColumnCount(3)
+        self.universe_table.setHorizontalHeaderLabels(["symbol", "date", "score"])
+        self.universe_table.verticalHeader().setVisible(False)
+        self.universe_table.horizontalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.ResizeToContents
+        )
+        self.universe_table.horizontalHeader().setStretchLastSection(True)
+        self.universe_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.universe_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.universe_table.setToolTip("Double-click a row to show its symbol")
+        self.universe_table.cellDoubleClicked.connect(
+            lambda row, _: self.graph_menu.show_graph_and_info_panel(
+                self.universe_table.item(row, 0).text()
+            )
+        )
+        self.universe_table.setVisible(False)
+
     def __key_press_event(self, event: QtGui.QKeyEvent) -> None:
         """Handles the key press event for the symbol line edit.
 
@@ -142,6 +198,32 @@ class InfoPanel(QtWidgets.QWidget):
             self.invalid_input_label.setVisible(True)
         self.original_key_press_event(event)
 
+    def show_status(self, message: str) -> None:
+        """Shows a message in place of the symbol's name, such as loading progress."""
+        self.label.setText(message)
+
+    def show_universe_matches(self, matches: list[UniverseMatch]) -> None:
+        """Shows the results of a search across all symbols, best first."""
+        self.universe_table.setRowCount(len(matches))
+        for row, match in enumerate(matches):
+            self.universe_table.setItem(
+                row, 0, QtWidgets.QTableWidgetItem(match.symbol)
+            )
+            self.universe_table.setItem(row, 1, QtWidgets.QTableWidgetItem(match.date))
+            self.universe_table.setItem(
+                row, 2, QtWidgets.QTableWidgetItem(f"{match.score:.4f}")
+            )
+        self.universe_table.setVisible(True)
+
+    def set_symbol_names(self, symbol_to_name: dict[str, str]) -> None:
+        """Replaces the symbol names and updates the header if a symbol is shown.
+
+        The symbols are also added to the ones that the symbol line edits accept.
+        """
+        self.SYMBOL_TO_NAME = symbol_to_name
+        add_symbols(symbol_to_name)
+        self.__load_and_show_table()
+
     def show_info_panel(self, symbol: str, todays_symbol_data: pd.DataFrame) -> None:
         """Loads and shows the info panel for the given symbol."""
         self.load_bookmark_star(symbol)
@@ -169,11 +251,13 @@ class InfoPanel(QtWidgets.QWidget):
 
         Depends on the ``self.symbol`` and ``self.data`` attributes.
         """
+        if self.symbol is None or self.data is None:
+            return
         self.label.setText(
             dedent(
                 f"""\
                 <h2 style="font-size: 24px">
-                    {self.SYMBOL_TO_NAME[self.symbol]}
+                    {self.SYMBOL_TO_NAME.get(self.symbol, self.symbol)}
                 </h2>
                 """
             )
@@ -199,10 +283,14 @@ class InfoPanel(QtWidgets.QWidget):
         """Sets the font for this widget and all its children."""
         self.setFont(font)
         self.days_label.setFont(font)
+        self.analogs_label.setFont(font)
         self.symbol_line_edit.setFont(font)
         self.prediction_days_spin_box.setFont(font)
+        self.analog_count_spin_box.setFont(font)
         self.label.setFont(font)
         self.table.setFont(font)
+        self.universe_button.setFont(font)
+        self.universe_table.setFont(font)
 
     def __toggle_bookmark(self) -> None:
         """Toggles the bookmark for the current symbol."""
@@ -242,7 +330,7 @@ class InfoPanel(QtWidgets.QWidget):
             )  # stable-ly remove duplicates
             bookmarks = []
             for symbol in s_bookmarks:
-                if symbol not in self.symbol_line_edit.valid_symbols:
+                if symbol not in get_symbol_index():
                     continue
                 new_action = self.__create_bookmark_action(symbol)
                 self.graph_menu.bookmarks_qmenu.addAction(new_action)
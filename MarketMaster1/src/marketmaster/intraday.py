@@ -0,0 +1,130 @@
+"""Streams bars from CSV and Parquet files and resamples them as they are read.
+
+Years of 1-minute bars take gigabytes as one DataFrame, but the analog search and
+the plots only need daily prices. ``read_chunks`` reads a file ``chunk_size`` rows
+at a time, and ``resample_chunks`` turns those chunks into bars of a coarser
+resolution, so only one chunk and the resampled bars are ever in memory.
+
+Bars must be in time order. A resampled bar is yielded once all of its rows have
+been read, so the rows of the bar that is still open at the end of a chunk are
+carried over to the next chunk.
+"""
+
+from pathlib import Path
+from typing import Iterable
+from typing import Iterator
+
+import pandas as pd
+
+# The number of rows read at a time, about 8 MB of 1-minute bars.
+CHUNK_SIZE = 100_000
+
+# How each column of the bars in one resampled bar are combined. Other columns are
+# dropped when resampling.
+AGGREGATIONS = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Adj Close": "last",
+    "Volume": "sum",
+}
+
+
+def read_chunks(
+    path: str | Path, chunk_size: int = CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Yields the rows of a CSV or Parquet file ``chunk_size`` at a time.
+
+    Each chunk is indexed by time. The time is the Parquet file's saved index, or
+    else the file's first column.
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+        chunks: Iterable[pd.DataFrame] = (batch.to_pandas() for batch in batches)
+    else:
+        chunks = pd.read_csv(path, chunksize=chunk_size)
+    for chunk in chunks:
+        if not isinstance(chunk.index, pd.DatetimeIndex):
+            chunk = chunk.set_index(chunk.columns[0])
+            chunk.index = pd.to_datetime(chunk.index)
+        chunk.index.name = "Date"
+        yield chunk
+
+
+def is_intraday(index: pd.DatetimeIndex) -> bool:
+    """Returns whether any of the times is not at midnight."""
+    return bool((index != index.normalize()).any())
+
+
+def resample_chunks(
+    chunks: Iterable[pd.DataFrame], rule: str = "1D"
+) -> Iterator[pd.DataFrame]:
+    """Yields the bars of the chunks resampled to the resolution ``rule``.
+
+    ``rule`` is a fixed frequency such as "5min", "1h", or "1D", and each bar is
+    labeled with the start of its period. Periods without any rows are skipped, so
+    nights and weekends do not become empty bars.
+
+    Raises ValueError if the rows are not in time order.
+    """
+    carried: pd.DataFrame | None = None
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if not chunk.index.is_monotonic_increasing or (
+            carried is not None and chunk.index[0] < carried.index[-1]
+        ):
+            raise ValueError("The bars are not in time order.")
+        if carried is not None:
+            chunk = pd.concat([carried, chunk])
+        keys = chunk.index.floor(rule)
+        complete = keys < keys[-1]
+        carried = chunk[~complete]
+        if complete.any():
+            yield _aggregate(chunk[complete], keys[complete])
+    if carried is not None:
+        yield _aggregate(carried, carried.index.floor(rule))
+
+
+def load_bars(
+    path: str | Path,
+    rule: str | None = "1D",
+    start=None,
+    chunk_size: int = CHUNK_SIZE,
+) -> pd.DataFrame:
+    """Reads a file's bars from ``start`` onward, resampled to ``rule`` as they are
+    read.
+
+    If ``rule`` is None, or the file's first chunk has only daily bars, the bars are
+    not resampled.
+    """
+    chunks = read_chunks(path, chunk_size)
+    if start is not None:
+        start = pd.Timestamp(start)
+        chunks = (chunk[chunk.index >= start] for chunk in chunks)
+    chunks = (chunk for chunk in chunks if not chunk.empty)
+    first = next(chunks, None)
+    if first is None:
+        return pd.DataFrame(
+            columns=list(AGGREGATIONS), index=pd.DatetimeIndex([], name="Date")
+        )
+    chunks = _prepend(first, chunks)
+    if rule is not None and is_intraday(first.index):
+        chunks = resample_chunks(chunks, rule)
+    return pd.concat(list(chunks))
+
+
+def _aggregate(rows: pd.DataFrame, keys: pd.DatetimeIndex) -> pd.DataFrame:
+    columns = {c: f for c, f in AGGREGATIONS.items() if c in rows.columns}
+    bars = rows[list(columns)].groupby(keys).agg(columns)
+    bars.index.name = "Date"
+    return bars
+
+
+def _prepend(first: pd.DataFrame, chunks: Iterator[pd.DataFrame]):
+    yield first
+    yield from chunks
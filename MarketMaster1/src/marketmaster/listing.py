@@ -0,0 +1,52 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+
+# Index constituents rarely change, so the listing is downloaded at most weekly.
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+
+
+def read_symbol_names(path: str | Path) -> dict[str, str]:
+    """Returns the saved symbol-to-name dictionary, even if it is stale.
+
+    Returns an empty dictionary if there is no saved listing.
+    """
+    try:
+        with open(path, "r", encoding="utf8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_stale(path: str | Path, max_age: float = DEFAULT_MAX_AGE) -> bool:
+    """Returns whether the saved listing is missing or older than ``max_age``."""
+    try:
+        return time.time() - Path(path).stat().st_mtime > max_age
+    except FileNotFoundError:
+        return True
+
+
+def download_symbol_names(
+    path: str | Path,
+    fetch_listing: Callable[[str], pd.DataFrame],
+    market: str = "S&P500",
+) -> dict[str, str]:
+    """Downloads the market's symbol-to-name dictionary and saves it.
+
+    ``fetch_listing`` must work like ``FinanceDataReader.StockListing``.
+    """
+    symbol_to_name: dict[str, str] = (
+        fetch_listing(market).set_index("Symbol")["Name"].to_dict()
+    )
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temporary_path, "w", encoding="utf8") as file:
+        json.dump(symbol_to_name, file)
+    os.replace(temporary_path, path)
+    return symbol_to_name
@@ -1,6 +1,7 @@
+import importlib
 from textwrap import dedent
+from typing import TYPE_CHECKING
 
-from marketmaster.graph_menu import GraphMenu
 from marketmaster.resources import folder_icon_path
 from marketmaster.resources import history_icon_path
 from marketmaster.resources import left_arrow_icon_path
@@ -15,14 +16,48 @@ from marketmaster.settings_menu import SettingsMenu
 from marketmaster.start_menu import StartMenu
 from marketmaster.styles import dark_mode_stylesheet
 from marketmaster.styles import light_mode_stylesheet
+from marketmaster.symbol_line_edit import add_symbols
+from marketmaster.timing import span
+from marketmaster.timing import write_trace_on_exit
 from PySide6 import QtCore
 from PySide6 import QtGui
 from PySide6 import QtWidgets
 
+if TYPE_CHECKING:
+    # The graph menu imports pandas, pyqtgraph, and more, which take seconds and
+    # are not needed until a symbol is submitted.
+    from marketmaster.graph_menu import GraphMenu
+    from marketmaster.timing_overlay import TimingOverlay
+
 
 VERSION = "1.0.0"
 
 
+class PreloadSignals(QtCore.QObject):
+    symbols_loaded = QtCore.Signal(list)
+
+
+class GraphMenuPreloader(QtCore.QRunnable):
+    """Imports the graph menu's module and loads the data provider's symbols in a
+    thread pool.
+
+    If the graph menu is needed before the import finishes, Python's import lock
+    makes the GUI thread wait for it instead of importing the module twice.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.signals = PreloadSignals()
+
+    def run(self) -> None:
+        graph_menu = importlib.import_module("marketmaster.graph_menu")
+        try:
+            symbol_to_name = graph_menu.load_symbol_names()
+        except Exception:
+            return  # The graph menu downloads the listing again when it is shown.
+        self.signals.symbols_loaded.emit(list(symbol_to_name))
+
+
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
@@ -30,21 +65,35 @@ class MainWindow(QtWidgets.QMainWindow):
         qApp.aboutToQuit.connect(self.__on_quit)  # type: ignore # noqa: F821
         self.close_shortcut = QtGui.QShortcut(QtGui.QKeySequence("Ctrl+W"), self)
         self.close_shortcut.activated.connect(self.close)
+        self.timing_overlay: "TimingOverlay | None" = None
+        self.timing_overlay_shortcut = QtGui.QShortcut(
+            QtGui.QKeySequence("Ctrl+Shift+T"), self
+        )
+        self.timing_overlay_shortcut.activated.connect(self.toggle_timing_overlay)
+        if QtCore.QSettings().value("debug/timing_overlay", False, type=bool):
+            self.toggle_timing_overlay()
+        # Importing in the background after the start menu is shown makes the graph
+        # menu appear sooner without delaying the start menu. The data provider's
+        # symbols, which may not be bundled, are loaded then too.
+        QtCore.QTimer.singleShot(100, self.__preload_graph_menu)
 
     def init_ui(self) -> None:
-        self.setWindowTitle("MarketMaster")
-        self.central_widget = QtWidgets.QStackedWidget()
-        self.setCentralWidget(self.central_widget)
-        settings = QtCore.QSettings()
-        if settings.contains("dark_mode"):
-            self.start_menu = StartMenu(self, bool(settings.value("dark_mode")))
-        else:
-            self.start_menu = StartMenu(self, dark_mode=True)
-        self.central_widget.addWidget(self.start_menu)
-        self.graph_menu: GraphMenu | None = None
-        self.settings_menu: SettingsMenu | None = None
-        self.central_widget.setCurrentWidget(self.start_menu)
-        self.__load_settings_and_show_window()
+        with span("startup.init_ui"):
+            self.setWindowTitle("MarketMaster")
+            self.central_widget = QtWidgets.QStackedWidget()
+            self.setCentralWidget(self.central_widget)
+            settings = QtCore.QSettings()
+            with span("startup.start_menu"):
+                if settings.contains("dark_mode"):
+                    self.start_menu = StartMenu(self, bool(settings.value("dark_mode")))
+                else:
+                    self.start_menu = StartMenu(self, dark_mode=True)
+            self.central_widget.addWidget(self.start_menu)
+            self.graph_menu: "GraphMenu | None" = None
+            self.settings_menu: SettingsMenu | None = None
+            self.central_widget.setCurrentWidget(self.start_menu)
+            with span("startup.show_window"):
+                self.__load_settings_and_show_window()
 
     def show_graph_menu(self, symbol: str | None = None) -> None:
         if self.graph_menu is None:
@@ -52,16 +101,30 @@ class MainWindow(QtWidgets.QMainWindow):
                 raise ValueError(
                     "symbol must be provided when creating a new graph menu"
                 )
+            with span("startup.import_graph_menu"):
+                from marketmaster.graph_menu import GraphMenu
+
             settings = QtCore.QSettings()
-            if settings.contains("dark_mode"):
-                self.graph_menu = GraphMenu(
-                    symbol, self, bool(settings.value("dark_mode"))
-                )
-            else:
-                self.graph_menu = GraphMenu(symbol, self, dark_mode=True)
+            with span("startup.graph_menu", symbol=symbol):
+                if settings.contains("dark_mode"):
+                    self.graph_menu = GraphMenu(
+                        symbol, self, bool(settings.value("dark_mode"))
+                    )
+                else:
+                    self.graph_menu = GraphMenu(symbol, self, dark_mode=True)
             self.central_widget.addWidget(self.graph_menu)
         self.central_widget.setCurrentWidget(self.graph_menu)
 
+    def __preload_graph_menu(self) -> None:
+        """Imports the graph menu's module and loads the symbols in a thread pool."""
+        preloader = GraphMenuPreloader()
+        preloader.signals.symbols_loaded.connect(self.__add_symbols)
+        QtCore.QThreadPool.globalInstance().start(preloader)
+
+    def __add_symbols(self, symbols: list[str]) -> None:
+        """Lets the symbol line edits accept the data provider's symbols."""
+        add_symbols(symbols)
+
     def show_settings_menu(self) -> None:
         if self.settings_menu is None:
             settings = QtCore.QSettings()
@@ -74,6 +137,17 @@ class MainWindow(QtWidgets.QMainWindow):
             self.central_widget.addWidget(self.settings_menu)
         self.central_widget.setCurrentWidget(self.settings_menu)
 
+    def toggle_timing_overlay(self) -> None:
+        """Shows or hides the list of the latest timing spans (Ctrl+Shift+T)."""
+        if self.timing_overlay is None:
+            from marketmaster.timing_overlay import TimingOverlay
+
+            self.timing_overlay = TimingOverlay(self)
+            self.timing_overlay.hide()
+        visible = not self.timing_overlay.isVisible()
+        self.timing_overlay.setVisible(visible)
+        QtCore.QSettings().setValue("debug/timing_overlay", visible)
+
     def show_about_dialog(self) -> None:
         msg = QtWidgets.QMessageBox()
         msg.setText(
@@ -133,6 +207,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 QtGui.QIcon(light_search_icon_path)
             )
             self.graph_menu.info_panel.load_bookmark_star()
+            self.graph_menu.plot.set_dark_mode(True)
+            self.graph_menu.history_plot.set_dark_mode(True)
         if self.settings_menu is not None:
             self.settings_menu.back_button.setIcon(
                 QtGui.QIcon(light_left_arrow_icon_path)
@@ -152,6 +228,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 QtGui.QIcon(search_icon_path)
             )
             self.graph_menu.info_panel.load_bookmark_star()
+            self.graph_menu.plot.set_dark_mode(False)
+            self.graph_menu.history_plot.set_dark_mode(False)
         if self.settings_menu is not None:
             self.settings_menu.back_button.setIcon(QtGui.QIcon(left_arrow_icon_path))
 
@@ -174,3 +252,4 @@ class MainWindow(QtWidgets.QMainWindow):
         Other code may run for a short time after this method runs.
         """
         self.__save_window_geometry()
+        write_trace_on_exit()
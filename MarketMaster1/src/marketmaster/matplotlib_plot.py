@@ -0,0 +1,63 @@
+import matplotlib
+import matplotlib.pyplot as plt
+from marketmaster.forecast import Forecast
+from pyqtgraph.widgets.MatplotlibWidget import MatplotlibWidget
+from PySide6 import QtGui
+
+matplotlib.use("Qt5Agg")
+
+plt.rcParams["figure.figsize"] = (14, 8)
+plt.rcParams["font.size"] = 16
+plt.rcParams["lines.linewidth"] = 2
+plt.rcParams["axes.grid"] = True
+plt.rcParams["axes.axisbelow"] = True
+
+
+class MatplotlibForecastPlot(MatplotlibWidget):
+    """Shows a forecast with Matplotlib.
+
+    The figure is rebuilt for each forecast, which is slower than ``ForecastPlot``
+    but looks the same as an exported Matplotlib figure.
+    """
+
+    def show_forecast(self, forecast: Forecast) -> None:
+        figure = self.getFigure()
+        figure.clear()  # clear the graph's title
+        subplot = figure.add_subplot(1, 1, 1)
+        subplot.set_title(forecast.symbol)
+        subplot.set_ylabel("Normalized Price")
+        handles = subplot.plot(forecast.dates, forecast.actual, forecast.predicted)
+        labels = ["actual", "predicted"]
+        subplot.tick_params(axis="x", labelrotation=30, labelsize=10)
+        subplot.xaxis.set_major_locator(plt.MaxNLocator(10))
+        handles.append(
+            subplot.axvline(
+                x=len(forecast.actual) - 1, c="r", linestyle="--", label="today"
+            )
+        )
+        labels.append("today")
+        subplot.axvspan(
+            len(forecast.actual) - 1,
+            len(forecast.predicted) - 1,
+            facecolor="yellow",
+            alpha=0.3,
+        )
+        if forecast.low is not None:
+            handles.append(
+                subplot.fill_between(
+                    range(len(forecast.predicted)),
+                    forecast.low,
+                    forecast.high,
+                    color="tab:orange",
+                    alpha=0.25,
+                )
+            )
+            labels.append(f"{forecast.analog_count} analogs, 10th to 90th percentile")
+        subplot.legend(handles, labels)
+        self.draw()  # required for changing from one graph to another
+
+    def set_dark_mode(self, dark_mode: bool) -> None:
+        pass  # The figure's colors do not change with the app's.
+
+    def set_font(self, font: QtGui.QFont) -> None:
+        pass  # The figure uses Matplotlib's font settings.
@@ -0,0 +1,181 @@
+import heapq
+import itertools
+from typing import Iterable
+
+from marketmaster.forecast import get_base
+from marketmaster.price_cache import PriceCache
+from marketmaster.price_store import PriceStore
+from marketmaster.score_cache import ScoreCache
+from PySide6 import QtCore
+
+
+# QThreadPool runs queued runnables with higher priorities first, so work the user
+# asked for is started before any queued prefetching.
+REQUEST_PRIORITY = 1
+PREFETCH_PRIORITY = 0
+
+BOOKMARK_PRIORITY = 0
+HISTORY_PRIORITY = 1
+
+
+class PrefetchQueue:
+    """A priority queue of symbols, lowest priority number first.
+
+    Pushing a symbol that is already queued only changes its priority if the new
+    priority is more urgent. Symbols with equal priorities are popped in the order
+    they were pushed.
+    """
+
+    def __init__(self):
+        self.__heap: list[tuple[int, int, str]] = []
+        self.__entries: dict[str, tuple[int, int]] = {}
+        self.__counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.__entries
+
+    def push(self, symbol: str, priority: int) -> None:
+        if symbol in self.__entries and self.__entries[symbol][0] <= priority:
+            return
+        entry = (priority, next(self.__counter))
+        self.__entries[symbol] = entry
+        heapq.heappush(self.__heap, (*entry, symbol))
+
+    def pop(self) -> str:
+        """Removes and returns the most urgent symbol.
+
+        Raises IndexError if the queue is empty.
+        """
+        while self.__heap:
+            priority, count, symbol = heapq.heappop(self.__heap)
+            # Entries replaced by a more urgent push or discarded are skipped.
+            if self.__entries.get(symbol) == (priority, count):
+                del self.__entries[symbol]
+                return symbol
+        raise IndexError("pop from an empty PrefetchQueue")
+
+    def discard(self, symbol: str) -> None:
+        self.__entries.pop(symbol, None)
+
+
+class PrefetchSignals(QtCore.QObject):
+    finished = QtCore.Signal(str)
+
+
+class PrefetchWorker(QtCore.QRunnable):
+    """Brings one symbol's cached prices up to date.
+
+    With a ``PriceStore``, the prices are also kept in memory. With a
+    ``score_cache``, the similarity scores of the symbol's last 90 days are computed
+    too, so that opening the symbol only has to find its analogs.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        price_cache: PriceCache | PriceStore,
+        score_cache: ScoreCache | None = None,
+    ):
+        super().__init__()
+        self.symbol = symbol
+        self.price_cache = price_cache
+        self.score_cache = score_cache
+        self.signals = PrefetchSignals()
+
+    def run(self) -> None:
+        try:
+            if self.score_cache is not None:
+                close = self.price_cache.read(self.symbol)["Close"]
+                self.score_cache.get(
+                    self.symbol, close.to_numpy(), len(get_base(close))
+                )
+            elif not self.price_cache.is_fresh(self.symbol):
+                self.price_cache.read(self.symbol)
+        except Exception:
+            pass  # The symbol will be downloaded again if the user asks for it.
+        self.signals.finished.emit(self.symbol)
+
+
+class Prefetcher(QtCore.QObject):
+    """Loads the prices of symbols the user is likely to open next.
+
+    Prefetching only runs while the app is idle: each job the user starts must call
+    ``pause``, and pass the returned token to ``resume`` when the job finishes or is
+    canceled. Prefetching starts again ``idle_delay`` milliseconds after the last
+    token is released. At most
+    ``max_concurrent`` symbols are prefetched at once so that threads stay free for
+    the user's requests. With a ``score_cache``, the symbols' similarity scores are
+    computed as well.
+    """
+
+    prefetched = QtCore.Signal(str)
+
+    def __init__(
+        self,
+        price_cache: PriceCache | PriceStore,
+        max_concurrent: int = 2,
+        idle_delay: int = 2000,
+        parent: QtCore.QObject | None = None,
+        score_cache: ScoreCache | None = None,
+    ):
+        super().__init__(parent)
+        self.price_cache = price_cache
+        self.score_cache = score_cache
+        self.max_concurrent = max_concurrent
+        self.queue = PrefetchQueue()
+        self.__running: set[str] = set()
+        self.__pauses: set[int] = set()
+        self.__pause_ids = itertools.count()
+        self.__idle_timer = QtCore.QTimer(self)
+        self.__idle_timer.setSingleShot(True)
+        self.__idle_timer.setInterval(idle_delay)
+        self.__idle_timer.timeout.connect(self.__start_workers)
+
+    def prefetch(self, symbols: Iterable[str], priority: int) -> None:
+        """Queues the symbols to be prefetched when the app is idle."""
+        for symbol in symbols:
+            if symbol not in self.__running:
+                self.queue.push(symbol, priority)
+        if not self.__pauses and not self.__idle_timer.isActive():
+            self.__idle_timer.start()
+
+    def pause(self, requested_symbol: str | None = None) -> int:
+        """Stops starting prefetch workers until the returned token is passed to
+        ``resume``, and every other job's token too.
+
+        Workers that already started are allowed to finish.
+        """
+        token = next(self.__pause_ids)
+        self.__pauses.add(token)
+        self.__idle_timer.stop()
+        if requested_symbol is not None:
+            self.queue.discard(requested_symbol)
+        return token
+
+    def resume(self, token: int) -> None:
+        """Releases a token returned by ``pause``. Releasing it again does nothing."""
+        if token not in self.__pauses:
+            return
+        self.__pauses.remove(token)
+        if not self.__pauses:
+            self.__idle_timer.start()
+
+    def __start_workers(self) -> None:
+        while (
+            not self.__pauses
+            and self.queue
+            and len(self.__running) < self.max_concurrent
+        ):
+            symbol = self.queue.pop()
+            self.__running.add(symbol)
+            worker = PrefetchWorker(symbol, self.price_cache, self.score_cache)
+            worker.signals.finished.connect(self.__on_worker_finished)
+            QtCore.QThreadPool.globalInstance().start(worker, PREFETCH_PRIORITY)
+
+    def __on_worker_finished(self, symbol: str) -> None:
+        self.__running.discard(symbol)
+        self.prefetched.emit(symbol)
+        self.__start_workers()
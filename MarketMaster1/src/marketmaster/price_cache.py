@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+from typing import Generator
+from typing import Iterable
+from urllib.parse import quote
+
+import pandas as pd
+from marketmaster.downloader import call_with_retries
+from marketmaster.downloader import map_unordered
+from marketmaster.timing import span
+
+
+class PriceCache:
+    """Keeps each symbol's price history in a Parquet file.
+
+    A cached history older than ``max_age`` seconds is brought up to date by fetching
+    only the prices from its last date onward. The last date is fetched again because
+    its prices may have been saved before the market closed.
+
+    When the files take more than ``max_bytes``, the least recently read ones are
+    deleted.
+
+    ``fetch`` must accept a symbol and an optional ``start`` date, like
+    ``FinanceDataReader.DataReader``. A fetch that fails with a connection error, a
+    timeout, or a busy server's response is retried up to ``retries`` times with the
+    downloader's backoff, whichever data provider ``fetch`` belongs to.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        fetch: Callable[..., pd.DataFrame],
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age: float = 15 * 60,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fetch = fetch
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.retries = retries
+        self.backoff = backoff
+
+    def read(self, symbol: str) -> pd.DataFrame:
+        """Returns the symbol's price history, downloading only what is missing."""
+        path = self.__get_path(symbol)
+        try:
+            with span("prices.read_cache", symbol=symbol):
+                data = pd.read_parquet(path)
+            modified = path.stat().st_mtime
+        except (OSError, ValueError):
+            with span("prices.fetch", symbol=symbol):
+                data = self.__fetch(symbol)
+            self.__write(path, data)
+            return data
+        if data.empty or time.time() - modified > self.max_age:
+            with span("prices.refresh", symbol=symbol):
+                data = self.__refresh(symbol, data)
+            self.__write(path, data)
+        else:
+            # The access time is used to choose which files to evict first.
+            os.utime(path, (time.time(), modified))
+        return data
+
+    def read_many(
+        self, symbols: Iterable[str], max_concurrent: int = 8
+    ) -> Generator[tuple[str, pd.DataFrame | Exception], None, None]:
+        """Reads many symbols' price histories like ``read``, ``max_concurrent`` at a
+        time, and yields each symbol as soon as it is read.
+
+        Each symbol is yielded with its prices, or with the exception that reading
+        it raised, so one failed download does not stop the others.
+        """
+        return map_unordered(self.read, symbols, max_concurrent)
+
+    def is_fresh(self, symbol: str) -> bool:
+        """Returns whether the symbol's cached prices can be read without a download."""
+        try:
+            modified = self.__get_path(symbol).stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - modified <= self.max_age
+
+    def clear(self) -> None:
+        """Deletes all the cached price histories."""
+        for path in self.directory.glob("*.parquet"):
+            path.unlink(missing_ok=True)
+
+    def __refresh(self, symbol: str, data: pd.DataFrame) -> pd.DataFrame:
+        """Appends the prices from the last cached date onward."""
+        if data.empty:
+            return self.__fetch(symbol)
+        new_data = self.__fetch(symbol, start=data.index[-1])
+        if new_data.empty:
+            return data
+        return pd.concat([data[data.index < new_data.index[0]], new_data])
+
+    def __fetch(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return call_with_retries(
+            lambda: self.fetch(symbol, **kwargs), self.retries, self.backoff
+        )
+
+    def __write(self, path: Path, data: pd.DataFrame) -> None:
+        # Writing to a temporary file first prevents other readers from seeing a
+        # partly written file.
+        temporary_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        data.to_parquet(temporary_path)
+        os.replace(temporary_path, path)
+        self.__evict(keep=path)
+
+    def __evict(self, keep: Path) -> None:
+        """Deletes the least recently read files until the cache fits its size limit."""
+        paths = []
+        total_bytes = 0
+        for path in self.directory.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            paths.append((stat.st_atime, stat.st_size, path))
+            total_bytes += stat.st_size
+        for _, size, path in sorted(paths):
+            if total_bytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+
+    def __get_path(self, symbol: str) -> Path:
+        # Symbols such as "S&P500" or "BRK/B" are not always valid file names.
+        return self.directory / f"{quote(symbol, safe='')}.parquet"
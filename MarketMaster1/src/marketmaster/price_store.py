@@ -0,0 +1,189 @@
+"""Keeps recently read price histories in memory in a compact form.
+
+A price history read from the price cache is a DataFrame of float64 columns with a
+datetime index, but the forecast only needs the closing prices and the info panel
+and watchlist only need the last row. A ``PriceHistory`` keeps the same prices in a
+few contiguous arrays: a float32 row per price column, int64 volumes, and an int32
+day index, a little more than half the memory of the DataFrame. ``PriceStore`` keeps the
+histories of recently used symbols under a byte budget, so that the watchlist and
+prefetching can load hundreds of symbols without the app's memory growing with
+them.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Generator
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from marketmaster.downloader import map_unordered
+from marketmaster.price_cache import PriceCache
+
+# The columns kept as float32, in the order of the price cache's DataFrames. Other
+# columns, except Volume, are dropped.
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Adj Close")
+
+
+class PriceHistory:
+    """A symbol's daily prices in contiguous arrays.
+
+    ``days`` is each price's date as the number of days since 1970-01-01,
+    ``prices`` has one float32 row per column in ``columns``, and ``volume`` is the
+    Volume column as int64, or None if there was none. float32 keeps about 7
+    significant digits, so the last row's prices are also kept as they were read for
+    the info panel's table.
+    """
+
+    __slots__ = ("columns", "days", "prices", "volume", "last_prices")
+
+    def __init__(
+        self,
+        columns: tuple[str, ...],
+        days: np.ndarray,
+        prices: np.ndarray,
+        volume: np.ndarray | None,
+        last_prices: np.ndarray,
+    ):
+        self.columns = columns
+        self.days = days
+        self.prices = prices
+        self.volume = volume
+        self.last_prices = last_prices
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> "PriceHistory":
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        days = index.to_numpy().astype("datetime64[D]").astype(np.int32)
+        columns = tuple(c for c in PRICE_COLUMNS if c in data.columns)
+        prices = np.empty((len(columns), len(data)), dtype=np.float32)
+        for i, column in enumerate(columns):
+            prices[i] = data[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        volume = None
+        if "Volume" in data.columns:
+            volume = np.nan_to_num(
+                data["Volume"].to_numpy(dtype=np.float64, na_value=np.nan)
+            ).astype(np.int64)
+        last_prices = np.array(
+            [data[c].iloc[-1] if len(data) else np.nan for c in columns], np.float64
+        )
+        return cls(columns, days, prices, volume, last_prices)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def nbytes(self) -> int:
+        volume_bytes = 0 if self.volume is None else self.volume.nbytes
+        return (
+            self.days.nbytes
+            + self.prices.nbytes
+            + volume_bytes
+            + self.last_prices.nbytes
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the prices as a DataFrame like the price cache's, with float64
+        prices.
+        """
+        index = pd.DatetimeIndex(self.days.astype("datetime64[D]"), name="Date")
+        columns: dict[str, np.ndarray] = {}
+        for i, column in enumerate(self.columns):
+            values = self.prices[i].astype(np.float64)
+            if len(values):
+                values[-1] = self.last_prices[i]
+            columns[column] = values
+        if self.volume is not None:
+            columns["Volume"] = self.volume.copy()
+        return pd.DataFrame(columns, index=index)
+
+
+class PriceStore:
+    """Keeps the ``PriceHistory`` of recently read symbols in memory.
+
+    A symbol that is not in memory, or was read more than the price cache's
+    ``max_age`` ago, is read from ``price_cache``, which downloads what is missing.
+    When the histories take more than ``max_bytes``, the least recently used ones
+    are evicted.
+
+    ``read``, ``read_many``, and ``is_fresh`` work like the price cache's, so the
+    store can be passed to the workers and the prefetcher in its place. The store
+    can be used from several threads.
+    """
+
+    def __init__(self, price_cache: PriceCache, max_bytes: int = 64 * 1024 * 1024):
+        self.price_cache = price_cache
+        self.max_bytes = max_bytes
+        self.__entries: OrderedDict[str, tuple[float, PriceHistory]] = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.__entries
+
+    @property
+    def size(self) -> int:
+        """The number of bytes the histories take."""
+        return self.__size
+
+    def get(self, symbol: str) -> PriceHistory:
+        """Returns the symbol's price history, reading it only if it is not in
+        memory or is out of date.
+        """
+        with self.__lock:
+            entry = self.__entries.get(symbol)
+            if entry is not None and self.__is_fresh(entry):
+                self.__entries.move_to_end(symbol)
+                return entry[1]
+        # The prices are read outside the lock so that other symbols are not kept
+        # waiting for a download.
+        loaded_at = time.time()
+        history = PriceHistory.from_frame(self.price_cache.read(symbol))
+        with self.__lock:
+            old_entry = self.__entries.pop(symbol, None)
+            if old_entry is not None:
+                self.__size -= old_entry[1].nbytes
+            self.__entries[symbol] = (loaded_at, history)
+            self.__size += history.nbytes
+            self.__evict()
+        return history
+
+    def read(self, symbol: str) -> pd.DataFrame:
+        """Returns the symbol's price history as a DataFrame, like
+        ``PriceCache.read``.
+        """
+        return self.get(symbol).to_frame()
+
+    def read_many(
+        self, symbols: Iterable[str], max_concurrent: int = 8
+    ) -> Generator[tuple[str, pd.DataFrame | Exception], None, None]:
+        """Reads many symbols' prices like ``PriceCache.read_many``, yielding each
+        symbol as soon as it is read.
+        """
+        return map_unordered(self.read, symbols, max_concurrent)
+
+    def is_fresh(self, symbol: str) -> bool:
+        """Returns whether the symbol's prices are in memory and up to date."""
+        with self.__lock:
+            entry = self.__entries.get(symbol)
+            return entry is not None and self.__is_fresh(entry)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def __is_fresh(self, entry: tuple[float, PriceHistory]) -> bool:
+        return time.time() - entry[0] <= self.price_cache.max_age
+
+    def __evict(self) -> None:
+        # The newest history is kept even if it alone takes more than max_bytes.
+        while self.__size > self.max_bytes and len(self.__entries) > 1:
+            _, (_, history) = self.__entries.popitem(last=False)
+            self.__size -= history.nbytes
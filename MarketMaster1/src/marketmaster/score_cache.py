@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from marketmaster.similarity import IncrementalScores
+
+METRICS = ("cosine",)
+
+
+class _Entry:
+    """A symbol's incremental scores."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state: IncrementalScores | None = None
+        self.nbytes = 0
+
+
+class ScoreCache:
+    """Keeps the similarity scores of recently searched price histories in memory.
+
+    Each symbol, window size, and similarity metric has an ``IncrementalScores``, so
+    when new prices are appended to a symbol's history, only the new windows and the
+    new base's dot products are computed instead of every score. Scores are reused
+    as they are while the prices are unchanged, and changing the number of days to
+    predict reuses them too. A revised last price, such as one downloaded again
+    after the market closed, is updated like a new one. When the cached states take
+    more than ``max_bytes``, the least recently used ones are evicted.
+
+    The cache can be used from several threads. Returned arrays are read-only because
+    they are shared.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.__entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def size(self) -> int:
+        """The number of bytes the cached scores take."""
+        return self.__size
+
+    def get(
+        self,
+        symbol: str,
+        close: np.ndarray,
+        window_size: int,
+        metric: str = "cosine",
+    ) -> np.ndarray:
+        """Returns the scores of every window of ``close`` against its last
+        ``window_size`` prices, computing only what is not cached.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric!r}")
+        key = (symbol, window_size, metric)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                entry = self.__entries[key] = _Entry()
+            self.__entries.move_to_end(key)
+        # Scores are computed outside the cache's lock so that other symbols are not
+        # kept waiting.
+        with entry.lock:
+            if entry.state is None:
+                entry.state = IncrementalScores(close, window_size)
+                scores = entry.state.scores
+            else:
+                # Returns the cached scores if the prices did not change.
+                scores = entry.state.update(close)
+            nbytes = entry.state.nbytes
+        with self.__lock:
+            # The entry may have been evicted by another thread in the meantime.
+            if self.__entries.get(key) is entry:
+                self.__size += nbytes - entry.nbytes
+                entry.nbytes = nbytes
+                self.__evict()
+        return scores
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def __evict(self) -> None:
+        # The newest scores are kept even if they alone take more than max_bytes.
+        while self.__size > self.max_bytes and len(self.__entries) > 1:
+            _, entry = self.__entries.popitem(last=False)
+            self.__size -= entry.nbytes
@@ -0,0 +1,450 @@
+"""Analog search over a history of closing prices.
+
+Each window of the history is min-max normalized and compared with the normalized
+base pattern using cosine similarity. The window with the highest similarity is the
+analog whose continuation is used as the prediction. The continuations of several of
+the best analogs can also be combined into percentile bands.
+
+Two methods compute the same scores:
+
+* ``"direct"`` normalizes each window and multiplies it with the base, which costs
+  O(N * W) for N prices and a base of W prices.
+* ``"fft"`` computes every window's dot product with the base at once by FFT
+  convolution and gets each window's norm from cumulative sums, which costs
+  O(N log N). This is the approach of the MASS algorithm for matrix profiles.
+
+``"auto"`` picks whichever is faster for the base's size. Run
+``benchmarks/bench_similarity.py`` to see where the methods cross over.
+
+When a history grows by a price at a time, ``IncrementalScores`` updates the
+previous scores in O(N) instead of computing them again.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# The number of windows scored per batch by the direct method. Larger batches are
+# faster but need more temporary memory (CHUNK_SIZE * window_size floats).
+CHUNK_SIZE = 4096
+
+# The smallest base size for which the "auto" method uses FFT.
+AUTO_FFT_WINDOW_SIZE = 32
+
+METHODS = ("auto", "direct", "fft")
+
+# ``IncrementalScores`` computes its state again after this many updates, so that
+# rounding errors cannot build up, or when more prices than this changed at once.
+REBUILD_INTERVAL = 256
+MAX_UPDATE_STEPS = 32
+
+
+def min_max_normalize(values: np.ndarray) -> np.ndarray:
+    """Scales the values along the last axis to the range [0, 1]."""
+    low = values.min(axis=-1, keepdims=True)
+    return (values - low) / (values.max(axis=-1, keepdims=True) - low)
+
+
+def rolling_min(values: np.ndarray, window_size: int) -> np.ndarray:
+    """Returns the minimum of every window of the values in O(N) time.
+
+    This is the van Herk/Gil-Werman algorithm: the values are split into blocks of
+    ``window_size`` and each window's minimum is the smaller of a suffix minimum of
+    one block and a prefix minimum of the next.
+    """
+    length = len(values)
+    padding = np.full(-length % window_size, np.inf)
+    blocks = np.concatenate([values, padding]).reshape(-1, window_size)
+    prefix = np.minimum.accumulate(blocks, axis=1).ravel()
+    suffix = np.minimum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    count = length - window_size + 1
+    last = window_size - 1
+    return np.minimum(suffix[:count], prefix[last:length])
+
+
+def rolling_max(values: np.ndarray, window_size: int) -> np.ndarray:
+    """Returns the maximum of every window of the values in O(N) time."""
+    return -rolling_min(-values, window_size)
+
+
+def sliding_dot_products(values: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Returns the dot product of the query with every window of the values.
+
+    Uses FFT convolution, so this takes O(N log N) time regardless of the query's
+    size.
+    """
+    length, window_size = len(values), len(query)
+    fft_size = 1 << (length + window_size - 2).bit_length()
+    products = np.fft.irfft(
+        np.fft.rfft(values, fft_size) * np.fft.rfft(query[::-1], fft_size), fft_size
+    )
+    return products[window_size - 1 : length]  # noqa: E203
+
+
+def cosine_similarities(
+    close: np.ndarray, base: np.ndarray, count: int | None = None, method: str = "auto"
+) -> np.ndarray:
+    """Compares the base pattern with every window of the closing prices.
+
+    The i-th score is the cosine similarity of the normalized base and the normalized
+    ``close[i : i + len(base)]``. Only the first ``count`` windows are scored if
+    ``count`` is given. Windows with a constant price have a score of NaN.
+
+    ``method`` is one of ``METHODS``; see the module's docstring.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method: {method!r}")
+    close = np.asarray(close, dtype=np.float64)
+    base_norm = min_max_normalize(np.asarray(base, dtype=np.float64))
+    if method == "auto":
+        method = "fft" if len(base_norm) >= AUTO_FFT_WINDOW_SIZE else "direct"
+    if method == "fft":
+        return _fft_cosine_similarities(close, base_norm)[:count]
+    windows = sliding_window_view(close, len(base_norm))
+    if count is not None:
+        windows = windows[:count]
+    base_length = np.sqrt(base_norm @ base_norm)
+    scores = np.empty(len(windows))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for start in range(0, len(windows), CHUNK_SIZE):
+            chunk = windows[start : start + CHUNK_SIZE]  # noqa: E203
+            # Dividing each window by its range would not change its cosine
+            # similarity, so only the shift is needed.
+            shifted = chunk - chunk.min(axis=1, keepdims=True)
+            lengths = np.sqrt(np.einsum("ij,ij->i", shifted, shifted))
+            scores[start : start + len(chunk)] = (  # noqa: E203
+                shifted @ base_norm / (base_length * lengths)
+            )
+    return scores
+
+
+def _fft_cosine_similarities(close: np.ndarray, base_norm: np.ndarray) -> np.ndarray:
+    """Scores every window of ``close`` against the normalized base in O(N log N).
+
+    For a window t with minimum m, the cosine similarity of the base b and t - m is
+
+        (b . t - m * sum(b)) / (|b| * sqrt(sum(t^2) - 2 * m * sum(t) + W * m^2))
+
+    so only each window's dot product with b, minimum, sum, and sum of squares are
+    needed.
+    """
+    window_size = len(base_norm)
+    # Centering the prices does not change any score but reduces rounding error in
+    # the cumulative sums.
+    close = close - close.mean()
+    mins = rolling_min(close, window_size)
+    maxes = rolling_max(close, window_size)
+    cumulative = np.concatenate([[0.0], np.cumsum(close)])
+    cumulative_squares = np.concatenate([[0.0], np.cumsum(close * close)])
+    sums = cumulative[window_size:] - cumulative[:-window_size]
+    sums_of_squares = (
+        cumulative_squares[window_size:] - cumulative_squares[:-window_size]
+    )
+    squared_lengths = sums_of_squares - 2 * mins * sums + window_size * mins * mins
+    dots = sliding_dot_products(close, base_norm) - mins * base_norm.sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = dots / (
+            np.sqrt(base_norm @ base_norm) * np.sqrt(np.maximum(squared_lengths, 0))
+        )
+    scores[maxes == mins] = np.nan
+    return scores
+
+
+def get_search_count(length: int, window_size: int, prediction_days: int) -> int:
+    """Returns how many windows of a price history can be searched for analogs.
+
+    Each window must be followed by at least ``prediction_days`` more prices.
+    """
+    count = length - window_size - prediction_days - 1
+    if count < 1:
+        raise ValueError("The price history is too short to search.")
+    return count
+
+
+def get_scores(close: np.ndarray, window_size: int, method: str = "auto") -> np.ndarray:
+    """Scores every window of the closing prices against the last ``window_size``.
+
+    The scores do not depend on how many days are predicted, so they can be computed
+    once and sliced for any number of days.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    return cosine_similarities(close, close[-window_size:], method=method)
+
+
+class IncrementalScores:
+    """The scores of ``get_scores`` for a price history that grows over time.
+
+    Each window's minimum, maximum, sum, and sum of squares are kept, along with the
+    dot product of every window with the last ``window_size`` prices. When a price
+    is appended, the base moves by one price, and the dot product of window i with
+    the new base is that of window i - 1 with the old base minus the product of
+    their first prices plus the product of their new last prices (the recurrence of
+    the STOMP algorithm for matrix profiles). So an update costs O(N), and only the
+    one new window is computed directly. The last prices can also be replaced, as
+    when a day's prices were saved before the market closed, by running the
+    recurrence backward first.
+
+    This is not thread-safe. ``scores`` is read-only and is not changed by later
+    updates.
+    """
+
+    def __init__(self, close: np.ndarray, window_size: int):
+        self.window_size = window_size
+        self.__build(np.asarray(close, dtype=np.float64))
+
+    def __len__(self) -> int:
+        return len(self.__close)
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes the state takes."""
+        arrays = [
+            self.__close,
+            self.__centered,
+            self.__cumulative,
+            self.__cumulative_squares,
+            self.__mins,
+            self.__maxes,
+            self.__dots,
+        ]
+        if self.__scores is not None:
+            arrays.append(self.__scores)
+        return sum(array.nbytes for array in arrays)
+
+    @property
+    def scores(self) -> np.ndarray:
+        """The score of every window against the last ``window_size`` prices."""
+        if self.__scores is None:
+            self.__scores = self.__compute_scores()
+            self.__scores.setflags(write=False)
+        return self.__scores
+
+    def update(self, close: np.ndarray) -> np.ndarray:
+        """Changes the history to ``close`` and returns its scores.
+
+        Only the prices after those ``close`` has in common with the current
+        history are computed, unless too many changed.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        length = min(len(close), len(self.__close))
+        different = np.flatnonzero(close[:length] != self.__close[:length])
+        common = different[0] if len(different) else length
+        removed = len(self.__close) - common
+        added = len(close) - common
+        if (
+            common < self.window_size
+            or removed + added > MAX_UPDATE_STEPS
+            or self.__updates + removed + added > REBUILD_INTERVAL
+        ):
+            self.__build(close)
+        elif removed or added:
+            for _ in range(removed):
+                self.__pop()
+            for value in close[common:]:
+                self.__append(value)
+            self.__close = close.copy()
+            self.__scores = None
+        return self.scores
+
+    def __build(self, close: np.ndarray) -> None:
+        window_size = self.window_size
+        if len(close) < window_size:
+            raise ValueError("The price history is shorter than the window.")
+        self.__close = close.copy()
+        # Centering the prices reduces rounding error in the sums and dot products.
+        # The offset stays fixed until the next rebuild.
+        self.__offset = close.mean()
+        centered = self.__centered = close - self.__offset
+        self.__cumulative = np.concatenate([[0.0], np.cumsum(centered)])
+        self.__cumulative_squares = np.concatenate(
+            [[0.0], np.cumsum(centered * centered)]
+        )
+        self.__mins = rolling_min(centered, window_size)
+        self.__maxes = rolling_max(centered, window_size)
+        self.__dots = sliding_dot_products(centered, centered[-window_size:])
+        self.__updates = 0
+        self.__scores = None
+
+    def __append(self, value: float) -> None:
+        window_size = self.window_size
+        centered = np.append(self.__centered, value - self.__offset)
+        length = len(centered)
+        window = centered[-window_size:]
+        dots = np.empty(len(self.__dots) + 1)
+        dots[1:] = (
+            self.__dots
+            - centered[: len(self.__dots)] * centered[length - window_size - 1]
+            + centered[window_size:] * centered[-1]
+        )
+        dots[0] = centered[:window_size] @ window
+        self.__dots = dots
+        self.__centered = centered
+        self.__cumulative = np.append(
+            self.__cumulative, self.__cumulative[-1] + centered[-1]
+        )
+        self.__cumulative_squares = np.append(
+            self.__cumulative_squares, self.__cumulative_squares[-1] + centered[-1] ** 2
+        )
+        self.__mins = np.append(self.__mins, window.min())
+        self.__maxes = np.append(self.__maxes, window.max())
+        self.__updates += 1
+
+    def __pop(self) -> None:
+        window_size = self.window_size
+        centered = self.__centered
+        length = len(centered)
+        count = len(self.__dots) - 1
+        self.__dots = (
+            self.__dots[1:]
+            + centered[:count] * centered[length - window_size - 1]
+            - centered[window_size : window_size + count]  # noqa: E203
+            * centered[length - 1]
+        )
+        self.__centered = centered[:-1]
+        self.__cumulative = self.__cumulative[:-1]
+        self.__cumulative_squares = self.__cumulative_squares[:-1]
+        self.__mins = self.__mins[:-1]
+        self.__maxes = self.__maxes[:-1]
+        self.__updates += 1
+
+    def __compute_scores(self) -> np.ndarray:
+        """Computes the scores like ``_fft_cosine_similarities``.
+
+        With the base x shifted by its minimum L, the dot product of x - L and a
+        window t shifted by its minimum m is x . t - m * sum(x) - L * sum(t)
+        + W * L * m. Scaling the base to [0, 1] would not change the scores.
+        """
+        window_size = self.window_size
+        mins = self.__mins
+        sums = self.__cumulative[window_size:] - self.__cumulative[:-window_size]
+        sums_of_squares = (
+            self.__cumulative_squares[window_size:]
+            - self.__cumulative_squares[:-window_size]
+        )
+        base = self.__centered[-window_size:] - mins[-1]
+        base_low = mins[-1]
+        dots = (
+            self.__dots
+            - mins * (base.sum() + window_size * base_low)
+            - base_low * sums
+            + window_size * base_low * mins
+        )
+        squared_lengths = sums_of_squares - 2 * mins * sums + window_size * mins * mins
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = dots / (
+                np.sqrt(base @ base) * np.sqrt(np.maximum(squared_lengths, 0))
+            )
+        scores[self.__maxes == mins] = np.nan
+        if self.__maxes[-1] == base_low:
+            scores[:] = np.nan
+        return scores
+
+
+def find_best_match(
+    close: np.ndarray,
+    window_size: int,
+    prediction_days: int,
+    method: str = "auto",
+    scores: np.ndarray | None = None,
+) -> int:
+    """Finds the start index of the window most similar to the last ``window_size``
+    closing prices.
+
+    ``scores`` can be the result of ``get_scores`` to avoid computing it again.
+    """
+    count = get_search_count(len(close), window_size, prediction_days)
+    if scores is None:
+        close = np.asarray(close, dtype=np.float64)
+        scores = cosine_similarities(close, close[-window_size:], count, method)
+    return int(np.argmax(np.nan_to_num(scores[:count], nan=-np.inf)))
+
+
+def find_top_matches(scores: np.ndarray, k: int, exclusion_zone: int) -> np.ndarray:
+    """Returns the indexes of the ``k`` best scores, best first.
+
+    No two of the returned indexes are closer than ``exclusion_zone``, so a match
+    cannot be crowded out by copies of itself shifted by a day or two. NaN and -inf
+    scores are never returned, so fewer than ``k`` indexes may be returned.
+
+    Each chosen index excludes fewer than ``2 * exclusion_zone`` others, so the ``k``
+    matches are always among the best ``k * (2 * exclusion_zone - 1)`` scores. Only
+    those are found (in O(N) time with a partial sort) and sorted.
+    """
+    scores = np.nan_to_num(scores, nan=-np.inf, neginf=-np.inf)
+    pool_size = min(len(scores), k * max(1, 2 * exclusion_zone - 1))
+    if pool_size == 0:
+        return np.empty(0, dtype=np.intp)
+    pool = np.argpartition(-scores, pool_size - 1)[:pool_size]
+    pool = pool[np.argsort(-scores[pool], kind="stable")]
+    chosen: list[int] = []
+    for i in pool:
+        if len(chosen) == k or scores[i] == -np.inf:
+            break
+        if all(abs(i - j) >= exclusion_zone for j in chosen):
+            chosen.append(i)
+    return np.array(chosen, dtype=np.intp)
+
+
+def find_analogs(
+    close: np.ndarray,
+    window_size: int,
+    prediction_days: int,
+    k: int,
+    exclusion_zone: int | None = None,
+    method: str = "auto",
+    scores: np.ndarray | None = None,
+) -> np.ndarray:
+    """Finds the start indexes of the ``k`` windows most similar to the last
+    ``window_size`` closing prices, best first.
+
+    Unlike ``find_best_match``, no analog or its continuation overlaps the base, and
+    no two analogs start fewer than ``exclusion_zone`` prices apart. By default the
+    exclusion zone is the window size, so the analogs do not overlap each other.
+
+    ``scores`` can be the result of ``get_scores`` to avoid computing it again.
+    """
+    if exclusion_zone is None:
+        exclusion_zone = window_size
+    count = len(close) - 2 * window_size - prediction_days + 1
+    if count < 1:
+        raise ValueError("The price history is too short to search.")
+    if scores is None:
+        close = np.asarray(close, dtype=np.float64)
+        scores = cosine_similarities(close, close[-window_size:], count, method)
+    return find_top_matches(scores[:count], k, exclusion_zone)
+
+
+def get_analog_paths(
+    close: np.ndarray, starts: np.ndarray, window_size: int, prediction_days: int
+) -> np.ndarray:
+    """Returns each analog's window and continuation as a row.
+
+    Each row is min-max normalized by the range of its window, so the windows line up
+    with the normalized base and the continuations show where each analog went from
+    there.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    offsets = np.arange(window_size + prediction_days)
+    paths = close[np.asarray(starts)[:, np.newaxis] + offsets]
+    windows = paths[:, :window_size]
+    low = windows.min(axis=1, keepdims=True)
+    return (paths - low) / (windows.max(axis=1, keepdims=True) - low)
+
+
+def get_analog_returns(
+    close: np.ndarray, starts: np.ndarray, window_size: int, prediction_days: int
+) -> np.ndarray:
+    """Returns each analog's returns on the days after its window as a row.
+
+    The returns are relative to the last price of the analog's window, so they are
+    how the analog itself moved, wherever its window ended in its range.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    ends = np.asarray(starts)[:, np.newaxis] + window_size - 1
+    return close[ends + np.arange(1, prediction_days + 1)] / close[ends] - 1
+
+
+def get_percentile_bands(
+    paths: np.ndarray, percentiles: tuple[float, ...] = (10, 50, 90)
+) -> np.ndarray:
+    """Returns one row per percentile of the paths at each day."""
+    return np.percentile(paths, percentiles, axis=0)
@@ -15,7 +15,7 @@ class StartMenu(QtWidgets.QWidget):
         self.layout = QtWidgets.QVBoxLayout(self)
         top_row_layout = QtWidgets.QHBoxLayout()
         self.symbol_line_edit = SymbolLineEdit()
-        self.symbol_line_edit.returnPressed.connect(self.show_graph_menu)
+        self.symbol_line_edit.submitted.connect(self.show_graph_menu)
         top_row_layout.addWidget(self.symbol_line_edit)
         self.submit_symbol_button = QtWidgets.QPushButton()
         if dark_mode:
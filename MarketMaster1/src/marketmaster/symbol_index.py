@@ -0,0 +1,60 @@
+import json
+from typing import Iterable
+
+from marketmaster.resources import valid_symbols
+
+
+class SymbolIndex:
+    """The valid stock symbols, indexed for fast membership and prefix checks.
+
+    Every prefix of every symbol is stored in a set, so checking whether some
+    symbol starts with a text takes O(len(text)) time no matter how many symbols
+    there are.
+    """
+
+    def __init__(self, symbols: Iterable[str]):
+        self.symbols: tuple[str, ...] = tuple(dict.fromkeys(symbols))
+        self.__symbol_set = frozenset(self.symbols)
+        self.__prefixes = frozenset(
+            symbol[:i] for symbol in self.symbols for i in range(len(symbol) + 1)
+        )
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self.__symbol_set
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def is_prefix(self, text: str) -> bool:
+        """Returns whether any symbol starts with the text."""
+        return text in self.__prefixes
+
+
+_symbol_index: SymbolIndex | None = None
+
+
+def get_symbol_index() -> SymbolIndex:
+    """Returns the app's symbol index of the bundled S&P 500 symbols and any
+    symbols added with ``add_symbols``.
+
+    The bundled symbols are only read once per process.
+    """
+    global _symbol_index
+    if _symbol_index is None:
+        with open(valid_symbols, "r", encoding="utf8") as file:
+            _symbol_index = SymbolIndex(json.load(file))
+    return _symbol_index
+
+
+def add_symbols(symbols: Iterable[str]) -> SymbolIndex:
+    """Adds symbols, such as the data provider's listing, to the app's symbol index.
+
+    Returns the new index. The index is only rebuilt if a symbol is new.
+    """
+    global _symbol_index
+    index = get_symbol_index()
+    new_symbols = [symbol for symbol in symbols if symbol not in index]
+    if new_symbols:
+        index = SymbolIndex([*index.symbols, *new_symbols])
+        _symbol_index = index
+    return index
@@ -1,30 +1,75 @@
-import json
-import re
+from functools import lru_cache
+from typing import Iterable
 
-from marketmaster.resources import valid_symbols
+from marketmaster.symbol_index import add_symbols as add_indexed_symbols
+from marketmaster.symbol_index import get_symbol_index
+from marketmaster.symbol_index import SymbolIndex
+from PySide6 import QtCore
+from PySide6 import QtGui
 from PySide6 import QtWidgets
 
 
+class SymbolValidator(QtGui.QValidator):
+    """Converts input to uppercase and rejects anything that cannot become a symbol.
+
+    Without a symbol index, the app's index is used, including symbols added later.
+    """
+
+    def __init__(
+        self,
+        symbol_index: SymbolIndex | None = None,
+        parent: QtCore.QObject | None = None,
+    ):
+        super().__init__(parent)
+        self.symbol_index = symbol_index
+
+    def validate(self, text: str, pos: int) -> tuple[QtGui.QValidator.State, str, int]:
+        text = text.upper()
+        index = self.symbol_index
+        if index is None:
+            index = get_symbol_index()
+        if text in index:
+            return QtGui.QValidator.Acceptable, text, pos
+        if index.is_prefix(text):
+            return QtGui.QValidator.Intermediate, text, pos
+        return QtGui.QValidator.Invalid, text, pos
+
+
+@lru_cache(maxsize=None)
+def get_completer_model() -> QtCore.QStringListModel:
+    """Returns the sorted symbols as a model that all the completers share."""
+    return QtCore.QStringListModel(sorted(get_symbol_index().symbols))
+
+
+def add_symbols(symbols: Iterable[str]) -> None:
+    """Lets every symbol line edit accept and complete the symbols.
+
+    Must be called in the GUI thread.
+    """
+    index = add_indexed_symbols(symbols)
+    model = get_completer_model()
+    if model.rowCount() != len(index):
+        model.setStringList(sorted(index.symbols))
+
+
 class SymbolLineEdit(QtWidgets.QLineEdit):
+    # Emitted when Enter is pressed. Unlike returnPressed, it is emitted even if the
+    # validator does not accept the text, so that the caller can say it is invalid.
+    submitted = QtCore.Signal()
+
     def __init__(self):
         QtWidgets.QLineEdit.__init__(self)
-        with open(valid_symbols, "r", encoding="utf8") as file:
-            self.valid_symbols: list[str] = json.load(file)
-        self.__pattern = re.compile("|".join(map(re.escape, self.valid_symbols)))
         self.setPlaceholderText("Enter a stock symbol.")
-        self.setCompleter(QtWidgets.QCompleter(self.valid_symbols))
-        self.textChanged.connect(lambda text: self.setText(text.upper()))
-        self.textChanged.connect(self.__remove_any_invalid_suffix)
+        self.setValidator(SymbolValidator(parent=self))
+        completer = QtWidgets.QCompleter(get_completer_model(), self)
+        # A sorted model lets the completer use binary search.
+        completer.setModelSorting(QtWidgets.QCompleter.CaseSensitivelySortedModel)
+        self.setCompleter(completer)
 
     def has_valid_input(self) -> bool:
-        return self.__pattern.fullmatch(self.text()) is not None
-
-    def __remove_any_invalid_suffix(self) -> None:
-        if not self.__has_valid_suffix():
-            self.backspace()
+        return self.text() in get_symbol_index()
 
-    def __has_valid_suffix(self) -> bool:
-        for symbol in self.valid_symbols:
-            if symbol.startswith(self.text()):
-                return True
-        return False
+    def keyPressEvent(self, event: QtGui.QKeyEvent) -> None:
+        super().keyPressEvent(event)
+        if event.key() in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter):
+            self.submitted.emit()
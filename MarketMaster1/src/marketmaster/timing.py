@@ -0,0 +1,157 @@
+"""Named timing spans of the app's slow stages.
+
+Wrapping a stage in ``span`` records when it started, how long it took, and on which
+thread:
+
+    with span("prices.fetch", symbol=symbol):
+        data = fetch(symbol)
+
+A stage that starts on one thread and ends on another, such as a forecast from the
+request to the plot, is recorded with ``record``. The latest spans are kept in
+memory for the debug overlay, and can be saved as a JSON-lines log or as a Chrome
+trace, which chrome://tracing and https://ui.perfetto.dev show as a timeline with
+one row per thread.
+
+If the ``MARKETMASTER_TRACE`` environment variable is a file path, the app saves a
+Chrome trace there when it quits.
+
+Only the standard library is imported, so spans can time the app's startup.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Iterator
+
+ENVIRONMENT_VARIABLE = "MARKETMASTER_TRACE"
+
+# The number of spans kept. Older spans are dropped.
+MAX_SPANS = 10_000
+
+
+@dataclass(frozen=True)
+class Span:
+    """A timed stage. ``start`` and ``end`` are ``time.perf_counter`` values."""
+
+    name: str
+    start: float
+    end: float
+    thread_id: int
+    thread_name: str
+    args: dict = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Tracer:
+    """Keeps the latest ``max_spans`` spans. It can be used from several threads."""
+
+    def __init__(self, max_spans: int = MAX_SPANS):
+        self.__spans: deque[Span] = deque(maxlen=max_spans)
+        self.__lock = threading.Lock()
+        # Converts perf_counter values to Unix times for the log.
+        self.__epoch = time.time() - time.perf_counter()
+        self.__origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, /, **args) -> Iterator[None]:
+        """Records how long the ``with`` block takes, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), **args)
+
+    def record(self, name: str, start: float, end: float, /, **args) -> None:
+        """Records a stage that started and ended at the given perf_counter values.
+
+        The span is shown on the thread that records it.
+        """
+        thread = threading.current_thread()
+        span = Span(name, start, end, thread.ident or 0, thread.name, args)
+        with self.__lock:
+            self.__spans.append(span)
+
+    def spans(self) -> list[Span]:
+        """Returns the recorded spans, oldest first."""
+        with self.__lock:
+            return list(self.__spans)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__spans.clear()
+
+    def to_chrome_trace(self) -> dict:
+        """Returns the spans in the Trace Event Format of chrome://tracing."""
+        pid = os.getpid()
+        events: list[dict] = []
+        thread_names: dict[int, str] = {}
+        for span in self.spans():
+            thread_names[span.thread_id] = span.thread_name
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.name.partition(".")[0],
+                    "ph": "X",
+                    "ts": (span.start - self.__origin) * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": _to_json_values(span.args),
+                }
+            )
+        for thread_id, thread_name in thread_names.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_chrome_trace()), encoding="utf8")
+
+    def write_log(self, path: str | Path) -> None:
+        """Saves one JSON object per span and line, with Unix start times."""
+        with open(path, "w", encoding="utf8") as file:
+            for span in self.spans():
+                record = {
+                    "name": span.name,
+                    "start": span.start + self.__epoch,
+                    "duration_ms": span.duration * 1000,
+                    "thread": span.thread_name,
+                    **_to_json_values(span.args),
+                }
+                file.write(json.dumps(record) + "\n")
+
+
+def _to_json_values(args: dict) -> dict:
+    return {
+        key: value if isinstance(value, (bool, int, float, str)) else str(value)
+        for key, value in args.items()
+    }
+
+
+# The app's spans are all recorded by this tracer.
+tracer = Tracer()
+span = tracer.span
+record = tracer.record
+
+
+def write_trace_on_exit() -> None:
+    """Saves a Chrome trace to the environment variable's path, if it is set."""
+    path = os.environ.get(ENVIRONMENT_VARIABLE)
+    if path:
+        tracer.write_chrome_trace(path)
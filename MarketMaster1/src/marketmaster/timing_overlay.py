@@ -0,0 +1,114 @@
+from marketmaster.timing import Span
+from marketmaster.timing import Tracer
+from marketmaster.timing import tracer as default_tracer
+from PySide6 import QtCore
+from PySide6 import QtGui
+from PySide6 import QtWidgets
+
+
+class TimingOverlay(QtWidgets.QFrame):
+    """A translucent panel in the corner of a window that lists the latest spans.
+
+    Spans are recorded on several threads, so instead of a signal per span, the
+    tracer is checked every ``refresh_interval`` milliseconds while the overlay is
+    visible. The spans can be saved as a Chrome trace or a JSON-lines log.
+    """
+
+    def __init__(
+        self,
+        parent: QtWidgets.QWidget,
+        tracer: Tracer = default_tracer,
+        span_count: int = 20,
+        refresh_interval: int = 500,
+    ):
+        super().__init__(parent)
+        self.tracer = tracer
+        self.span_count = span_count
+        self.setObjectName("timing_overlay")
+        self.setStyleSheet(
+            "#timing_overlay { background: rgba(0, 0, 0, 220); border-radius: 6px; }"
+            " QLabel { color: #e1e1e1; }"
+        )
+        self.layout = QtWidgets.QVBoxLayout(self)
+        self.label = QtWidgets.QLabel()
+        self.label.setFont(
+            QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont)
+        )
+        self.label.setTextFormat(QtCore.Qt.PlainText)
+        self.layout.addWidget(self.label)
+        buttons_layout = QtWidgets.QHBoxLayout()
+        self.layout.addLayout(buttons_layout)
+        self.save_trace_button = QtWidgets.QPushButton("save trace")
+        self.save_trace_button.clicked.connect(self.__save_trace)
+        buttons_layout.addWidget(self.save_trace_button)
+        self.save_log_button = QtWidgets.QPushButton("save log")
+        self.save_log_button.clicked.connect(self.__save_log)
+        buttons_layout.addWidget(self.save_log_button)
+        self.clear_button = QtWidgets.QPushButton("clear")
+        self.clear_button.clicked.connect(self.__clear)
+        buttons_layout.addWidget(self.clear_button)
+
+        self.__shown: Span | None = None
+        self.__refresh_timer = QtCore.QTimer(self)
+        self.__refresh_timer.setInterval(refresh_interval)
+        self.__refresh_timer.timeout.connect(self.refresh)
+        parent.installEventFilter(self)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Shows the latest spans, newest first, if there are new ones."""
+        spans = self.tracer.spans()[-self.span_count :]  # noqa: E203
+        latest = spans[-1] if spans else None
+        if latest is self.__shown and self.label.text():
+            return
+        self.__shown = latest
+        if not spans:
+            self.label.setText("No timing spans yet")
+        else:
+            self.label.setText("\n".join(format_span(s) for s in reversed(spans)))
+        self.adjustSize()
+        self.__move_to_corner()
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        self.refresh()
+        self.__refresh_timer.start()
+        self.raise_()
+        super().showEvent(event)
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        self.__refresh_timer.stop()
+        super().hideEvent(event)
+
+    def eventFilter(self, watched: QtCore.QObject, event: QtCore.QEvent) -> bool:
+        if event.type() == QtCore.QEvent.Resize:
+            self.__move_to_corner()
+        return False
+
+    def __move_to_corner(self) -> None:
+        parent = self.parentWidget()
+        self.move(max(0, parent.width() - self.width() - 10), 40)
+
+    def __save_trace(self) -> None:
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Save Chrome trace", "marketmaster_trace.json", "JSON (*.json)"
+        )
+        if path:
+            self.tracer.write_chrome_trace(path)
+
+    def __save_log(self) -> None:
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Save timing log", "marketmaster_timing.jsonl", "JSON lines (*.jsonl)"
+        )
+        if path:
+            self.tracer.write_log(path)
+
+    def __clear(self) -> None:
+        self.tracer.clear()
+        self.refresh()
+
+
+def format_span(span: Span) -> str:
+    """Formats a span as one line of its name, duration, thread, and arguments."""
+    args = " ".join(f"{key}={value}" for key, value in span.args.items())
+    line = f"{span.name:<26} {span.duration * 1000:9.1f} ms  {span.thread_name}"
+    return f"{line}  {args}" if args else line
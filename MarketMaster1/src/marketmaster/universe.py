@@ -0,0 +1,171 @@
+"""Analog search across the price histories of many symbols.
+
+The histories are copied once into a block of shared memory that the processes of a
+process pool read directly, so no prices are pickled. Each process scores the
+windows of some of the symbols against the base pattern and returns only its best
+matches.
+"""
+
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING
+from typing import Mapping
+
+import numpy as np
+from marketmaster.similarity import cosine_similarities
+from marketmaster.similarity import find_top_matches
+
+if TYPE_CHECKING:
+    # pandas is not imported at runtime so that the pool's processes start quickly.
+    import pandas as pd
+
+# The number of tasks per process. More tasks balance the work better when some
+# histories are much longer than others.
+TASKS_PER_WORKER = 4
+
+
+@dataclass(frozen=True)
+class UniverseMatch:
+    """A window of a symbol's history that is similar to the base pattern."""
+
+    symbol: str
+    date: str  # the window's first date
+    score: float
+
+
+def search_universe(
+    base: np.ndarray,
+    histories: Mapping[str, "pd.Series"],
+    prediction_days: int,
+    k: int,
+    base_symbol: str | None = None,
+    max_workers: int | None = None,
+) -> list[UniverseMatch]:
+    """Finds the ``k`` windows most similar to the base among all the histories.
+
+    ``histories`` maps each symbol to its closing prices indexed by date. Each match
+    is followed by at least ``prediction_days`` prices, and no two matches of the
+    same symbol overlap. Windows of ``base_symbol`` that overlap the base's own
+    prices, assumed to be the last prices of its history, are not searched.
+
+    The search runs in ``max_workers`` processes, by default one per CPU. With one
+    worker it runs in this process.
+    """
+    base = np.asarray(base, dtype=np.float64)
+    window_size = len(base)
+    symbols = list(histories)
+    closes = [np.asarray(histories[s], dtype=np.float64) for s in symbols]
+    spans = []
+    offset = 0
+    for i, symbol in enumerate(symbols):
+        length = len(closes[i])
+        count = length - window_size - prediction_days + 1
+        if symbol == base_symbol:
+            count -= window_size
+        if count > 0:
+            spans.append((i, offset, length, count))
+        offset += length
+    if not spans:
+        return []
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        results = _search_spans(np.concatenate(closes), spans, base, k, window_size)
+    else:
+        results = _search_in_pool(
+            closes, offset, spans, base, k, window_size, max_workers
+        )
+
+    best = heapq.nlargest(k, results, key=lambda result: result[2])
+    return [
+        UniverseMatch(
+            symbol=symbols[i],
+            date=str(histories[symbols[i]].index[start]).split(" ")[0],
+            score=score,
+        )
+        for i, start, score in best
+    ]
+
+
+def _search_in_pool(
+    closes: list[np.ndarray],
+    size: int,
+    spans: list[tuple[int, int, int, int]],
+    base: np.ndarray,
+    k: int,
+    window_size: int,
+    max_workers: int,
+) -> list[tuple[int, int, float]]:
+    shared = shared_memory.SharedMemory(create=True, size=max(size, 1) * 8)
+    try:
+        prices = np.ndarray(size, dtype=np.float64, buffer=shared.buf)
+        np.concatenate(closes, out=prices)
+        del prices  # The memory cannot be closed while an array uses it.
+        task_count = min(len(spans), max_workers * TASKS_PER_WORKER)
+        # Processes are spawned rather than forked because forking a process with
+        # running threads, such as the GUI's, is not safe.
+        with ProcessPoolExecutor(max_workers, mp_context=get_context("spawn")) as pool:
+            futures = [
+                pool.submit(
+                    _search_shared,
+                    shared.name,
+                    size,
+                    spans[i::task_count],
+                    base,
+                    k,
+                    window_size,
+                )
+                for i in range(task_count)
+            ]
+            return [result for future in futures for result in future.result()]
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def _search_shared(
+    name: str,
+    size: int,
+    spans: list[tuple[int, int, int, int]],
+    base: np.ndarray,
+    k: int,
+    window_size: int,
+) -> list[tuple[int, int, float]]:
+    shared = shared_memory.SharedMemory(name)
+    try:
+        return _search_spans(
+            np.ndarray(size, dtype=np.float64, buffer=shared.buf),
+            spans,
+            base,
+            k,
+            window_size,
+        )
+    finally:
+        shared.close()
+
+
+def _search_spans(
+    prices: np.ndarray,
+    spans: list[tuple[int, int, int, int]],
+    base: np.ndarray,
+    k: int,
+    window_size: int,
+) -> list[tuple[int, int, float]]:
+    """Returns the best ``k`` matches of each span as (span's symbol index, start,
+    score) tuples.
+
+    Each span is a (symbol index, offset, length, count) tuple: the symbol's prices
+    are ``prices[offset : offset + length]`` and the first ``count`` windows are
+    searched.
+    """
+    results = []
+    for i, offset, length, count in spans:
+        close = prices[offset : offset + length]  # noqa: E203
+        scores = cosine_similarities(close, base, count)
+        for start in find_top_matches(scores, k, window_size):
+            results.append((i, int(start), float(scores[start])))
+    return results
@@ -0,0 +1,265 @@
+from typing import Callable
+from typing import Sequence
+
+import numpy as np
+from marketmaster.common import round_array
+from PySide6 import QtCore
+from PySide6 import QtGui
+from PySide6 import QtWidgets
+
+COLUMNS = ("symbol", "open", "high", "low", "close", "volume", "forecast")
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+SOURCES = ("bookmarks", "S&P 500")
+
+RISING_COLOR = QtGui.QColor("#2ca02c")
+FALLING_COLOR = QtGui.QColor("#d62728")
+
+
+class WatchlistModel(QtCore.QAbstractTableModel):
+    """The latest prices and forecasts of many symbols, stored in columns.
+
+    The prices and predicted returns are kept in NumPy arrays and formatted in bulk
+    when they change, so the view only asks for the cells of the rows it shows and
+    nothing is allocated per cell. Rows that change are not redrawn immediately:
+    they are collected for ``flush_interval`` milliseconds and then announced with
+    one ``dataChanged`` signal per run of adjacent rows.
+    """
+
+    def __init__(self, parent: QtCore.QObject | None = None, flush_interval: int = 100):
+        super().__init__(parent)
+        self.symbols = np.empty(0, dtype=object)
+        self.prices = np.empty((0, len(PRICE_COLUMNS)))
+        self.returns = np.empty(0)
+        self.errors = np.empty(0, dtype=object)
+        self.__text = np.empty((0, len(COLUMNS)), dtype=object)
+        self.__rows: dict[str, int] = {}
+        self.__changed = np.empty(0, dtype=bool)
+        self.__flush_timer = QtCore.QTimer(self)
+        self.__flush_timer.setSingleShot(True)
+        self.__flush_timer.setInterval(flush_interval)
+        self.__flush_timer.timeout.connect(self.flush)
+
+    def set_symbols(self, symbols: Sequence[str]) -> None:
+        """Replaces the rows with one empty row per symbol."""
+        self.beginResetModel()
+        self.__flush_timer.stop()
+        symbols = list(dict.fromkeys(symbols))
+        count = len(symbols)
+        self.symbols = np.array(symbols, dtype=object)
+        self.prices = np.full((count, len(PRICE_COLUMNS)), np.nan)
+        self.returns = np.full(count, np.nan)
+        self.errors = np.full(count, None, dtype=object)
+        self.__text = np.full((count, len(COLUMNS)), "", dtype=object)
+        self.__text[:, 0] = self.symbols
+        self.__rows = {symbol: row for row, symbol in enumerate(symbols)}
+        self.__changed = np.zeros(count, dtype=bool)
+        self.endResetModel()
+
+    def update_rows(
+        self,
+        symbols: Sequence[str],
+        prices: np.ndarray,
+        returns: np.ndarray,
+        errors: Sequence[str | None] | None = None,
+    ) -> None:
+        """Sets the prices and predicted returns of some symbols.
+
+        ``prices`` has one row per symbol with the columns of ``PRICE_COLUMNS``, and
+        ``returns`` has each symbol's predicted return as a fraction. Symbols that
+        are not in the model are ignored. The view is updated after the flush
+        interval, or when ``flush`` is called.
+        """
+        known = [i for i, symbol in enumerate(symbols) if symbol in self.__rows]
+        if not known:
+            return
+        rows = np.array([self.__rows[symbols[i]] for i in known])
+        prices = np.asarray(prices, dtype=np.float64)[known]
+        returns = np.asarray(returns, dtype=np.float64)[known]
+        self.prices[rows] = prices
+        self.returns[rows] = returns
+        self.errors[rows] = None if errors is None else [errors[i] for i in known]
+        loaded = ~np.isnan(prices).any(axis=1)
+        text = np.full((len(rows), len(PRICE_COLUMNS)), "", dtype=object)
+        text[loaded] = round_array(prices[loaded])
+        self.__text[rows, 1 : len(PRICE_COLUMNS) + 1] = text  # noqa: E203
+        self.__text[rows, -1] = _format_returns(returns)
+        self.__changed[rows] = True
+        if not self.__flush_timer.isActive():
+            self.__flush_timer.start()
+
+    def flush(self) -> None:
+        """Announces the rows changed since the last flush."""
+        self.__flush_timer.stop()
+        changed = np.flatnonzero(self.__changed)
+        if not len(changed):
+            return
+        self.__changed[:] = False
+        # Each run of adjacent rows gets one signal.
+        breaks = np.flatnonzero(np.diff(changed) != 1)
+        starts = np.concatenate(([changed[0]], changed[breaks + 1]))
+        ends = np.concatenate((changed[breaks], [changed[-1]]))
+        for start, end in zip(starts, ends):
+            self.dataChanged.emit(
+                self.index(int(start), 0), self.index(int(end), len(COLUMNS) - 1)
+            )
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.symbols)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == QtCore.Qt.DisplayRole:
+            return self.__text[row, column]
+        if role == QtCore.Qt.TextAlignmentRole and column > 0:
+            return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        if role == QtCore.Qt.ForegroundRole and column == len(COLUMNS) - 1:
+            if self.returns[row] > 0:
+                return RISING_COLOR
+            if self.returns[row] < 0:
+                return FALLING_COLOR
+        if role == QtCore.Qt.ToolTipRole:
+            return self.errors[row]
+        return None
+
+    def headerData(
+        self,
+        section: int,
+        orientation: QtCore.Qt.Orientation,
+        role: int = QtCore.Qt.DisplayRole,
+    ):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def sort(
+        self, column: int, order: QtCore.Qt.SortOrder = QtCore.Qt.AscendingOrder
+    ) -> None:
+        """Sorts the rows by a column. Rows without a value are always last."""
+        if column < 0:
+            return
+        if column == 0:
+            order_ = np.argsort(self.symbols.astype(str), kind="stable")
+        else:
+            if column == len(COLUMNS) - 1:
+                values = self.returns
+            else:
+                values = self.prices[:, column - 1]
+            if order == QtCore.Qt.DescendingOrder:
+                values = -values
+            order_ = np.argsort(values, kind="stable")  # NaN is sorted last.
+        if column == 0 and order == QtCore.Qt.DescendingOrder:
+            order_ = order_[::-1]
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        new_rows = np.empty(len(order_), dtype=np.int64)
+        new_rows[order_] = np.arange(len(order_))
+        self.symbols = self.symbols[order_]
+        self.prices = self.prices[order_]
+        self.returns = self.returns[order_]
+        self.errors = self.errors[order_]
+        self.__text = self.__text[order_]
+        self.__changed = self.__changed[order_]
+        self.__rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.changePersistentIndexList(
+            old_indexes,
+            [self.index(int(new_rows[i.row()]), i.column()) for i in old_indexes],
+        )
+        self.layoutChanged.emit()
+
+
+def _format_returns(returns: np.ndarray) -> np.ndarray:
+    """Formats predicted returns as percentages with an arrow for their direction."""
+    text = np.full(len(returns), "", dtype=object)
+    for i, value in enumerate(returns):
+        if value > 0:
+            text[i] = f"▲ {value:.2%}"
+        elif value < 0:
+            text[i] = f"▼ {-value:.2%}"
+        elif value == 0:
+            text[i] = "0.00%"
+    return text
+
+
+class WatchlistView(QtWidgets.QWidget):
+    """A table of the latest prices and forecast directions of many symbols.
+
+    ``refresh`` is called with the chosen source's name when the user asks for a
+    refresh, and ``show_symbol`` with a symbol when its row is double-clicked.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[str], None],
+        show_symbol: Callable[[str], None],
+        parent: QtWidgets.QWidget | None = None,
+    ):
+        super().__init__(parent)
+        self.refresh = refresh
+        self.show_symbol = show_symbol
+        self.layout = QtWidgets.QVBoxLayout(self)
+        top_row_layout = QtWidgets.QHBoxLayout()
+        self.layout.addLayout(top_row_layout)
+        self.source_combo_box = QtWidgets.QComboBox()
+        self.source_combo_box.addItems(SOURCES)
+        settings = QtCore.QSettings()
+        self.source_combo_box.setCurrentText(
+            str(settings.value("watchlist/source", SOURCES[0]))
+        )
+        self.source_combo_box.currentTextChanged.connect(self.__on_source_changed)
+        top_row_layout.addWidget(self.source_combo_box)
+        self.refresh_button = QtWidgets.QPushButton("refresh")
+        self.refresh_button.clicked.connect(
+            lambda: self.refresh(self.source_combo_box.currentText())
+        )
+        top_row_layout.addWidget(self.refresh_button)
+        self.status_label = QtWidgets.QLabel()
+        self.layout.addWidget(self.status_label)
+
+        self.model = WatchlistModel(self)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
+        self.layout.addWidget(self.table)
+        self.table.verticalHeader().setVisible(False)
+        # Fixed row heights and column widths keep the view from measuring every
+        # row's contents, so only the visible rows are ever asked for their data.
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.Interactive
+        )
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.setShowGrid(False)
+        self.table.setAlternatingRowColors(True)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(-1, QtCore.Qt.AscendingOrder)
+        self.table.setToolTip("Double-click a row to show its symbol")
+        self.table.doubleClicked.connect(
+            lambda index: self.show_symbol(self.model.symbols[index.row()])
+        )
+
+    def source(self) -> str:
+        return self.source_combo_box.currentText()
+
+    def show_status(self, message: str) -> None:
+        self.status_label.setText(message)
+
+    def set_font(self, font: QtGui.QFont) -> None:
+        """Sets the font for this widget and all its children."""
+        self.setFont(font)
+        self.source_combo_box.setFont(font)
+        self.refresh_button.setFont(font)
+        self.status_label.setFont(font)
+        self.table.setFont(font)
+        self.table.verticalHeader().setDefaultSectionSize(
+            QtGui.QFontMetrics(font).height() + 8
+        )
+
+    def __on_source_changed(self, source: str) -> None:
+        QtCore.QSettings().setValue("watchlist/source", source)
+        self.refresh(source)
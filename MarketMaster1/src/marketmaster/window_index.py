@@ -0,0 +1,301 @@
+"""A prebuilt index of every window of many symbols' price histories.
+
+The index is a folder of files that are memory-mapped when searched, so a search
+reads only the parts it needs:
+
+* ``prices.f32``: every symbol's closing prices, one symbol after another, as
+  float32.
+* ``dates.i8``: the date of each price as days since 1970-01-01.
+* ``paa.f32``: a piecewise aggregate approximation (PAA) of each window: the window
+  is shifted to a minimum of 0, scaled to a length of 1, and split into
+  ``segment_count`` segments whose means are stored.
+* ``meta.json``: the window size, segment count, symbols, and their lengths.
+
+Because each segment of two unit vectors u and v satisfies
+``sum((u - v) ** 2) >= L * (mean(u) - mean(v)) ** 2`` for a segment of L values,
+the PAAs give an upper bound of each window's cosine similarity with the base:
+
+    cos(u, v) = 1 - |u - v| ** 2 / 2 <= 1 - sum(L * (PAA(u) - PAA(v)) ** 2) / 2
+
+A search computes this bound for every window, then computes exact scores in order
+of decreasing bound and stops once no unscored window could beat the matches found.
+Usually only a small fraction of the windows is read from ``prices.f32``.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from typing import Iterator
+from typing import Mapping
+
+import numpy as np
+from marketmaster.universe import UniverseMatch
+from numpy.lib.stride_tricks import sliding_window_view
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# About three months of trading days.
+DEFAULT_WINDOW_SIZE = 63
+DEFAULT_SEGMENT_COUNT = 8
+
+# The index is rebuilt daily because each trading day adds a window to every symbol.
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+# The number of windows whose PAAs are computed or read at once.
+CHUNK_SIZE = 1 << 16
+
+# The number of windows scored exactly between checks of whether to stop.
+BATCH_SIZE = 1024
+
+# Added to each bound so that float32 rounding cannot make a bound lower than its
+# window's score.
+BOUND_SLACK = 1e-5
+
+
+def is_stale(directory: str | Path, max_age: float = DEFAULT_MAX_AGE) -> bool:
+    """Returns whether the index is missing or older than ``max_age`` seconds."""
+    try:
+        return time.time() - (Path(directory) / "meta.json").stat().st_mtime > max_age
+    except FileNotFoundError:
+        return True
+
+
+class WindowIndex:
+    """A memory-mapped index of every window of many symbols' closing prices.
+
+    Build one with ``WindowIndex.build``. Opening an index raises OSError if its
+    files are missing, or ValueError if they do not match each other.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        with open(self.directory / "meta.json", "r", encoding="utf8") as file:
+            meta = json.load(file)
+        self.window_size: int = meta["window_size"]
+        self.segment_count: int = meta["segment_count"]
+        self.symbols: list[str] = meta["symbols"]
+        lengths = np.array(meta["lengths"], dtype=np.int64)
+        self.price_offsets = np.concatenate([[0], np.cumsum(lengths)])
+        window_counts = lengths - self.window_size + 1
+        self.window_offsets = np.concatenate([[0], np.cumsum(window_counts)])
+        self.prices = self.__open("prices.f32", np.float32, (self.price_offsets[-1],))
+        self.dates = self.__open("dates.i8", np.int64, (self.price_offsets[-1],))
+        self.paa = self.__open(
+            "paa.f32", np.float32, (self.window_offsets[-1], self.segment_count)
+        )
+        self.segment_bounds = get_segment_bounds(self.window_size, self.segment_count)
+        self.segment_lengths = np.diff(self.segment_bounds)
+        # The number of windows scored exactly by the last search.
+        self.exact_count = 0
+
+    def __open(self, name: str, dtype, shape: tuple) -> np.ndarray:
+        path = self.directory / name
+        if path.stat().st_size != np.dtype(dtype).itemsize * int(np.prod(shape)):
+            raise ValueError(f"{path} does not match the index's metadata.")
+        if not np.prod(shape):
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+    @classmethod
+    def build(
+        cls,
+        directory: str | Path,
+        histories: Mapping[str, "pd.Series"],
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        segment_count: int = DEFAULT_SEGMENT_COUNT,
+    ) -> "WindowIndex":
+        """Indexes the closing prices, indexed by date, of each symbol.
+
+        Symbols with fewer than ``window_size`` prices are left out. Each file is
+        written under a temporary name and then renamed, with the metadata last.
+        """
+        if not 1 <= segment_count <= window_size:
+            raise ValueError("segment_count must be from 1 to window_size.")
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        bounds = get_segment_bounds(window_size, segment_count)
+        symbols: list[str] = []
+        lengths: list[int] = []
+        with open(directory / f"prices.f32{suffix}", "wb") as prices_file, open(
+            directory / f"dates.i8{suffix}", "wb"
+        ) as dates_file, open(directory / f"paa.f32{suffix}", "wb") as paa_file:
+            for symbol, history in histories.items():
+                if len(history) < window_size:
+                    continue
+                close = np.asarray(history, dtype=np.float64)
+                close.astype(np.float32).tofile(prices_file)
+                dates = np.asarray(history.index, dtype="datetime64[D]")
+                dates.astype(np.int64).tofile(dates_file)
+                windows = sliding_window_view(close, window_size)
+                for start in range(0, len(windows), CHUNK_SIZE):
+                    chunk = windows[start : start + CHUNK_SIZE]  # noqa: E203
+                    get_paa(chunk, bounds).astype(np.float32).tofile(paa_file)
+                symbols.append(symbol)
+                lengths.append(len(close))
+        for name in ("prices.f32", "dates.i8", "paa.f32"):
+            os.replace(directory / f"{name}{suffix}", directory / name)
+        meta = {
+            "window_size": window_size,
+            "segment_count": segment_count,
+            "symbols": symbols,
+            "lengths": lengths,
+        }
+        with open(directory / f"meta.json{suffix}", "w", encoding="utf8") as file:
+            json.dump(meta, file)
+        os.replace(directory / f"meta.json{suffix}", directory / "meta.json")
+        return cls(directory)
+
+    def search(
+        self,
+        base: np.ndarray,
+        prediction_days: int,
+        k: int,
+        base_symbol: str | None = None,
+    ) -> list[UniverseMatch]:
+        """Finds the ``k`` indexed windows most similar to the base.
+
+        Only the last ``window_size`` prices of the base are used. Like
+        ``universe.search_universe``, each match is followed by at least
+        ``prediction_days`` prices, matches of the same symbol do not overlap, and
+        windows of ``base_symbol`` that overlap its last ``window_size`` prices are
+        not searched. Scores are computed from float32 prices, so they may differ
+        from float64 scores in about the seventh digit.
+        """
+        base = np.asarray(base, dtype=np.float64)
+        if len(base) < self.window_size:
+            raise ValueError(f"The base must have at least {self.window_size} prices.")
+        start = len(base) - self.window_size
+        unit_base = base[start:] - base[start:].min()
+        unit_base /= np.sqrt(unit_base @ unit_base)
+        bounds = self.__get_bounds(unit_base, prediction_days, base_symbol)
+
+        self.exact_count = 0
+        scored: list[tuple[float, int, int]] = []
+        matches: list[tuple[float, int, int]] = []
+        for batch, next_bound in _by_decreasing_bound(bounds):
+            symbol_ids = np.searchsorted(self.window_offsets, batch, "right") - 1
+            starts = batch - self.window_offsets[symbol_ids]
+            scores = self.__get_scores(unit_base, symbol_ids, starts)
+            self.exact_count += len(batch)
+            scored.extend(zip(scores.tolist(), symbol_ids.tolist(), starts.tolist()))
+            matches = self.__choose(scored, k)
+            if len(matches) == k and matches[-1][0] >= next_bound:
+                break
+        return [
+            UniverseMatch(
+                symbol=self.symbols[symbol_id],
+                date=str(
+                    np.datetime64(
+                        int(self.dates[self.price_offsets[symbol_id] + start]), "D"
+                    )
+                ),
+                score=score,
+            )
+            for score, symbol_id, start in matches
+        ]
+
+    def __get_bounds(
+        self, unit_base: np.ndarray, prediction_days: int, base_symbol: str | None
+    ) -> np.ndarray:
+        """Returns the upper bound of each window's score, or -inf for windows that
+        cannot be matches.
+        """
+        base_paa = get_paa(unit_base[np.newaxis], self.segment_bounds)[0]
+        bounds = np.empty(len(self.paa), dtype=np.float32)
+        for start in range(0, len(self.paa), CHUNK_SIZE):
+            differences = self.paa[start : start + CHUNK_SIZE] - base_paa  # noqa: E203
+            bounds[start : start + CHUNK_SIZE] = (  # noqa: E203
+                1 - (differences * differences) @ self.segment_lengths / 2 + BOUND_SLACK
+            )
+        bounds[np.isnan(bounds)] = -np.inf
+        lengths = np.diff(self.price_offsets)
+        for i, symbol in enumerate(self.symbols):
+            count = lengths[i] - self.window_size - prediction_days + 1
+            if symbol == base_symbol:
+                count -= self.window_size
+            first_invalid = self.window_offsets[i] + max(count, 0)
+            bounds[first_invalid : self.window_offsets[i + 1]] = -np.inf  # noqa: E203
+        return bounds
+
+    def __get_scores(
+        self, unit_base: np.ndarray, symbol_ids: np.ndarray, starts: np.ndarray
+    ) -> np.ndarray:
+        positions = self.price_offsets[symbol_ids] + starts
+        windows = self.prices[positions[:, np.newaxis] + np.arange(self.window_size)]
+        windows = windows.astype(np.float64)
+        windows -= windows.min(axis=1, keepdims=True)
+        return windows @ unit_base / np.sqrt(np.einsum("ij,ij->i", windows, windows))
+
+    def __choose(
+        self, scored: list[tuple[float, int, int]], k: int
+    ) -> list[tuple[float, int, int]]:
+        """Chooses the best ``k`` scores such that no two windows of the same symbol
+        overlap.
+        """
+        chosen: list[tuple[float, int, int]] = []
+        for score, symbol_id, start in sorted(scored, reverse=True):
+            if len(chosen) == k:
+                break
+            if all(
+                symbol_id != other_id or abs(start - other_start) >= self.window_size
+                for _, other_id, other_start in chosen
+            ):
+                chosen.append((score, symbol_id, start))
+        return chosen
+
+
+def get_segment_bounds(window_size: int, segment_count: int) -> np.ndarray:
+    """Returns the start of each segment of a window and the window's end."""
+    return np.linspace(0, window_size, segment_count + 1).round().astype(np.intp)
+
+
+def get_paa(windows: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Returns the segment means of each window (row) after shifting it to a minimum
+    of 0 and scaling it to a length of 1.
+
+    Windows with a constant price have NaN means.
+    """
+    shifted = windows - windows.min(axis=1, keepdims=True)
+    lengths = np.sqrt(np.einsum("ij,ij->i", shifted, shifted))
+    sums = np.add.reduceat(shifted, bounds[:-1], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sums / np.diff(bounds) / lengths[:, np.newaxis]
+
+
+def _by_decreasing_bound(bounds: np.ndarray) -> Iterator[tuple[np.ndarray, float]]:
+    """Yields batches of window IDs in order of decreasing bound, each with the
+    highest bound of the windows not yet yielded.
+
+    Windows with a bound of -inf are never yielded. Only the best windows are
+    sorted, and more are sorted only if the search needs them.
+    """
+    yielded = np.zeros(len(bounds), dtype=bool)
+    pool_size = 4 * BATCH_SIZE
+    while True:
+        if pool_size < len(bounds):
+            pool = np.argpartition(-bounds, pool_size - 1)[:pool_size]
+        else:
+            pool = np.arange(len(bounds))
+        pool = pool[np.argsort(-bounds[pool], kind="stable")]
+        pool = pool[~yielded[pool] & (bounds[pool] > -np.inf)]
+        if not len(pool):
+            return
+        for start in range(0, len(pool), BATCH_SIZE):
+            batch = pool[start : start + BATCH_SIZE]  # noqa: E203
+            yielded[batch] = True
+            if start + BATCH_SIZE < len(pool):
+                next_bound = float(bounds[pool[start + BATCH_SIZE]])
+            elif pool_size < len(bounds):
+                # The best window outside the pool has a bound no higher than the
+                # pool's lowest.
+                next_bound = float(bounds[pool[-1]])
+            else:
+                next_bound = -np.inf
+            yield batch, next_bound
+        if pool_size >= len(bounds):
+            return
+        pool_size *= 4
@@ -0,0 +1,314 @@
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from marketmaster.forecast import compute_forecast
+from marketmaster.forecast import get_base
+from marketmaster.forecast import get_record
+from marketmaster.listing import download_symbol_names
+from marketmaster.price_cache import PriceCache
+from marketmaster.price_store import PriceStore
+from marketmaster.score_cache import ScoreCache
+from marketmaster.timing import span
+from marketmaster.universe import search_universe
+from marketmaster.watchlist import PRICE_COLUMNS
+from marketmaster.window_index import is_stale
+from marketmaster.window_index import WindowIndex
+from PySide6 import QtCore
+
+
+class Cancelled(Exception):
+    pass
+
+
+class JobSignals(QtCore.QObject):
+    """The signals of a ``JobWorker``.
+
+    Each signal's first argument is the worker's job ID, so a receiver can ignore
+    signals from jobs it has replaced.
+    """
+
+    progress = QtCore.Signal(int, str)
+    finished = QtCore.Signal(int, object)
+    failed = QtCore.Signal(int, str)
+
+
+class JobWorker(QtCore.QRunnable):
+    """A job the user is waiting for that runs in a thread pool.
+
+    ``cancel`` stops the job at its next stage. Subclasses implement ``work``, which
+    returns the result to emit and calls ``report_progress`` between stages.
+    """
+
+    def __init__(self, job_id: int, symbol: str):
+        super().__init__()
+        self.job_id = job_id
+        self.symbol = symbol
+        self.signals = JobSignals()
+        self.cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def run(self) -> None:
+        try:
+            result = self.work()
+            self.check_cancelled()
+            self.signals.finished.emit(self.job_id, result)
+        except Cancelled:
+            pass
+        except Exception as e:
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(self.job_id, f"{self.symbol}: {e}")
+
+    def work(self) -> object:
+        raise NotImplementedError
+
+    def report_progress(self, message: str) -> None:
+        self.check_cancelled()
+        self.signals.progress.emit(self.job_id, message)
+
+    def check_cancelled(self) -> None:
+        if self.cancelled.is_set():
+            raise Cancelled
+
+
+class ForecastWorker(JobWorker):
+    """Loads a symbol's prices and computes its forecast in a thread pool.
+
+    The stages are: fetching the prices, searching for analogs, and emitting the
+    ``Forecast`` that the GUI thread can show. A download that has started is
+    allowed to finish when the job is canceled so that the price cache still gets
+    updated. The prices can be read from a ``PriceStore`` in front of the price
+    cache, so that a symbol shown again is not read from disk.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        symbol: str,
+        prediction_days: int,
+        analog_count: int,
+        price_cache: PriceCache | PriceStore,
+        score_cache: ScoreCache | None = None,
+    ):
+        super().__init__(job_id, symbol)
+        self.prediction_days = prediction_days
+        self.analog_count = analog_count
+        self.price_cache = price_cache
+        self.score_cache = score_cache
+
+    def work(self) -> object:
+        self.report_progress(f"Loading {self.symbol}...")
+        with span("forecast.load", symbol=self.symbol):
+            symbol_data = self.price_cache.read(self.symbol)
+        self.report_progress(f"Searching {self.symbol}'s history...")
+        with span("forecast.search", symbol=self.symbol, analogs=self.analog_count):
+            return compute_forecast(
+                self.symbol,
+                symbol_data,
+                self.prediction_days,
+                self.analog_count,
+                score_cache=self.score_cache,
+            )
+
+
+class UniverseWorker(JobWorker):
+    """Searches the histories of many symbols for a symbol's last 90 days.
+
+    If ``index_directory`` has a window index that is not stale, only the index is
+    searched. Otherwise the prices are read from the price cache ``max_loaders``
+    symbols at a time, skipping symbols whose prices cannot be loaded, and searched
+    in a process pool. After the result is emitted, the index is rebuilt from those
+    prices. The result is a list of ``UniverseMatch``.
+
+    If the prices are read from a ``PriceStore``, only the store's byte budget of
+    them is kept in memory after the search.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        symbol: str,
+        symbols: list[str],
+        prediction_days: int,
+        analog_count: int,
+        price_cache: PriceCache | PriceStore,
+        index_directory: Path | None = None,
+        max_loaders: int = 8,
+    ):
+        super().__init__(job_id, symbol)
+        self.symbols = symbols
+        self.prediction_days = prediction_days
+        self.analog_count = analog_count
+        self.price_cache = price_cache
+        self.index_directory = index_directory
+        self.max_loaders = max_loaders
+        self.__histories: dict[str, pd.Series] | None = None
+
+    def run(self) -> None:
+        super().run()
+        if self.index_directory is not None and self.__histories:
+            try:
+                WindowIndex.build(self.index_directory, self.__histories)
+            except (OSError, ValueError):
+                pass  # The index will be built after the next full search.
+            self.__histories = None
+
+    def work(self) -> object:
+        self.report_progress(f"Loading {self.symbol}...")
+        close = self.price_cache.read(self.symbol)["Close"]
+        index = self.__open_index()
+        if index is not None:
+            self.report_progress("Searching the index...")
+            return index.search(
+                close.to_numpy(),
+                self.prediction_days,
+                self.analog_count,
+                base_symbol=self.symbol,
+            )
+        histories = self.__load_histories()
+        self.report_progress(f"Searching {len(histories)} symbols...")
+        matches = search_universe(
+            get_base(close).to_numpy(),
+            histories,
+            self.prediction_days,
+            self.analog_count,
+            base_symbol=self.symbol,
+        )
+        self.__histories = histories
+        return matches
+
+    def __open_index(self) -> WindowIndex | None:
+        if self.index_directory is None or is_stale(self.index_directory):
+            return None
+        try:
+            return WindowIndex(self.index_directory)
+        except (OSError, ValueError):
+            return None
+
+    def __load_histories(self) -> dict[str, pd.Series]:
+        histories: dict[str, pd.Series] = {}
+        # Closing the results, such as when the job is canceled, cancels the reads
+        # that have not started.
+        results = self.price_cache.read_many(self.symbols, self.max_loaders)
+        with closing(results):
+            for i, (symbol, data) in enumerate(results, start=1):
+                self.report_progress(f"Loading prices ({i}/{len(self.symbols)})...")
+                if not isinstance(data, Exception):
+                    histories[symbol] = data["Close"]
+        return histories
+
+
+class WatchlistSignals(JobSignals):
+    """The signals of a ``WatchlistWorker``.
+
+    ``rows`` is emitted with the job ID and a (symbols, prices, returns, errors)
+    tuple in the form that ``WatchlistModel.update_rows`` takes.
+    """
+
+    rows = QtCore.Signal(int, object)
+
+
+class WatchlistWorker(JobWorker):
+    """Loads the latest prices and forecasts of many symbols in a thread pool.
+
+    Prices are read from the price cache ``max_loaders`` symbols at a time, and each
+    symbol is forecast as soon as its prices are read. Rather than one signal per
+    symbol, the finished symbols are emitted together at most
+    every ``batch_interval`` seconds. A symbol whose prices or forecast fail gets a
+    row of NaN and its error message. The result is the number of symbols loaded.
+
+    With a ``score_cache``, a refresh after new prices were appended only updates
+    each symbol's cached scores. With a ``PriceStore`` instead of the price cache, a
+    refresh reads only the symbols that are not in memory or are out of date.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        symbols: list[str],
+        prediction_days: int,
+        analog_count: int,
+        price_cache: PriceCache | PriceStore,
+        score_cache: ScoreCache | None = None,
+        max_loaders: int = 8,
+        batch_interval: float = 0.25,
+    ):
+        super().__init__(job_id, "watchlist")
+        self.signals = WatchlistSignals()
+        self.symbols = symbols
+        self.prediction_days = prediction_days
+        self.analog_count = analog_count
+        self.price_cache = price_cache
+        self.score_cache = score_cache
+        self.max_loaders = max_loaders
+        self.batch_interval = batch_interval
+
+    def work(self) -> object:
+        batch: list[tuple[str, np.ndarray, float, str | None]] = []
+        last_emit = time.monotonic()
+        results = self.price_cache.read_many(self.symbols, self.max_loaders)
+        with closing(results):
+            for i, (symbol, symbol_data) in enumerate(results, start=1):
+                self.report_progress(f"Loading ({i}/{len(self.symbols)})...")
+                batch.append(self.__load(symbol, symbol_data))
+                if time.monotonic() - last_emit >= self.batch_interval:
+                    self.__emit_rows(batch)
+                    batch = []
+                    last_emit = time.monotonic()
+        self.__emit_rows(batch)
+        return len(self.symbols)
+
+    def __load(
+        self, symbol: str, symbol_data: pd.DataFrame | Exception
+    ) -> tuple[str, np.ndarray, float, str | None]:
+        try:
+            if isinstance(symbol_data, Exception):
+                raise symbol_data
+            latest = symbol_data.iloc[-1]
+            prices = np.array([latest.get(c, np.nan) for c in PRICE_COLUMNS], float)
+            record = get_record(
+                symbol,
+                symbol_data,
+                self.prediction_days,
+                self.analog_count,
+                self.score_cache,
+            )
+            return symbol, prices, record["predicted_return"], None
+        except Exception as e:
+            return symbol, np.full(len(PRICE_COLUMNS), np.nan), np.nan, str(e)
+
+    def __emit_rows(self, batch: list) -> None:
+        if not batch:
+            return
+        self.check_cancelled()
+        symbols, prices, returns, errors = zip(*batch)
+        self.signals.rows.emit(
+            self.job_id, (list(symbols), np.array(prices), np.array(returns), errors)
+        )
+
+
+class ListingSignals(QtCore.QObject):
+    finished = QtCore.Signal(dict)
+
+
+class ListingWorker(QtCore.QRunnable):
+    """Downloads and saves a market's symbol-to-name dictionary in a thread pool."""
+
+    def __init__(self, path: Path, fetch_listing: Callable[[str], pd.DataFrame]):
+        super().__init__()
+        self.path = path
+        self.fetch_listing = fetch_listing
+        self.signals = ListingSignals()
+
+    def run(self) -> None:
+        try:
+            symbol_to_name = download_symbol_names(self.path, self.fetch_listing)
+        except Exception:
+            return  # The names will be downloaded the next time the app starts.
+        self.signals.finished.emit(symbol_to_name)
@@ -0,0 +1,51 @@
+"""Price histories and fakes shared by the tests."""
+
+import numpy as np
+import pandas as pd
+
+
+def get_random_walk(length: int, seed: int = 0) -> np.ndarray:
+    """Returns prices that start near 100 and move about 1% a day."""
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+
+
+def get_history(length: int, seed: int) -> pd.Series:
+    """Returns a random walk of closing prices on the business days up to
+    2023-04-20.
+    """
+    index = pd.bdate_range(end="2023-04-20", periods=length, name="Date")
+    return pd.Series(get_random_walk(length, seed), index)
+
+
+class FakeReader:
+    """Serves a fixed price history and records each request.
+
+    By default the history has 300 business days of Close and Volume columns. Only
+    its first ``available`` rows are served, as if the rest had not happened yet.
+    The exceptions in ``errors`` are raised first, one per request.
+    """
+
+    def __init__(self, data: pd.DataFrame | None = None, length: int = 300):
+        if data is None:
+            index = pd.bdate_range("2020-01-01", periods=length, name="Date")
+            data = pd.DataFrame(
+                {
+                    "Close": np.linspace(10, 20, length),
+                    "Volume": np.arange(length, dtype=np.int64),
+                },
+                index=index,
+            )
+        self.data = data
+        self.available = len(data)
+        self.calls: list[tuple[str, object]] = []
+        self.errors: list[Exception] = []
+
+    def __call__(self, symbol: str, start=None) -> pd.DataFrame:
+        self.calls.append((symbol, start))
+        if self.errors:
+            raise self.errors.pop(0)
+        data = self.data.iloc[: self.available]
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start)]
+        return data
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from marketmaster.backtest import backtest
+from marketmaster.similarity import find_analogs
+from marketmaster.similarity import find_best_match
+from marketmaster.similarity import get_analog_returns
+from tests.conftest import get_random_walk
+
+WINDOW_SIZE = 20
+DAYS = 4
+
+
+@pytest.fixture
+def close() -> np.ndarray:
+    return get_random_walk(600)
+
+
+def get_predicted_returns(history: np.ndarray, analog_count: int) -> np.ndarray:
+    """Forecasts the history's next days by searching all of it, as the app does."""
+    if analog_count == 1:
+        starts = [find_best_match(history, WINDOW_SIZE, DAYS, method="direct")]
+    else:
+        starts = find_analogs(history, WINDOW_SIZE, DAYS, analog_count, method="direct")
+    returns = get_analog_returns(history, np.array(starts), WINDOW_SIZE, DAYS)
+    return np.median(returns, axis=0)
+
+
+@pytest.mark.parametrize("analog_count", [1, 3])
+def test_backtest_matches_searching_each_date(close, analog_count):
+    result = backtest(close, DAYS, analog_count, WINDOW_SIZE, min_history=100, step=7)
+    assert result.dates[0] == "99"
+    assert result.predicted_returns.shape == (len(result.dates), DAYS)
+    for i, date in enumerate(result.dates):
+        history = close[: int(date) + 1]
+        np.testing.assert_allclose(
+            result.predicted_returns[i], get_predicted_returns(history, analog_count)
+        )
+        start = int(date) + 1
+        end = start + DAYS
+        np.testing.assert_allclose(
+            result.actual_returns[i], close[start:end] / close[int(date)] - 1
+        )
+
+
+def test_backtest_does_not_see_the_future(close):
+    result = backtest(close, DAYS, 1, WINDOW_SIZE, min_history=100)
+    changed = close.copy()
+    changed[300:] *= np.linspace(1, 3, len(close) - 300)
+    changed_result = backtest(changed, DAYS, 1, WINDOW_SIZE, min_history=100)
+    last_unchanged = result.dates.index("299")
+    np.testing.assert_array_equal(
+        result.predicted_returns[: last_unchanged + 1],
+        changed_result.predicted_returns[: last_unchanged + 1],
+    )
+
+
+@pytest.mark.parametrize("analog_count", [1, 3])
+def test_backtest_predicts_the_analogs_move(analog_count):
+    # Prices rise for 40 days and fall for 10, so the bases that end at their
+    # highest are followed by a rise whenever the analogs' continuations rise.
+    phases = np.arange(600) % 50
+    close = np.where(phases < 40, 100.0 + phases, 140.0 - 4 * (phases - 40))
+    result = backtest(close, 1, analog_count, WINDOW_SIZE, min_history=200)
+    tested = np.array([int(date) for date in result.dates])
+    at_high = (phases[tested] >= WINDOW_SIZE - 1) & (phases[tested] < 39)
+    assert at_high.any()
+    assert (result.predicted_returns[at_high, 0] > 0).all()
+
+
+def test_backtest_statistics():
+    index = pd.bdate_range("2000-01-03", periods=400, name="Date")
+    # A steadily rising price always predicts a rise correctly.
+    close = pd.Series(np.linspace(10, 20, 400) + np.sin(np.arange(400)), index=index)
+    result = backtest(close, 3, 1, WINDOW_SIZE, min_history=100)
+    assert result.dates[0] == "2000-05-19"
+    assert list(result.horizons) == [1, 2, 3]
+    assert result.hit_rate.shape == result.up_rate.shape == (3,)
+    assert (result.hit_rate > 0.9).all()
+    assert (result.mean_absolute_error >= 0).all()
+
+
+def test_backtest_with_too_short_history(close):
+    with pytest.raises(ValueError):
+        backtest(close[:50], DAYS, 1, WINDOW_SIZE, min_history=100)
@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from marketmaster.cli import get_universe
+from marketmaster.cli import main
+from marketmaster.cli import read_symbols_file
+from marketmaster.cli import scan
+from marketmaster.cli import write_records
+from marketmaster.data_providers import DataProvider
+from marketmaster.data_providers import SyntheticProvider
+from marketmaster.price_cache import PriceCache
+
+
+def fetch(symbol: str, start=None) -> pd.DataFrame:
+    if symbol == "BAD":
+        raise ValueError("unknown symbol")
+    index = pd.bdate_range(end=pd.Timestamp.today(), periods=2000, name="Date")
+    rng = np.random.default_rng(len(symbol))
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({"Close": close}, index=index)
+
+
+class Provider(DataProvider):
+    def fetch(self, symbol: str, start=None) -> pd.DataFrame:
+        return fetch(symbol, start)
+
+
+def test_scan_reports_failures(tmp_path):
+    records = list(scan(["AAPL", "BAD", "MSFT"], 5, 1, tmp_path, provider=Provider()))
+    assert [r["symbol"] for r in records] == ["AAPL", "BAD", "MSFT"]
+    assert records[1]["error"] == "ValueError: unknown symbol"
+    assert records[0]["error"] is None
+    assert records[0]["low_close"] is None
+
+
+def test_write_records():
+    records = [{"symbol": "AAPL", "close": 1.0}, {"symbol": "BAD", "error": "x"}]
+    jsonl = io.StringIO()
+    assert write_records(records, jsonl, "jsonl") == 1
+    assert [json.loads(line) for line in jsonl.getvalue().splitlines()] == records
+    csv_file = io.StringIO()
+    write_records(records, csv_file, "csv")
+    rows = list(csv.DictReader(io.StringIO(csv_file.getvalue())))
+    assert rows[0]["symbol"] == "AAPL" and rows[1]["error"] == "x"
+
+
+def test_read_symbols_file(tmp_path):
+    path = tmp_path / "symbols.txt"
+    path.write_text("# watchlist\nAAPL\n\n msft \n")
+    assert read_symbols_file(path) == ["AAPL", "msft"]
+
+
+def test_main_with_process_pool(tmp_path):
+    # Cached prices are fresh, so the pool's processes do not download anything.
+    cache = PriceCache(tmp_path / "prices", fetch)
+    for symbol in ("AAPL", "MSFT", "GOOG"):
+        cache.read(symbol)
+    output = tmp_path / "scan.csv"
+    argv = ["scan", "aapl", "MSFT", "GOOG", "--days", "10", "--analogs", "3"]
+    argv += ["--workers", "2", "--cache-dir", str(tmp_path), "-o", str(output)]
+    assert main(argv) == 0
+    with open(output, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert sorted(row["symbol"] for row in rows) == ["AAPL", "GOOG", "MSFT"]
+    assert all(row["prediction_days"] == "10" and not row["error"] for row in rows)
+
+
+def test_main_with_synthetic_provider(tmp_path):
+    output = tmp_path / "scan.jsonl"
+    argv = ["scan", "SYN001", "SYN002", "--provider", "synthetic:3", "--workers", "1"]
+    argv += ["--cache-dir", str(tmp_path), "-o", str(output)]
+    assert main(argv) == 0
+    with open(output) as file:
+        records = [json.loads(line) for line in file]
+    assert [record["symbol"] for record in records] == ["SYN001", "SYN002"]
+    assert not any(record["error"] for record in records)
+    # Synthetic prices are not cached with the downloaded ones.
+    assert not (tmp_path / "prices").exists()
+
+
+def test_get_universe(tmp_path):
+    symbol_to_name = get_universe(tmp_path, SyntheticProvider(symbol_count=3))
+    assert symbol_to_name == {f"SYN00{i}": f"Synthetic {i}" for i in range(3)}
+    assert (tmp_path / "sp500_listing.json").exists()
+
+
+def test_main_with_unknown_provider(tmp_path):
+    with pytest.raises(SystemExit):
+        main(["scan", "AAPL", "--provider", "nope", "--cache-dir", str(tmp_path)])
+
+
+def test_main_backtest(tmp_path, capsys):
+    output = tmp_path / "backtest.csv"
+    argv = ["backtest", "syn1", "--provider", "synthetic:3", "--days", "3"]
+    argv += ["--step", "20", "--cache-dir", str(tmp_path), "-o", str(output)]
+    assert main(argv) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("SYN1: ")
+    assert len(lines) == 2 + 3
+    with open(output, newline="") as file:
+        row = next(csv.DictReader(file))
+    assert list(row) == ["date"] + [
+        f"{kind}_{days}" for days in (1, 2, 3) for kind in ("predicted", "actual")
+    ]
+
+
+def test_main_download(tmp_path, capsys):
+    argv = ["download", "syn1", "SYN2", "--provider", "synthetic:3"]
+    argv += ["--concurrency", "2", "--cache-dir", str(tmp_path)]
+    assert main(argv) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert sorted(line.split(":")[0] for line in lines) == ["SYN1", "SYN2"]
+    assert all(" prices to " in line for line in lines)
+
+
+def run_module(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent))
+    return subprocess.run(
+        [sys.executable, "-m", "marketmaster", *args],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def test_module_runs_cli_commands(tmp_path):
+    completed = run_module(
+        "download", "SYN1", "--provider", "synthetic:3", "--cache-dir", str(tmp_path)
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.startswith("SYN1: ")
+    # An unknown command is reported by the command-line interface, not the GUI.
+    completed = run_module("nope")
+    assert completed.returncode == 2
+    assert "invalid choice" in completed.stderr
@@ -1,6 +1,9 @@
+import numpy as np
+import pandas as pd
 import pytest
 from marketmaster.common import get_number_suffix
 from marketmaster.common import round_
+from marketmaster.common import round_array
 
 
 def test_get_number_suffix_empty():
@@ -69,3 +72,61 @@ def test_round__empty():
 )
 def test_round_(test_input: str, expected: str):
     assert round_(test_input) == expected
+
+
+ROUND_CASES = [
+    ("379", "379"),
+    ("182.5", "182.50"),
+    ("1.445", "1.45"),
+    ("2.675", "2.68"),
+    ("1.995", "2"),
+    ("1072", "1.07k"),
+    ("10072", "10.07k"),
+    ("7485275", "7.49M"),
+    ("74852750", "74.85M"),
+    ("748527500", "748.53M"),
+]
+
+
+def test_round_array():
+    numbers = [float(number) for number, _ in ROUND_CASES]
+    assert list(round_array(numbers)) == [expected for _, expected in ROUND_CASES]
+
+
+def test_round_array_integers():
+    numbers = np.array([0, 379, 1072, 999995, 748527500, 999999999999999])
+    expected = ["0", "379", "1.07k", "1000.00k", "748.53M", "1000.00T"]
+    assert list(round_array(numbers)) == expected
+
+
+def test_round_array_matches_round_():
+    rng = np.random.default_rng(0)
+    floats = np.concatenate(
+        [
+            rng.uniform(0, 1000, 2000),
+            np.round(rng.uniform(0, 1000, 2000), 3),  # many halfway cases
+            (np.arange(2000) + 0.5) / 100,
+            rng.uniform(1000, 1e14, 2000),
+        ]
+    )
+    assert list(round_array(floats)) == [round_(x) for x in floats]
+    integers = rng.integers(0, 10**15, 2000)
+    assert list(round_array(integers)) == [round_(int(x)) for x in integers]
+
+
+def test_round_array_shapes_and_columns():
+    assert round_array(np.full((2, 3), 1.5)).shape == (2, 3)
+    assert round_array([]).shape == (0,)
+    column = pd.Series([1.5, 2500.0], index=["a", "b"])
+    assert list(round_array(column)) == ["1.50", "2.50k"]
+
+
+def test_round_array_negative_and_not_finite():
+    numbers = [-1.445, -1234.0, float("nan"), float("-inf")]
+    assert list(round_array(numbers)) == ["-1.45", "-1.23k", "nan", "-inf"]
+
+
+@pytest.mark.parametrize("number", [10**15, 1e15, 1e300])
+def test_round_array_too_large(number):
+    with pytest.raises(NotImplementedError):
+        round_array([number])
@@ -0,0 +1,158 @@
+import functools
+import pickle
+import threading
+from http.server import SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+from marketmaster.data_providers import FinanceDataReaderProvider
+from marketmaster.data_providers import get_configured_provider
+from marketmaster.data_providers import get_provider
+from marketmaster.data_providers import HttpProvider
+from marketmaster.data_providers import LocalProvider
+from marketmaster.data_providers import SyntheticProvider
+from marketmaster.price_cache import PriceCache
+
+
+def test_get_provider():
+    assert isinstance(get_provider("financedatareader"), FinanceDataReaderProvider)
+    assert isinstance(get_provider(""), FinanceDataReaderProvider)
+    local = get_provider("local:C:/prices")
+    assert isinstance(local, LocalProvider)
+    assert str(local.directory) == "C:/prices"
+    assert get_provider("synthetic").seed == 0
+    assert get_provider("Synthetic:42").seed == 42
+    http = get_provider("https://example.com/prices/")
+    assert isinstance(http, HttpProvider)
+    assert http.url == "https://example.com/prices"
+
+
+@pytest.mark.parametrize(
+    "spec", ["nope", "local", "synthetic:x", "fdr:x", "http:prices", "https://"]
+)
+def test_get_provider_with_invalid_spec(spec):
+    with pytest.raises(ValueError):
+        get_provider(spec)
+
+
+def test_get_configured_provider(monkeypatch):
+    monkeypatch.setenv("MARKETMASTER_DATA_PROVIDER", "synthetic:7")
+    assert get_configured_provider().seed == 7
+
+
+def test_cache_directories_differ(tmp_path):
+    directories = {
+        get_provider(spec).get_cache_directory(tmp_path)
+        for spec in ("financedatareader", "synthetic:0", "synthetic:1", "local:a")
+    }
+    assert len(directories) == 4
+    assert FinanceDataReaderProvider().get_cache_directory(tmp_path) == tmp_path
+
+
+def test_synthetic_prices_are_reproducible():
+    provider = SyntheticProvider(seed=1, end="2020-12-31")
+    data = provider.fetch("AAPL")
+    assert data.equals(SyntheticProvider(seed=1, end="2020-12-31").fetch("AAPL"))
+    assert not data["Close"].equals(provider.fetch("MSFT")["Close"])
+    assert not data["Close"].equals(
+        SyntheticProvider(2, end="2020-12-31").fetch("AAPL")["Close"]
+    )
+    assert list(data.columns) == ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+    assert (data["Low"] <= data[["Open", "Close"]].min(axis=1)).all()
+    assert (data["High"] >= data[["Open", "Close"]].max(axis=1)).all()
+
+
+def test_synthetic_prices_do_not_change_when_extended():
+    earlier = SyntheticProvider(end="2020-06-30").fetch("AAPL")
+    later = SyntheticProvider(end="2020-12-31").fetch("AAPL")
+    assert later.loc[earlier.index].equals(earlier)
+    assert (
+        SyntheticProvider(end="2020-12-31")
+        .fetch("AAPL", start="2020-07-01")
+        .equals(later[later.index >= "2020-07-01"])
+    )
+
+
+def test_synthetic_provider_with_price_cache(tmp_path):
+    provider = SyntheticProvider(end="2020-12-31")
+    cache = PriceCache(tmp_path, provider.fetch, max_age=0)
+    cache.read("AAPL")
+    pd.testing.assert_frame_equal(
+        cache.read("AAPL"), provider.fetch("AAPL"), check_freq=False
+    )
+
+
+def test_local_provider(tmp_path):
+    index = pd.bdate_range("2020-01-01", periods=5, name="Date")
+    data = pd.DataFrame({"Close": [1.0, 2.0, 3.0, 4.0, 5.0]}, index=index)
+    data.to_csv(tmp_path / "AAPL.csv")
+    data.iloc[::-1].to_parquet(tmp_path / "BRK%2FB.parquet")
+    provider = LocalProvider(tmp_path)
+
+    aapl = provider.fetch("AAPL")
+    assert list(aapl.index) == list(index)
+    assert list(aapl["Adj Close"]) == list(data["Close"])
+    assert list(provider.fetch("BRK/B")["Close"]) == list(data["Close"])
+    assert list(provider.fetch("AAPL", start="2020-01-03")["Close"]) == [3, 4, 5]
+    with pytest.raises(FileNotFoundError):
+        provider.fetch("MSFT")
+
+    listing = provider.fetch_listing("S&P500")
+    assert list(listing["Symbol"]) == ["AAPL", "BRK/B"]
+    pd.DataFrame({"Symbol": ["AAPL"], "Name": ["Apple"]}).to_csv(
+        tmp_path / "listing.csv", index=False
+    )
+    assert provider.fetch_listing("S&P500").to_dict("list") == {
+        "Symbol": ["AAPL"],
+        "Name": ["Apple"],
+    }
+
+
+def test_local_provider_resamples_intraday_bars(tmp_path):
+    index = pd.date_range("2023-01-02 09:30", periods=3 * 24 * 60, freq="min")
+    close = pd.Series(range(len(index)), index=index, dtype=float)
+    data = pd.DataFrame({"Close": close, "Volume": 1}, index=index.rename("Date"))
+    data.to_parquet(tmp_path / "AAPL.parquet")
+    daily = LocalProvider(tmp_path, chunk_size=1000).fetch("AAPL")
+    assert list(daily.index) == list(pd.date_range("2023-01-02", periods=4))
+    assert list(daily["Volume"]) == [870, 1440, 1440, 570]
+    assert list(daily["Adj Close"]) == list(close.resample("1D").last())
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def test_http_provider(tmp_path):
+    index = pd.bdate_range("2020-01-01", periods=5, name="Date")
+    data = pd.DataFrame({"Close": [1.0, 2.0, 3.0, 4.0, 5.0]}, index=index)
+    data.to_csv(tmp_path / "AAPL.csv")
+    data.to_csv(tmp_path / "BRK%2FB.csv")
+    pd.DataFrame({"Symbol": ["AAPL"], "Name": ["Apple"]}).to_csv(
+        tmp_path / "listing.csv", index=False
+    )
+    # A static file server, which ignores the start parameter.
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(QuietHandler, directory=str(tmp_path))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        provider = pickle.loads(
+            pickle.dumps(HttpProvider(f"http://127.0.0.1:{server.server_address[1]}"))
+        )
+        aapl = provider.fetch("AAPL")
+        assert list(aapl.index) == list(index)
+        assert list(aapl["Adj Close"]) == list(data["Close"])
+        assert list(provider.fetch("BRK/B")["Close"]) == list(data["Close"])
+        assert list(provider.fetch("AAPL", start="2020-01-03")["Close"]) == [3, 4, 5]
+        with pytest.raises(OSError):
+            provider.fetch("MSFT")
+        assert provider.fetch_listing("S&P500").to_dict("list") == {
+            "Symbol": ["AAPL"],
+            "Name": ["Apple"],
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,172 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+from marketmaster.downloader import call_with_retries
+from marketmaster.downloader import Downloader
+from marketmaster.downloader import HTTPError
+from marketmaster.downloader import is_transient
+from marketmaster.downloader import map_unordered
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves ``server.files`` over keep-alive connections, failing each path
+    ``server.failures[path]`` times with 503 first.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connection_count += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests.append(self.path)
+            failures = self.server.failures.get(self.path, 0)
+            if failures:
+                self.server.failures[self.path] = failures - 1
+        if failures:
+            self.send_error(503)
+            return
+        body = self.server.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Closes the connection without telling the client, like a server whose
+        # keep-alive timeout passed.
+        self.close_connection = self.server.close_connections
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connection_count = 0
+    server.requests = []
+    server.failures = {}
+    server.close_connections = False
+    server.files = {f"/data/{i}.txt": str(i).encode() for i in range(20)}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/data"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_reuses_connections(server):
+    with Downloader(server.url) as downloader:
+        assert [downloader.get(f"{i}.txt") for i in range(5)] == [
+            str(i).encode() for i in range(5)
+        ]
+        assert downloader.connection_count == 1
+    assert server.connection_count == 1
+
+
+def test_get_retries_with_backoff(server):
+    server.failures["/data/3.txt"] = 2
+    downloader = Downloader(server.url, backoff=0.01)
+    assert downloader.get("3.txt") == b"3"
+    assert server.requests == ["/data/3.txt"] * 3
+
+
+def test_get_gives_up(server):
+    server.failures["/data/3.txt"] = 5
+    downloader = Downloader(server.url, retries=1, backoff=0)
+    with pytest.raises(HTTPError) as error:
+        downloader.get("3.txt")
+    assert error.value.status == 503
+    with pytest.raises(HTTPError) as error:
+        downloader.get("missing.txt")
+    assert error.value.status == 404
+    # Only temporary failures are retried.
+    assert server.requests.count("/data/missing.txt") == 1
+
+
+def test_get_reconnects_after_the_server_closes_an_idle_connection(server):
+    server.close_connections = True
+    downloader = Downloader(server.url, retries=0)
+    assert downloader.get("1.txt") == b"1"
+    assert downloader.get("2.txt") == b"2"
+    assert downloader.connection_count == 2
+
+
+def test_backoff_doubles_up_to_max_backoff():
+    downloader = Downloader("http://localhost", backoff=1, max_backoff=5)
+    assert 0.5 <= downloader.get_backoff(0) <= 1
+    assert 2 <= downloader.get_backoff(2) <= 4
+    assert 2.5 <= downloader.get_backoff(10) <= 5
+
+
+def test_is_transient():
+    assert is_transient(ConnectionResetError())
+    assert is_transient(TimeoutError())
+    assert is_transient(HTTPError(503, "Service Unavailable", "url"))
+    assert not is_transient(HTTPError(404, "Not Found", "url"))
+    assert not is_transient(FileNotFoundError())
+    assert not is_transient(ValueError())
+
+
+def test_call_with_retries_waits_as_long_as_the_server_asks():
+    errors = [HTTPError(429, "Too Many Requests", "url", retry_after=0.05)]
+
+    def function() -> str:
+        if errors:
+            raise errors.pop()
+        return "done"
+
+    started = time.monotonic()
+    assert call_with_retries(function, backoff=10) == "done"
+    assert 0.05 <= time.monotonic() - started < 1
+
+
+def test_invalid_url():
+    with pytest.raises(ValueError):
+        Downloader("ftp://localhost")
+
+
+def test_concurrent_downloads_share_connections(server):
+    downloader = Downloader(server.url, max_connections=4)
+    paths = [f"{i}.txt" for i in range(20)]
+    results = dict(map_unordered(downloader.get, paths, max_concurrent=4))
+    assert results == {f"{i}.txt": str(i).encode() for i in range(20)}
+    assert downloader.connection_count <= 4
+    assert server.connection_count == downloader.connection_count
+
+
+def test_map_unordered_streams_results_and_bounds_concurrency():
+    lock = threading.Lock()
+    running = [0, 0]  # now, most at once
+
+    def work(item: int) -> int:
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        time.sleep(0.05 if item == 0 else 0.01)
+        with lock:
+            running[0] -= 1
+        if item == 5:
+            raise ValueError("five")
+        return item * 2
+
+    results = list(map_unordered(work, range(12), max_concurrent=3))
+    assert running[1] <= 3
+    # The slow first item does not hold back the others.
+    assert results[0][0] != 0
+    errors = {item: result for item, result in results if isinstance(result, Exception)}
+    assert list(errors) == [5]
+    assert sorted(r for _, r in results if not isinstance(r, Exception)) == [
+        i * 2 for i in range(12) if i != 5
+    ]
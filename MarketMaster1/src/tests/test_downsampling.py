@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from marketmaster.downsampling import downsample
+from marketmaster.downsampling import lttb
+from marketmaster.downsampling import min_max
+from tests.conftest import get_random_walk
+
+
+def get_loop_lttb(values: np.ndarray, count: int) -> list[int]:
+    """Chooses the points the slow way, one point and one bucket at a time."""
+    length = len(values)
+
+    def get_edge(i: int) -> int:
+        return 1 + i * (length - 2) // (count - 2)
+
+    chosen = [0]
+    for i in range(count - 2):
+        next_start = get_edge(i + 1)
+        next_stop = min(get_edge(i + 2), length)
+        average_x = np.mean(np.arange(next_start, next_stop))
+        average_y = np.mean(values[next_start:next_stop])
+        a = chosen[-1]
+        best_area, best = -1.0, 0
+        for j in range(get_edge(i), next_start):
+            area = abs(
+                (a - average_x) * (values[j] - values[a])
+                - (a - j) * (average_y - values[a])
+            )
+            if area > best_area:
+                best_area, best = area, j
+        chosen.append(best)
+    return chosen + [length - 1]
+
+
+@pytest.mark.parametrize("length,count", [(1000, 100), (1001, 37), (500, 3), (50, 49)])
+def test_lttb_matches_loop(length: int, count: int):
+    values = get_random_walk(length)
+    assert list(lttb(values, count)) == get_loop_lttb(values, count)
+
+
+def test_min_max_keeps_extremes_in_order():
+    values = get_random_walk(10_003)
+    indexes = min_max(values, 100)
+    assert np.all(np.diff(indexes) > 0)
+    assert len(indexes) <= 200
+    assert np.argmin(values) in indexes and np.argmax(values) in indexes
+    spike = values.copy()
+    spike[5000] = 1000
+    assert 5000 in min_max(spike, 10)
+
+
+def test_downsample_visible_range():
+    values = get_random_walk(1_000_000)
+    positions, points = downsample(values, 250_000, 500_000, 1000)
+    assert 250_000 <= positions[0] and positions[-1] < 500_000
+    assert len(points) <= 1000
+    np.testing.assert_array_equal(points, values[positions])
+    positions, points = downsample(values, 250_000, 500_000, 1000, "lttb")
+    assert len(points) == 1000
+    assert positions[0] == 250_000 and positions[-1] == 499_999
+
+
+def test_downsample_short_range_keeps_every_point():
+    values = get_random_walk(100)
+    positions, points = downsample(values, -10, 40, 1000)
+    assert list(positions) == list(range(40))
+    positions, points = downsample(values, 90, 120, 1000)
+    assert list(positions) == list(range(90, 100))
+    assert len(downsample(values, 200, 300, 1000)[0]) == 0
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        downsample(get_random_walk(100), 0, 100, 10, "every_other")
@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from marketmaster.forecast import compute_forecast
+from marketmaster.forecast import get_dates
+from marketmaster.forecast import get_record
+from marketmaster.score_cache import ScoreCache
+
+
+@pytest.fixture
+def symbol_data() -> pd.DataFrame:
+    index = pd.bdate_range(end="2023-04-20", periods=3000, name="Date")
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({"Close": close, "Volume": np.ones(len(index))}, index=index)
+
+
+def test_compute_forecast(symbol_data: pd.DataFrame):
+    forecast = compute_forecast(
+        "AAPL", symbol_data, 5, today=datetime(2023, 4, 20, 16, 30)
+    )
+    assert forecast.dates[0] == "2023-01-20"
+    assert forecast.dates[-1] == "2023-04-20"
+    assert len(forecast.actual) == len(forecast.dates)
+    assert len(forecast.predicted) == len(forecast.actual) + 5
+    assert forecast.low is None and forecast.high is None
+    assert forecast.latest.name == pd.Timestamp("2023-04-20")
+
+
+def test_compute_forecast_with_analogs(symbol_data: pd.DataFrame):
+    forecast = compute_forecast(
+        "AAPL", symbol_data, 10, analog_count=7, today=datetime(2023, 4, 20)
+    )
+    assert forecast.analog_count == 7
+    assert len(forecast.low) == len(forecast.predicted) == len(forecast.actual) + 10
+    assert np.all(forecast.low <= forecast.predicted)
+    assert np.all(forecast.predicted <= forecast.high)
+
+
+@pytest.mark.parametrize("analog_count", [1, 7])
+def test_compute_forecast_with_score_cache(
+    symbol_data: pd.DataFrame, analog_count: int
+):
+    today = datetime(2023, 4, 20)
+    cache = ScoreCache()
+    for prediction_days in (5, 20):
+        expected = compute_forecast(
+            "AAPL", symbol_data, prediction_days, analog_count, today
+        )
+        forecast = compute_forecast(
+            "AAPL", symbol_data, prediction_days, analog_count, today, cache
+        )
+        np.testing.assert_allclose(forecast.predicted, expected.predicted)
+    assert len(cache) == 1
+
+
+def test_get_dates():
+    index = pd.DatetimeIndex(["2023-04-19", "2023-04-20"])
+    assert get_dates(index) == ["2023-04-19", "2023-04-20"]
+
+
+def test_compute_forecast_without_analogs():
+    index = pd.bdate_range(end=pd.Timestamp.today(), periods=1000, name="Date")
+    data = pd.DataFrame({"Close": np.full(len(index), 100.0)}, index=index)
+    with pytest.raises(ValueError, match="No analogs were found."):
+        compute_forecast("AAPL", data, 5, 3)
+
+
+def test_get_record():
+    index = pd.bdate_range(end=pd.Timestamp.today(), periods=2000, name="Date")
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, 2000)))
+    data = pd.DataFrame({"Close": close}, index=index)
+    record = get_record("AAPL", data, 5, 7)
+    assert record["symbol"] == "AAPL"
+    assert record["analog_count"] == 7
+    assert record["low_close"] <= record["predicted_close"] <= record["high_close"]
+    assert record["predicted_return"] == pytest.approx(
+        record["predicted_close"] / record["close"] - 1
+    )
+
+
+def test_get_record_follows_the_analog_rather_than_the_base_range():
+    # Prices rise for 80 days and fall for 20, and the last price is the base's
+    # highest, 5 days before the rise ends. Every analog rose after its window, but
+    # scaling the analog to the base's range would predict no rise.
+    index = pd.bdate_range(end=pd.Timestamp.today(), periods=1000, name="Date")
+    phases = (np.arange(len(index)) - len(index) + 76) % 100
+    close = np.where(phases < 80, 100.0 + phases, 180.0 - 4 * (phases - 80))
+    data = pd.DataFrame({"Close": close}, index=index)
+    for analog_count in (1, 3):
+        record = get_record("AAPL", data, 5, analog_count)
+        assert record["predicted_return"] > 0.01
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from marketmaster.intraday import load_bars
+from marketmaster.intraday import read_chunks
+from marketmaster.intraday import resample_chunks
+
+
+def get_minute_bars(days: int = 5, seed: int = 0) -> pd.DataFrame:
+    """Returns 1-minute bars of the regular trading hours of some business days."""
+    rng = np.random.default_rng(seed)
+    index = pd.DatetimeIndex(
+        [
+            time
+            for day in pd.bdate_range("2023-01-02", periods=days)
+            for time in pd.date_range(
+                day + pd.Timedelta("9h30min"), periods=390, freq="min"
+            )
+        ],
+        name="Date",
+    )
+    close = 100 + np.cumsum(rng.normal(0, 0.05, len(index)))
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 0.01, len(index)),
+            "High": close + 0.05,
+            "Low": close - 0.05,
+            "Close": close,
+            "Volume": rng.integers(100, 1000, len(index)),
+        },
+        index=index,
+    )
+
+
+def get_expected(bars: pd.DataFrame, rule: str) -> pd.DataFrame:
+    resampled = bars.resample(rule).agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    )
+    return resampled[bars["Close"].resample(rule).count() > 0]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 389, 1000, 10_000])
+@pytest.mark.parametrize("rule", ["5min", "1h", "1D"])
+def test_resample_chunks_matches_resample(chunk_size: int, rule: str):
+    bars = get_minute_bars()
+    chunks = (
+        bars.iloc[i : i + chunk_size]  # noqa: E203
+        for i in range(0, len(bars), chunk_size)
+    )
+    resampled = pd.concat(list(resample_chunks(chunks, rule)))
+    pd.testing.assert_frame_equal(resampled, get_expected(bars, rule), check_freq=False)
+
+
+def test_resample_chunks_in_time_order():
+    bars = get_minute_bars(days=2)
+    with pytest.raises(ValueError):
+        list(resample_chunks([bars.iloc[400:], bars.iloc[:400]]))
+    with pytest.raises(ValueError):
+        list(resample_chunks([bars.iloc[::-1]]))
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_read_chunks(tmp_path, suffix: str):
+    bars = get_minute_bars(days=2)
+    path = tmp_path / f"AAPL{suffix}"
+    if suffix == ".csv":
+        bars.to_csv(path)
+    else:
+        bars.to_parquet(path)
+    chunks = list(read_chunks(path, chunk_size=300))
+    assert max(len(chunk) for chunk in chunks) == 300
+    pd.testing.assert_frame_equal(pd.concat(chunks), bars, check_freq=False)
+
+
+def test_load_bars(tmp_path):
+    bars = get_minute_bars()
+    path = tmp_path / "AAPL.parquet"
+    # The time is also read from a first column instead of the index.
+    bars.reset_index().to_parquet(path)
+    daily = load_bars(path, start="2023-01-03 12:00", chunk_size=500)
+    expected = get_expected(bars[bars.index >= "2023-01-03 12:00"], "1D")
+    pd.testing.assert_frame_equal(daily, expected, check_freq=False)
+    assert len(load_bars(path, rule=None)) == len(bars)
+    assert load_bars(path, start="2024-01-01").empty
+
+
+def test_load_bars_does_not_resample_daily_bars(tmp_path):
+    index = pd.bdate_range("2023-01-02", periods=3, name="Date")
+    bars = pd.DataFrame({"Close": [1.0, 2.0, 3.0], "Change": [0, 1, 0.5]}, index=index)
+    bars.to_csv(tmp_path / "AAPL.csv")
+    loaded = load_bars(tmp_path / "AAPL.csv", chunk_size=2)
+    pd.testing.assert_frame_equal(loaded, bars, check_freq=False)
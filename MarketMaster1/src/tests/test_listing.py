@@ -0,0 +1,37 @@
+import os
+import time
+
+import pandas as pd
+from marketmaster.listing import download_symbol_names
+from marketmaster.listing import is_stale
+from marketmaster.listing import read_symbol_names
+
+
+def fetch_listing(market: str) -> pd.DataFrame:
+    assert market == "S&P500"
+    return pd.DataFrame({"Symbol": ["AAPL", "MSFT"], "Name": ["Apple", "Microsoft"]})
+
+
+def test_download_and_read(tmp_path):
+    path = tmp_path / "listing" / "names.json"
+    assert read_symbol_names(path) == {}
+    names = download_symbol_names(path, fetch_listing)
+    assert names == {"AAPL": "Apple", "MSFT": "Microsoft"}
+    assert read_symbol_names(path) == names
+
+
+def test_is_stale(tmp_path):
+    path = tmp_path / "names.json"
+    assert is_stale(path)
+    download_symbol_names(path, fetch_listing)
+    assert not is_stale(path, max_age=60)
+    old = time.time() - 61
+    os.utime(path, (old, old))
+    assert is_stale(path, max_age=60)
+    assert read_symbol_names(path)  # stale listings can still be read
+
+
+def test_read_corrupt_listing(tmp_path):
+    path = tmp_path / "names.json"
+    path.write_text("{", encoding="utf8")
+    assert read_symbol_names(path) == {}
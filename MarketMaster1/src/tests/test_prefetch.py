@@ -0,0 +1,33 @@
+import pytest
+from marketmaster.prefetch import PrefetchQueue
+
+
+def test_pop_order():
+    queue = PrefetchQueue()
+    queue.push("MSFT", 1)
+    queue.push("AAPL", 0)
+    queue.push("AMZN", 1)
+    assert [queue.pop() for _ in range(3)] == ["AAPL", "MSFT", "AMZN"]
+    assert len(queue) == 0
+
+
+def test_push_keeps_most_urgent_priority():
+    queue = PrefetchQueue()
+    queue.push("MSFT", 1)
+    queue.push("AAPL", 1)
+    queue.push("AAPL", 0)
+    queue.push("MSFT", 5)
+    assert len(queue) == 2
+    assert [queue.pop(), queue.pop()] == ["AAPL", "MSFT"]
+
+
+def test_discard():
+    queue = PrefetchQueue()
+    queue.push("MSFT", 1)
+    queue.push("AAPL", 1)
+    queue.discard("MSFT")
+    queue.discard("GOOG")
+    assert "MSFT" not in queue
+    assert queue.pop() == "AAPL"
+    with pytest.raises(IndexError):
+        queue.pop()
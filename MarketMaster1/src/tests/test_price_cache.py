@@ -0,0 +1,130 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+from marketmaster.price_cache import PriceCache
+from tests.conftest import FakeReader
+
+
+def make_stale(cache: PriceCache, symbol: str) -> None:
+    path = cache.directory / f"{symbol}.parquet"
+    old = time.time() - cache.max_age - 1
+    os.utime(path, (old, old))
+
+
+def test_read_uses_cache(tmp_path):
+    reader = FakeReader()
+    cache = PriceCache(tmp_path, reader)
+    first = cache.read("AAPL")
+    second = cache.read("AAPL")
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert reader.calls == [("AAPL", None)]
+
+
+def test_read_fetches_only_the_tail(tmp_path):
+    reader = FakeReader()
+    reader.available = 250
+    cache = PriceCache(tmp_path, reader)
+    cache.read("AAPL")
+    reader.available = 300
+    make_stale(cache, "AAPL")
+    data = cache.read("AAPL")
+    assert reader.calls[-1] == ("AAPL", reader.data.index[249])
+    pd.testing.assert_frame_equal(data, reader.data, check_freq=False)
+
+
+def test_refresh_replaces_the_last_bar(tmp_path):
+    reader = FakeReader()
+    cache = PriceCache(tmp_path, reader)
+    cache.read("AAPL")
+    reader.data.iloc[-1, 0] = 99.0  # the last bar changed after the market closed
+    make_stale(cache, "AAPL")
+    data = cache.read("AAPL")
+    assert len(data) == 300
+    assert data["Close"].iloc[-1] == 99.0
+
+
+def test_symbols_that_are_not_file_names(tmp_path):
+    cache = PriceCache(tmp_path, FakeReader())
+    cache.read("S&P500")
+    cache.read("BRK/B")
+    assert len(list(tmp_path.glob("*.parquet"))) == 2
+
+
+def test_evicts_least_recently_read(tmp_path):
+    reader = FakeReader()
+    cache = PriceCache(tmp_path, reader)
+    cache.read("S0")
+    file_size = (tmp_path / "S0.parquet").stat().st_size
+    cache.max_bytes = file_size * 3
+    for i in range(1, 5):
+        cache.read(f"S{i}")
+        # The access times must differ for the eviction order to be certain.
+        path = tmp_path / f"S{i}.parquet"
+        os.utime(path, (time.time() + i, path.stat().st_mtime))
+    remaining = sorted(path.stem for path in tmp_path.glob("*.parquet"))
+    assert remaining == ["S2", "S3", "S4"]
+
+
+def test_is_fresh(tmp_path):
+    cache = PriceCache(tmp_path, FakeReader())
+    assert not cache.is_fresh("AAPL")
+    cache.read("AAPL")
+    assert cache.is_fresh("AAPL")
+    make_stale(cache, "AAPL")
+    assert not cache.is_fresh("AAPL")
+
+
+def test_read_many(tmp_path):
+    reader = FakeReader()
+    cache = PriceCache(tmp_path, reader)
+    cache.read("AAPL")
+
+    def fetch(symbol: str, start=None) -> pd.DataFrame:
+        if symbol == "BAD":
+            raise ValueError("unknown symbol")
+        return reader(symbol, start)
+
+    cache.fetch = fetch
+    results = dict(cache.read_many(["AAPL", "MSFT", "BAD", "GOOG"], max_concurrent=2))
+    assert sorted(results) == ["AAPL", "BAD", "GOOG", "MSFT"]
+    assert isinstance(results.pop("BAD"), ValueError)
+    assert all(len(data) == 300 for data in results.values())
+    # AAPL was already cached.
+    assert sorted(symbol for symbol, _ in reader.calls) == ["AAPL", "GOOG", "MSFT"]
+
+
+def test_clear(tmp_path):
+    cache = PriceCache(tmp_path, FakeReader())
+    cache.read("AAPL")
+    cache.clear()
+    assert not list(tmp_path.glob("*.parquet"))
+
+
+def test_read_retries_transient_failures(tmp_path):
+    reader = FakeReader()
+    reader.errors = [ConnectionError("reset"), TimeoutError("timed out")]
+    cache = PriceCache(tmp_path, reader, backoff=0)
+    pd.testing.assert_frame_equal(cache.read("AAPL"), reader.data, check_freq=False)
+    assert reader.calls == [("AAPL", None)] * 3
+
+
+def test_read_does_not_retry_other_failures(tmp_path):
+    reader = FakeReader()
+    reader.errors = [ValueError("unknown symbol"), FileNotFoundError("no file")]
+    cache = PriceCache(tmp_path, reader, backoff=0)
+    with pytest.raises(ValueError):
+        cache.read("NOPE")
+    with pytest.raises(FileNotFoundError):
+        cache.read("NOPE")
+    assert len(reader.calls) == 2
+
+
+def test_read_gives_up_after_the_retries(tmp_path):
+    reader = FakeReader()
+    reader.errors = [ConnectionError("reset")] * 3
+    cache = PriceCache(tmp_path, reader, retries=2, backoff=0)
+    with pytest.raises(ConnectionError):
+        cache.read("AAPL")
+    assert len(reader.calls) == 3
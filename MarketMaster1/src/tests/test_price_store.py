@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from marketmaster.price_cache import PriceCache
+from marketmaster.price_store import PriceHistory
+from marketmaster.price_store import PriceStore
+from tests.conftest import FakeReader
+
+
+def get_prices(length: int = 300) -> pd.DataFrame:
+    index = pd.bdate_range("2020-01-01", periods=length, name="Date")
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(size=length)) / 3
+    return pd.DataFrame(
+        {
+            "Open": close - 0.5,
+            "High": close + 1,
+            "Low": close - 1,
+            "Close": close,
+            "Adj Close": close * 0.98,
+            "Volume": np.arange(length, dtype=np.int64) * 1000,
+            "Change": np.zeros(length),
+        },
+        index=index,
+    )
+
+
+def test_price_history_is_compact():
+    data = get_prices()
+    history = PriceHistory.from_frame(data)
+    assert history.columns == ("Open", "High", "Low", "Close", "Adj Close")
+    assert history.prices.dtype == np.float32
+    assert history.prices[3].flags.c_contiguous
+    assert history.volume.dtype == np.int64
+    assert history.days.dtype == np.int32
+    assert history.days[0] == (pd.Timestamp("2020-01-01") - pd.Timestamp(0)).days
+    assert history.nbytes < data.memory_usage(index=True).sum() * 0.6
+
+
+def test_to_frame_round_trips():
+    data = get_prices()
+    frame = PriceHistory.from_frame(data).to_frame()
+    expected = data.drop(columns="Change")
+    assert frame.index.equals(expected.index)
+    assert list(frame.columns) == list(expected.columns)
+    np.testing.assert_allclose(frame, expected, rtol=1e-6)
+    # The last row, which the info panel shows, is exact.
+    pd.testing.assert_series_equal(frame.iloc[-1], expected.iloc[-1])
+
+
+def test_store_reads_each_symbol_once(tmp_path):
+    reader = FakeReader(get_prices())
+    store = PriceStore(PriceCache(tmp_path, reader))
+    assert not store.is_fresh("AAPL")
+    history = store.get("AAPL")
+    assert store.get("AAPL") is history
+    assert store.is_fresh("AAPL")
+    assert store.read("AAPL")["Close"].iloc[-1] == get_prices()["Close"].iloc[-1]
+    assert reader.calls == [("AAPL", None)]
+    assert store.size == history.nbytes
+
+
+def test_store_reads_out_of_date_prices_again(tmp_path):
+    cache = PriceCache(tmp_path, FakeReader(get_prices()))
+    store = PriceStore(cache)
+    history = store.get("AAPL")
+    cache.max_age = -1
+    assert not store.is_fresh("AAPL")
+    assert store.get("AAPL") is not history
+    assert len(store) == 1
+    assert store.size == history.nbytes
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    history_bytes = PriceHistory.from_frame(get_prices()).nbytes
+    store = PriceStore(
+        PriceCache(tmp_path, FakeReader(get_prices())), max_bytes=2 * history_bytes
+    )
+    store.get("AAPL")
+    store.get("MSFT")
+    store.get("AAPL")
+    store.get("GOOG")
+    assert "AAPL" in store and "GOOG" in store
+    assert "MSFT" not in store
+    assert store.size == 2 * history_bytes
+    store.clear()
+    assert len(store) == 0 and store.size == 0
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from marketmaster.score_cache import ScoreCache
+from marketmaster.similarity import get_scores
+from tests.conftest import get_random_walk
+
+
+def test_get_reuses_scores():
+    close = get_random_walk(500)
+    cache = ScoreCache()
+    scores = cache.get("AAPL", close, 60)
+    np.testing.assert_allclose(scores, get_scores(close, 60))
+    assert cache.get("AAPL", close, 60) is scores
+    assert not scores.flags.writeable
+
+
+def test_new_price_or_window_size_is_a_miss():
+    close = get_random_walk(500)
+    cache = ScoreCache()
+    scores = cache.get("AAPL", close[:-1], 60)
+    new_scores = cache.get("AAPL", close, 60)
+    assert new_scores is not scores
+    np.testing.assert_allclose(new_scores, get_scores(close, 60))
+    assert cache.get("AAPL", close, 61) is not new_scores
+    assert len(cache) == 2
+
+
+def test_updates_scores_of_revised_prices():
+    close = get_random_walk(600)
+    cache = ScoreCache()
+    cache.get("AAPL", close[:500], 60)
+    revised = close[:550].copy()
+    revised[-1] += 1
+    scores = cache.get("AAPL", revised, 60)
+    np.testing.assert_allclose(scores, get_scores(revised, 60))
+    # Too many new prices are computed again.
+    scores = cache.get("AAPL", close, 60)
+    np.testing.assert_allclose(scores, get_scores(close, 60))
+
+
+def test_revised_last_price_changes_the_scores():
+    close = get_random_walk(500)
+    cache = ScoreCache()
+    scores = cache.get("AAPL", close, 60).copy()
+    revised = close.copy()
+    revised[-1] += 1
+    new_scores = cache.get("AAPL", revised, 60)
+    assert not np.allclose(new_scores, scores)
+    np.testing.assert_allclose(new_scores, get_scores(revised, 60))
+
+
+def test_evicts_least_recently_used():
+    close = get_random_walk(500)
+    cache = ScoreCache()
+    cache.get("S0", close, 60)
+    cache.max_bytes = cache.size * 2
+    cache.get("S1", close, 60)
+    cache.get("S0", close, 60)
+    s0 = cache.get("S0", close, 60)
+    cache.get("S2", close, 60)
+    assert len(cache) == 2
+    assert cache.size <= cache.max_bytes
+    assert cache.get("S0", close, 60) is s0
+
+
+def test_unknown_metric():
+    with pytest.raises(ValueError):
+        ScoreCache().get("AAPL", get_random_walk(500), 60, "dtw")
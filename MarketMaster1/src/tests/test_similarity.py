@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+import pytest
+from marketmaster.similarity import cosine_similarities
+from marketmaster.similarity import find_analogs
+from marketmaster.similarity import find_best_match
+from marketmaster.similarity import find_top_matches
+from marketmaster.similarity import get_analog_paths
+from marketmaster.similarity import get_analog_returns
+from marketmaster.similarity import get_percentile_bands
+from marketmaster.similarity import get_scores
+from marketmaster.similarity import get_search_count
+from marketmaster.similarity import IncrementalScores
+from marketmaster.similarity import min_max_normalize
+from marketmaster.similarity import rolling_max
+from marketmaster.similarity import rolling_min
+from marketmaster.similarity import sliding_dot_products
+from tests.conftest import get_random_walk
+
+
+def get_loop_scores(close: pd.Series, window_size: int, prediction_days: int):
+    """The per-window loop that the similarity module replaced."""
+    base = close[-window_size:]
+    base_norm = (base - base.min()) / (base.max() - base.min())
+    moving_cnt = len(close) - window_size - prediction_days - 1
+
+    def cosine_similarity(x, y):
+        return np.dot(x, y) / (np.sqrt(np.dot(x, x)) * np.sqrt(np.dot(y, y)))
+
+    sim_list = []
+    for i in range(moving_cnt):
+        target = close[i : i + window_size]  # noqa: E203
+        target_norm = (target - target.min()) / (target.max() - target.min())
+        sim_list.append(cosine_similarity(base_norm, target_norm))
+    return pd.Series(sim_list)
+
+
+def test_min_max_normalize():
+    normalized = min_max_normalize(np.array([[2.0, 4.0, 3.0], [5.0, 1.0, 9.0]]))
+    assert np.allclose(normalized, [[0, 1, 0.5], [0.5, 0, 1]])
+
+
+@pytest.mark.parametrize(
+    "length,window_size,prediction_days", [(500, 60, 5), (2000, 63, 30)]
+)
+def test_cosine_similarities_match_loop(
+    length: int, window_size: int, prediction_days: int
+):
+    close = pd.Series(get_random_walk(length))
+    expected = get_loop_scores(close, window_size, prediction_days)
+    count = get_search_count(len(close), window_size, prediction_days)
+    scores = cosine_similarities(
+        close.to_numpy(), close.to_numpy()[-window_size:], count
+    )
+    assert np.allclose(scores, expected.to_numpy())
+
+
+@pytest.mark.parametrize("method", ["direct", "fft"])
+@pytest.mark.parametrize("seed", range(3))
+def test_find_best_match_matches_loop(seed: int, method: str):
+    close = pd.Series(get_random_walk(2000, seed))
+    expected = get_loop_scores(close, 60, 5).sort_values(ascending=False).index[0]
+    assert find_best_match(close.to_numpy(), 60, 5, method) == expected
+
+
+@pytest.mark.parametrize("prediction_days", [1, 5, 30])
+def test_sliced_scores_match_search(prediction_days: int):
+    close = get_random_walk(1000)
+    scores = get_scores(close, 60)
+    assert find_best_match(close, 60, prediction_days, scores=scores) == (
+        find_best_match(close, 60, prediction_days)
+    )
+    np.testing.assert_array_equal(
+        find_analogs(close, 60, prediction_days, 5, scores=scores),
+        find_analogs(close, 60, prediction_days, 5),
+    )
+
+
+@pytest.mark.parametrize("window_size", [1, 2, 7, 60, 250])
+def test_rolling_min_and_max(window_size: int):
+    values = get_random_walk(1001)
+    windows = np.lib.stride_tricks.sliding_window_view(values, window_size)
+    assert np.array_equal(rolling_min(values, window_size), windows.min(axis=1))
+    assert np.array_equal(rolling_max(values, window_size), windows.max(axis=1))
+
+
+def test_sliding_dot_products():
+    values = get_random_walk(500)
+    query = values[-30:]
+    windows = np.lib.stride_tricks.sliding_window_view(values, len(query))
+    assert np.allclose(sliding_dot_products(values, query), windows @ query)
+
+
+@pytest.mark.parametrize("window_size", [5, 63, 252])
+def test_fft_matches_direct(window_size: int):
+    # A long history with a large drift, like an index, is the hardest case for the
+    # cumulative sums.
+    close = get_random_walk(20_000) * 40
+    base = close[-window_size:]
+    direct = cosine_similarities(close, base, method="direct")
+    fft = cosine_similarities(close, base, method="fft")
+    assert np.allclose(fft, direct, atol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["direct", "fft"])
+def test_constant_window_is_nan(method: str):
+    close = np.concatenate([np.full(20, 7.0), get_random_walk(100)])
+    scores = cosine_similarities(close, close[-10:], method=method)
+    assert np.isnan(scores[0])
+    assert not np.isnan(scores[-1])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        cosine_similarities(get_random_walk(100), get_random_walk(10), method="slow")
+
+
+def test_get_search_count_too_short():
+    with pytest.raises(ValueError):
+        get_search_count(60, 60, 5)
+
+
+def get_greedy_top_matches(scores: np.ndarray, k: int, exclusion_zone: int):
+    """Chooses matches the slow way, by sorting every score."""
+    chosen: list[int] = []
+    for i in np.argsort(-scores, kind="stable"):
+        if len(chosen) < k and all(abs(i - j) >= exclusion_zone for j in chosen):
+            chosen.append(i)
+    return chosen
+
+
+@pytest.mark.parametrize("k,exclusion_zone", [(1, 0), (5, 1), (5, 20), (30, 60)])
+def test_find_top_matches(k: int, exclusion_zone: int):
+    rng = np.random.default_rng(1)
+    # Smooth scores make neighboring indexes compete, like real similarity scores.
+    scores = np.convolve(rng.normal(size=3000), np.ones(25), mode="same")
+    matches = find_top_matches(scores, k, exclusion_zone)
+    assert list(matches) == get_greedy_top_matches(scores, k, exclusion_zone)
+
+
+def test_find_top_matches_skips_nan():
+    scores = np.array([np.nan, 0.5, np.nan, 0.9])
+    assert list(find_top_matches(scores, 3, 0)) == [3, 1]
+
+
+def test_find_top_matches_skips_negative_infinity():
+    scores = np.array([-np.inf, 0.5, -np.inf, 0.9])
+    assert list(find_top_matches(scores, 3, 0)) == [3, 1]
+
+
+def test_find_analogs_do_not_overlap():
+    close = get_random_walk(2000)
+    window_size, prediction_days = 60, 10
+    starts = find_analogs(close, window_size, prediction_days, 10)
+    assert len(starts) == 10
+    assert np.all(starts + window_size + prediction_days <= len(close) - window_size)
+    gaps = np.abs(starts[:, np.newaxis] - starts[np.newaxis, :])
+    assert np.all(gaps[~np.eye(len(starts), dtype=bool)] >= window_size)
+
+
+def test_get_analog_paths():
+    close = get_random_walk(500)
+    starts = np.array([3, 100, 250])
+    paths = get_analog_paths(close, starts, 20, 5)
+    assert paths.shape == (3, 25)
+    assert np.allclose(paths[:, :20].min(axis=1), 0)
+    assert np.allclose(paths[:, :20].max(axis=1), 1)
+    assert np.allclose(paths[1], get_analog_paths(close, starts[1:2], 20, 5)[0])
+
+
+def test_get_analog_returns():
+    close = get_random_walk(500)
+    returns = get_analog_returns(close, np.array([3, 100]), 20, 5)
+    assert returns.shape == (2, 5)
+    np.testing.assert_allclose(returns[1], close[120:125] / close[119] - 1)
+
+
+def test_get_percentile_bands():
+    paths = np.array([[0.0, 1.0], [1.0, 3.0], [2.0, 5.0]])
+    low, median, high = get_percentile_bands(paths, (0, 50, 100))
+    assert list(low) == [0, 1]
+    assert list(median) == [1, 3]
+    assert list(high) == [2, 5]
+
+
+def test_incremental_scores_match_get_scores():
+    close = get_random_walk(800)
+    incremental = IncrementalScores(close[:500], 60)
+    np.testing.assert_allclose(incremental.scores, get_scores(close[:500], 60))
+    for length in range(501, 800):
+        scores = incremental.update(close[:length])
+    np.testing.assert_allclose(scores, get_scores(close[:799], 60))
+    assert not scores.flags.writeable
+
+
+def test_incremental_scores_replace_last_prices():
+    close = get_random_walk(600)
+    incremental = IncrementalScores(close, 60)
+    revised = close[:590].copy()
+    revised[-3:] *= 1.01
+    np.testing.assert_allclose(incremental.update(revised), get_scores(revised, 60))
+    assert len(incremental) == 590
+    scores = incremental.scores
+    assert incremental.update(revised) is scores
+
+
+def test_incremental_scores_constant_windows():
+    close = np.concatenate([np.ones(20), get_random_walk(100), np.ones(10)])
+    incremental = IncrementalScores(close[:-10], 10)
+    scores = incremental.update(close[:-1])
+    expected = get_scores(close[:-1], 10)
+    assert np.array_equal(np.isnan(scores), np.isnan(expected))
+    assert np.isnan(incremental.update(close)).all()
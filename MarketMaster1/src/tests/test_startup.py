@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+SRC_PATH = Path(__file__).parent.parent
+
+
+def test_main_window_does_not_import_graph_menu_modules():
+    script = (
+        "import sys\n"
+        "import marketmaster.main_window\n"
+        "print([m for m in ('FinanceDataReader', 'matplotlib', 'pandas', 'pyqtgraph')"
+        " if m in sys.modules])\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(SRC_PATH))
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert completed.stdout.strip() == "[]"
@@ -0,0 +1,37 @@
+from marketmaster.symbol_index import add_symbols
+from marketmaster.symbol_index import get_symbol_index
+from marketmaster.symbol_index import SymbolIndex
+
+
+def test_membership():
+    index = SymbolIndex(["AAPL", "A", "MSFT", "AAPL"])
+    assert len(index) == 3
+    assert "AAPL" in index
+    assert "A" in index
+    assert "AAP" not in index
+    assert "aapl" not in index
+
+
+def test_is_prefix():
+    index = SymbolIndex(["AAPL", "MSFT"])
+    assert index.is_prefix("")
+    assert index.is_prefix("AA")
+    assert index.is_prefix("MSFT")
+    assert not index.is_prefix("MSFTX")
+    assert not index.is_prefix("B")
+
+
+def test_get_symbol_index_is_shared():
+    index = get_symbol_index()
+    assert index is get_symbol_index()
+    assert "AAPL" in index
+    assert index.is_prefix("AAP")
+
+
+def test_add_symbols_keeps_the_bundled_symbols():
+    index = add_symbols(["SYN000", "AAPL"])
+    assert index is get_symbol_index()
+    assert "SYN000" in index
+    assert "AAPL" in index
+    assert index.is_prefix("SYN")
+    assert add_symbols(["SYN000"]) is index
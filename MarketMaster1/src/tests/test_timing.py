@@ -0,0 +1,74 @@
+import json
+import threading
+
+import pytest
+from marketmaster.timing import Tracer
+from marketmaster.timing import write_trace_on_exit
+
+
+def test_span_records_even_if_it_raises():
+    tracer = Tracer()
+    with tracer.span("prices.fetch", symbol="AAPL"):
+        pass
+    with pytest.raises(KeyError):
+        with tracer.span("forecast.search"):
+            raise KeyError
+    fetch, search = tracer.spans()
+    assert fetch.name == "prices.fetch" and fetch.args == {"symbol": "AAPL"}
+    assert 0 <= fetch.duration <= search.start - fetch.start + search.duration
+    assert fetch.thread_name == threading.current_thread().name
+
+
+def test_keeps_the_latest_spans():
+    tracer = Tracer(max_spans=3)
+    for i in range(5):
+        tracer.record(f"span{i}", i, i + 0.5)
+    assert [s.name for s in tracer.spans()] == ["span2", "span3", "span4"]
+    tracer.clear()
+    assert tracer.spans() == []
+
+
+def test_chrome_trace(tmp_path):
+    tracer = Tracer()
+    tracer.record("gui.plot", 10.0, 10.25, symbol="AAPL", start=object())
+    thread = threading.Thread(
+        target=lambda: tracer.record("forecast.load", 10.0, 10.5), name="worker"
+    )
+    thread.start()
+    thread.join()
+    path = tmp_path / "trace.json"
+    tracer.write_chrome_trace(path)
+    events = json.loads(path.read_text())["traceEvents"]
+    plot, load = (e for e in events if e["ph"] == "X")
+    assert plot["cat"] == "gui"
+    assert plot["dur"] == pytest.approx(250_000)
+    assert load["ts"] == plot["ts"]
+    assert plot["tid"] != load["tid"]
+    assert plot["args"]["symbol"] == "AAPL"
+    assert isinstance(plot["args"]["start"], str)
+    names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert names[load["tid"]] == "worker"
+
+
+def test_log(tmp_path):
+    tracer = Tracer()
+    with tracer.span("startup.init_ui"):
+        pass
+    tracer.record("forecast.total", 1.0, 1.002, symbol="MSFT")
+    path = tmp_path / "timing.jsonl"
+    tracer.write_log(path)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["name"] for r in records] == ["startup.init_ui", "forecast.total"]
+    assert records[1]["duration_ms"] == pytest.approx(2)
+    assert records[1]["symbol"] == "MSFT"
+    assert records[0]["start"] > 1e9  # a Unix time
+
+
+def test_write_trace_on_exit(tmp_path, monkeypatch):
+    path = tmp_path / "trace.json"
+    monkeypatch.delenv("MARKETMASTER_TRACE", raising=False)
+    write_trace_on_exit()
+    assert not path.exists()
+    monkeypatch.setenv("MARKETMASTER_TRACE", str(path))
+    write_trace_on_exit()
+    assert "traceEvents" in json.loads(path.read_text())
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+from marketmaster.universe import search_universe
+from tests.conftest import get_history
+
+
+@pytest.fixture
+def histories() -> dict[str, pd.Series]:
+    return {f"S{i}": get_history(1000 + 100 * i, i) for i in range(8)}
+
+
+def test_finds_planted_pattern(histories: dict[str, pd.Series]):
+    base = histories["S0"].to_numpy()[-60:]
+    planted = histories["S3"].copy()
+    planted.iloc[200:260] = base * 2 + 5  # scaling does not change the score
+    histories["S3"] = planted
+    matches = search_universe(base, histories, 5, 3, "S0", max_workers=1)
+    assert len(matches) == 3
+    assert matches[0].symbol == "S3"
+    assert matches[0].date == str(planted.index[200].date())
+    assert matches[0].score == pytest.approx(1)
+    assert matches[0].score >= matches[1].score >= matches[2].score
+
+
+def test_base_symbol_does_not_match_itself(histories: dict[str, pd.Series]):
+    base = histories["S0"].to_numpy()[-60:]
+    matches = search_universe(base, {"S0": histories["S0"]}, 5, 50, "S0", 1)
+    last_start = len(histories["S0"]) - 2 * 60 - 5
+    assert all(
+        histories["S0"].index.get_loc(pd.Timestamp(m.date)) <= last_start
+        for m in matches
+    )
+
+
+def test_process_pool_matches_one_process(histories: dict[str, pd.Series]):
+    base = histories["S5"].to_numpy()[-40:]
+    expected = search_universe(base, histories, 10, 5, "S5", max_workers=1)
+    assert search_universe(base, histories, 10, 5, "S5", max_workers=2) == expected
+
+
+def test_short_histories_are_skipped():
+    history = get_history(50, 0)
+    assert search_universe(history.to_numpy()[-40:], {"S0": history}, 20, 5) == []
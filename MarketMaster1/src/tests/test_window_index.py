@@ -0,0 +1,77 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from marketmaster.similarity import cosine_similarities
+from marketmaster.universe import search_universe
+from marketmaster.window_index import get_paa
+from marketmaster.window_index import get_segment_bounds
+from marketmaster.window_index import is_stale
+from marketmaster.window_index import WindowIndex
+from tests.conftest import get_history
+
+
+@pytest.fixture
+def histories() -> dict[str, pd.Series]:
+    return {f"S{i}": get_history(1500 + 100 * i, i) for i in range(10)}
+
+
+def test_bound_is_at_least_the_score():
+    close = get_history(3000, 0).to_numpy()
+    base = close[-63:]
+    bounds = get_segment_bounds(63, 8)
+    windows = np.lib.stride_tricks.sliding_window_view(close, 63)
+    unit_base = (base - base.min()) / np.linalg.norm(base - base.min())
+    differences = get_paa(windows, bounds) - get_paa(unit_base[np.newaxis], bounds)
+    upper_bounds = 1 - differences**2 @ np.diff(bounds) / 2
+    scores = cosine_similarities(close, base)
+    assert np.all(upper_bounds >= scores - 1e-12)
+
+
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_search_matches_brute_force(tmp_path, histories, k: int):
+    index = WindowIndex.build(tmp_path, histories)
+    base = histories["S2"].to_numpy()[-63:]
+    matches = index.search(base, 10, k, "S2")
+    expected = search_universe(base, histories, 10, k, "S2", max_workers=1)
+    assert [(m.symbol, m.date) for m in matches] == [
+        (m.symbol, m.date) for m in expected
+    ]
+    np.testing.assert_allclose(
+        [m.score for m in matches], [m.score for m in expected], atol=1e-5
+    )
+    assert index.exact_count < len(index.paa) / 2
+
+
+def test_reopened_index(tmp_path, histories):
+    WindowIndex.build(tmp_path, histories, window_size=30, segment_count=5)
+    index = WindowIndex(tmp_path)
+    assert index.window_size == 30
+    assert index.symbols == list(histories)
+    assert index.prices[0] == np.float32(histories["S0"].iloc[0])
+    assert len(index.search(histories["S0"].to_numpy(), 5, 3)) == 3
+
+
+def test_short_histories_are_left_out(tmp_path, histories):
+    histories["short"] = get_history(40, 0)
+    index = WindowIndex.build(tmp_path, histories)
+    assert "short" not in index.symbols
+
+
+def test_mismatched_files(tmp_path, histories):
+    WindowIndex.build(tmp_path, histories)
+    with open(tmp_path / "paa.f32", "ab") as file:
+        file.write(b"\0" * 4)
+    with pytest.raises(ValueError):
+        WindowIndex(tmp_path)
+
+
+def test_is_stale(tmp_path, histories):
+    assert is_stale(tmp_path)
+    WindowIndex.build(tmp_path, histories)
+    assert not is_stale(tmp_path)
+    old = time.time() - 2 * 24 * 60 * 60
+    os.utime(tmp_path / "meta.json", (old, old))
+    assert is_stale(tmp_path)
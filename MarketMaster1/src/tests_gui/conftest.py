@@ -0,0 +1,35 @@
+"""Fakes shared by the GUI tests."""
+
+from typing import Generator
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from marketmaster.downloader import map_unordered
+
+
+class FakePriceCache:
+    """Serves the same 1000 business days of prices up to today for every symbol
+    except "BAD", and records each symbol read.
+
+    ``read_many`` works like the price cache's.
+    """
+
+    def __init__(self):
+        self.reads: list[str] = []
+
+    def read(self, symbol: str) -> pd.DataFrame:
+        self.reads.append(symbol)
+        if symbol == "BAD":
+            raise ValueError("no prices")
+        index = pd.bdate_range(end=pd.Timestamp.today(), periods=1000, name="Date")
+        close = np.linspace(1, 2, len(index)) + np.sin(np.arange(len(index)))
+        return pd.DataFrame(
+            {"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1},
+            index=index,
+        )
+
+    def read_many(
+        self, symbols: Iterable[str], max_concurrent: int = 8
+    ) -> Generator[tuple[str, pd.DataFrame | Exception], None, None]:
+        return map_unordered(self.read, symbols, max_concurrent)
@@ -0,0 +1,51 @@
+import numpy as np
+from marketmaster.forecast import Forecast
+from marketmaster.forecast_plot import DateAxisItem
+from marketmaster.forecast_plot import ForecastPlot
+from pytestqt import qtbot  # noqa: F401
+
+
+def make_forecast(symbol: str, analog_count: int = 1) -> Forecast:
+    actual = np.linspace(0, 1, 60)
+    predicted = np.linspace(0, 1, 65)
+    low = high = None
+    if analog_count > 1:
+        low, high = predicted - 0.1, predicted + 0.1
+    return Forecast(
+        symbol=symbol,
+        prediction_days=5,
+        dates=[str(d) for d in np.busday_offset("2023-01-02", np.arange(60))],
+        actual=actual,
+        predicted=predicted,
+        low=low,
+        high=high,
+        analog_count=analog_count,
+        latest=None,  # type: ignore
+        predicted_returns=np.zeros(5),
+    )
+
+
+def test_show_forecast_updates_items_in_place(qtbot):  # noqa: F811
+    plot = ForecastPlot()
+    qtbot.addWidget(plot)
+    items = list(plot.plot_item.items)
+    plot.show_forecast(make_forecast("AAPL", analog_count=5))
+    assert plot.band.isVisible()
+    plot.show_forecast(make_forecast("MSFT"))
+    assert list(plot.plot_item.items) == items
+    assert not plot.band.isVisible()
+    assert plot.today_line.value() == 59
+    assert len(plot.predicted_curve.getData()[1]) == 65
+
+
+def test_date_axis_labels_trading_days():
+    axis = DateAxisItem()
+    axis.set_dates(["2023-01-05", "2023-01-06"], 4)
+    assert axis.tickStrings([0, 1, 2, 3, 2.5, 9], 1, 1) == [
+        "2023-01-05",
+        "2023-01-06",
+        "2023-01-09",
+        "2023-01-10",
+        "",
+        "",
+    ]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from marketmaster.history_plot import HistoryPlot
+from marketmaster.history_plot import TimestampAxisItem
+from pytestqt import qtbot  # noqa: F401
+
+
+def get_history(length: int) -> pd.Series:
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2000-01-03", periods=length, freq="min")
+    return pd.Series(100 + np.cumsum(rng.normal(size=length)), index=index)
+
+
+def test_redraws_only_the_visible_range(qtbot):  # noqa: F811
+    plot = HistoryPlot(method="lttb")
+    qtbot.addWidget(plot)
+    plot.resize(800, 400)
+    plot.show()
+    qtbot.waitExposed(plot)
+    history = get_history(2_000_000)
+    plot.set_history("AAPL", history)
+    positions, _ = plot.curve.getData()
+    assert len(positions) <= 2 * plot.plot_item.vb.width()
+    assert positions[-1] == len(history) - 1
+
+    plot.plot_item.setXRange(1_000_000, 1_000_100, padding=0)
+    qtbot.waitUntil(lambda: plot.curve.getData()[0][0] > 900_000)
+    positions, values = plot.curve.getData()
+    # Zoomed in, every price in and around the visible range is drawn.
+    assert list(positions) == list(range(positions[0], positions[-1] + 1))
+    assert positions[0] <= 1_000_000 and positions[-1] >= 1_000_100
+    np.testing.assert_array_equal(values, history.to_numpy()[positions])
+
+
+def test_timestamp_axis_labels():
+    axis = TimestampAxisItem()
+    axis.set_timestamps(pd.bdate_range("2023-01-05", periods=3).to_numpy())
+    assert axis.tickStrings([0, 2, 2.5, 3], 1, 1) == [
+        "2023-01-05",
+        "2023-01-09",
+        "",
+        "",
+    ]
+    axis.set_timestamps(get_history(3).index.to_numpy())
+    assert axis.tickStrings([1], 1, 1) == ["2000-01-03 00:01"]
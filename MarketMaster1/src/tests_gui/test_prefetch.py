@@ -0,0 +1,86 @@
+import threading
+
+from marketmaster.forecast import compute_forecast
+from marketmaster.prefetch import BOOKMARK_PRIORITY
+from marketmaster.prefetch import HISTORY_PRIORITY
+from marketmaster.prefetch import Prefetcher
+from marketmaster.score_cache import ScoreCache
+from pytestqt import qtbot  # noqa: F401
+from tests_gui.conftest import FakePriceCache
+
+
+class SlowPriceCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reads: list[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    def is_fresh(self, symbol: str) -> bool:
+        return symbol == "FRESH"
+
+    def read(self, symbol: str) -> None:
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        threading.Event().wait(0.02)
+        with self.lock:
+            self.running -= 1
+            self.reads.append(symbol)
+
+
+def test_prefetcher_limits_concurrency(qtbot):  # noqa: F811
+    cache = SlowPriceCache()
+    prefetcher = Prefetcher(cache, max_concurrent=2, idle_delay=0)
+    symbols = ["A", "B", "C", "D", "E", "FRESH"]
+    prefetcher.prefetch(symbols, HISTORY_PRIORITY)
+    with qtbot.waitSignals([prefetcher.prefetched] * len(symbols), timeout=5000):
+        pass
+    assert sorted(cache.reads) == ["A", "B", "C", "D", "E"]
+    assert cache.max_running <= 2
+
+
+def test_prefetcher_waits_while_paused(qtbot):  # noqa: F811
+    cache = SlowPriceCache()
+    prefetcher = Prefetcher(cache, max_concurrent=1, idle_delay=0)
+    token = prefetcher.pause()
+    prefetcher.prefetch(["A", "B"], HISTORY_PRIORITY)
+    prefetcher.prefetch(["C"], BOOKMARK_PRIORITY)
+    with qtbot.assertNotEmitted(prefetcher.prefetched, wait=100):
+        pass
+    prefetcher.resume(prefetcher.pause("A"))
+    prefetcher.resume(token)
+    with qtbot.waitSignals([prefetcher.prefetched] * 2, timeout=5000):
+        pass
+    assert cache.reads == ["C", "B"]
+
+
+def test_prefetcher_waits_for_every_pause(qtbot):  # noqa: F811
+    cache = SlowPriceCache()
+    prefetcher = Prefetcher(cache, idle_delay=0)
+    forecast = prefetcher.pause()
+    universe = prefetcher.pause()
+    prefetcher.prefetch(["A"], HISTORY_PRIORITY)
+    prefetcher.resume(forecast)
+    # Releasing a token twice does not release the other job's pause.
+    prefetcher.resume(forecast)
+    with qtbot.assertNotEmitted(prefetcher.prefetched, wait=100):
+        pass
+    prefetcher.resume(universe)
+    with qtbot.waitSignal(prefetcher.prefetched, timeout=5000):
+        pass
+    assert cache.reads == ["A"]
+
+
+def test_prefetcher_computes_scores(qtbot):  # noqa: F811
+    cache = FakePriceCache()
+    score_cache = ScoreCache()
+    prefetcher = Prefetcher(cache, idle_delay=0, score_cache=score_cache)
+    with qtbot.waitSignal(prefetcher.prefetched, timeout=5000):
+        prefetcher.prefetch(["A"], HISTORY_PRIORITY)
+    assert len(score_cache) == 1
+    size = score_cache.size
+    # Opening the prefetched symbol reuses its scores instead of adding new ones.
+    compute_forecast("A", cache.read("A"), 5, score_cache=score_cache)
+    assert len(score_cache) == 1
+    assert score_cache.size == size
@@ -1,11 +1,18 @@
 import pytest
 from marketmaster.main_window import MainWindow
+from marketmaster.symbol_index import get_symbol_index
+from marketmaster.symbol_line_edit import get_completer_model
 from PySide6 import QtCore
 from pytestqt import qtbot  # noqa: F401
 
 # pip install pytest-qt==4.2.0
 
 
+def wait_for_workers() -> None:
+    """Lets the graph menu's workers finish before its window is deleted."""
+    QtCore.QThreadPool.globalInstance().waitForDone()
+
+
 @pytest.mark.filterwarnings("ignore::DeprecationWarning")  # from Matplotlib
 def test_show_graph_menu(qtbot):  # noqa: F811
     main_window = MainWindow()
@@ -14,6 +21,7 @@ def test_show_graph_menu(qtbot):  # noqa: F811
     main_window.start_menu.symbol_line_edit.setText("AAPL")
     main_window.start_menu.show_graph_menu()
     assert main_window.graph_menu.isVisible() is True
+    wait_for_workers()
 
 
 @pytest.mark.filterwarnings("ignore::DeprecationWarning")  # from Matplotlib
@@ -24,6 +32,7 @@ def test_symbol_enter_press(qtbot):  # noqa: F811
     qtbot.keyClicks(main_window.start_menu.symbol_line_edit, "AAPL")
     qtbot.keyPress(main_window.start_menu.symbol_line_edit, QtCore.Qt.Key_Enter)
     assert main_window.graph_menu.isVisible() is True
+    wait_for_workers()
 
 
 def test_symbol_button_press(qtbot):  # noqa: F811
@@ -33,3 +42,33 @@ def test_symbol_button_press(qtbot):  # noqa: F811
     qtbot.keyClicks(main_window.start_menu.symbol_line_edit, "AAPL")
     qtbot.mouseClick(main_window.start_menu.submit_symbol_button, QtCore.Qt.LeftButton)
     assert main_window.graph_menu.isVisible() is True
+    wait_for_workers()
+
+
+def test_enter_on_invalid_symbol_shows_error(qtbot):  # noqa: F811
+    main_window = MainWindow()
+    main_window.show()
+    qtbot.addWidget(main_window)
+    start_menu = main_window.start_menu
+    # "MM" may still become a symbol, so the validator does not accept it.
+    qtbot.keyClicks(start_menu.symbol_line_edit, "MM")
+    assert not start_menu.symbol_line_edit.hasAcceptableInput()
+    qtbot.keyPress(start_menu.symbol_line_edit, QtCore.Qt.Key_Return)
+    assert start_menu.invalid_input_label.isVisible()
+    assert main_window.graph_menu is None or not main_window.graph_menu.isVisible()
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")  # from Matplotlib
+def test_open_synthetic_symbol(qtbot, monkeypatch):  # noqa: F811
+    monkeypatch.setenv("MARKETMASTER_DATA_PROVIDER", "synthetic")
+    main_window = MainWindow()
+    main_window.show()
+    qtbot.addWidget(main_window)
+    # The provider's listing is loaded in the background after the start menu shows.
+    qtbot.waitUntil(lambda: "SYN123" in get_symbol_index(), timeout=30000)
+    assert "SYN123" in get_completer_model().stringList()
+    qtbot.keyClicks(main_window.start_menu.symbol_line_edit, "syn123")
+    qtbot.keyPress(main_window.start_menu.symbol_line_edit, QtCore.Qt.Key_Enter)
+    assert main_window.graph_menu.isVisible() is True
+    assert main_window.graph_menu.info_panel.symbol_line_edit.text() == "SYN123"
+    wait_for_workers()
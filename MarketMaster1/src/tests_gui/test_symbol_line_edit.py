@@ -0,0 +1,23 @@
+from marketmaster.symbol_index import SymbolIndex
+from marketmaster.symbol_line_edit import SymbolLineEdit
+from marketmaster.symbol_line_edit import SymbolValidator
+from PySide6 import QtGui
+from pytestqt import qtbot  # noqa: F401
+
+
+def test_validator():
+    validator = SymbolValidator(SymbolIndex(["AAPL", "A"]))
+    assert validator.validate("aapl", 4) == (QtGui.QValidator.Acceptable, "AAPL", 4)
+    assert validator.validate("aa", 2) == (QtGui.QValidator.Intermediate, "AA", 2)
+    assert validator.validate("B", 1)[0] == QtGui.QValidator.Invalid
+
+
+def test_typing_is_uppercase_and_rejects_invalid_suffixes(qtbot):  # noqa: F811
+    line_edit = SymbolLineEdit()
+    qtbot.addWidget(line_edit)
+    changes: list[str] = []
+    line_edit.textChanged.connect(changes.append)
+    qtbot.keyClicks(line_edit, "aaplx")
+    assert line_edit.text() == "AAPL"
+    assert line_edit.has_valid_input()
+    assert changes == ["A", "AA", "AAP", "AAPL"]
@@ -0,0 +1,23 @@
+from marketmaster.timing import Tracer
+from marketmaster.timing_overlay import TimingOverlay
+from PySide6 import QtWidgets
+from pytestqt import qtbot  # noqa: F401
+
+
+def test_overlay_lists_newest_spans_first(qtbot):  # noqa: F811
+    window = QtWidgets.QWidget()
+    qtbot.addWidget(window)
+    window.resize(800, 600)
+    tracer = Tracer()
+    overlay = TimingOverlay(window, tracer, span_count=2, refresh_interval=10)
+    assert overlay.label.text() == "No timing spans yet"
+    window.show()
+    tracer.record("prices.fetch", 0.0, 1.5, symbol="AAPL")
+    tracer.record("forecast.search", 1.5, 1.75)
+    tracer.record("gui.plot", 1.75, 1.8)
+    qtbot.waitUntil(lambda: "gui.plot" in overlay.label.text())
+    lines = overlay.label.text().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("gui.plot") and "50.0 ms" in lines[0]
+    assert lines[1].startswith("forecast.search")
+    assert overlay.geometry().right() < window.width()
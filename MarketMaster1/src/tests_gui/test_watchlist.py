@@ -0,0 +1,81 @@
+import numpy as np
+from marketmaster.watchlist import WatchlistModel
+from marketmaster.workers import WatchlistWorker
+from PySide6 import QtCore
+from tests_gui.conftest import FakePriceCache
+from pytestqt import qtbot  # noqa: F401
+
+
+def get_prices(*closes: float) -> np.ndarray:
+    return np.array([[c, c + 1, c - 1, c, 1_500_000] for c in closes], dtype=float)
+
+
+def get_column(model: WatchlistModel, column: int) -> list:
+    return [model.index(row, column).data() for row in range(model.rowCount())]
+
+
+def test_update_rows_formats_in_bulk(qtbot):  # noqa: F811
+    model = WatchlistModel()
+    model.set_symbols(["AAPL", "MSFT", "GOOG", "AAPL"])
+    assert model.rowCount() == 3
+    model.update_rows(
+        ["GOOG", "AAPL", "NOPE"],
+        get_prices(1.445, 2500, 7),
+        [-0.0123, 0.05, 0.1],
+        ["", None, None],
+    )
+    assert get_column(model, 4) == ["2.50k", "", "1.45"]
+    assert get_column(model, 5) == ["1.50M", "", "1.50M"]
+    assert get_column(model, 6) == ["▲ 5.00%", "", "▼ 1.23%"]
+    assert model.index(0, 6).data(QtCore.Qt.ForegroundRole).name() == "#2ca02c"
+
+
+def test_changed_rows_are_announced_together(qtbot):  # noqa: F811
+    model = WatchlistModel(flush_interval=50)
+    model.set_symbols([f"S{i}" for i in range(100)])
+    ranges = []
+    model.dataChanged.connect(
+        lambda top_left, bottom_right: ranges.append(
+            (top_left.row(), bottom_right.row())
+        )
+    )
+    for symbols in (["S3", "S4"], ["S5"], ["S50"], ["S9"]):
+        model.update_rows(symbols, get_prices(*range(len(symbols))), [0] * len(symbols))
+    assert ranges == []
+    qtbot.waitUntil(lambda: len(ranges) == 3)
+    assert ranges == [(3, 5), (9, 9), (50, 50)]
+
+
+def test_sort_puts_missing_values_last(qtbot):  # noqa: F811
+    model = WatchlistModel()
+    model.set_symbols(["A", "B", "C", "D"])
+    model.update_rows(["A", "B", "C"], get_prices(3, 1, 2), [0.1, -0.2, 0.3])
+    persistent = QtCore.QPersistentModelIndex(model.index(0, 0))  # A
+    model.sort(4, QtCore.Qt.DescendingOrder)
+    assert get_column(model, 0) == ["A", "C", "B", "D"]
+    model.sort(6, QtCore.Qt.AscendingOrder)
+    assert get_column(model, 0) == ["B", "A", "C", "D"]
+    assert persistent.row() == 1
+    model.sort(0, QtCore.Qt.DescendingOrder)
+    assert get_column(model, 0) == ["D", "C", "B", "A"]
+    # Updates still reach the right rows after sorting.
+    model.update_rows(["D"], get_prices(9), [0])
+    assert model.index(0, 4).data() == "9"
+
+
+def test_watchlist_worker_emits_rows(qtbot):  # noqa: F811
+    symbols = ["AAPL", "BAD", "MSFT"]
+    worker = WatchlistWorker(4, symbols, 5, 1, FakePriceCache(), batch_interval=0)
+    batches = []
+    worker.signals.rows.connect(lambda job_id, rows: batches.append(rows))
+    with qtbot.waitSignal(worker.signals.finished, timeout=10000) as blocker:
+        QtCore.QThreadPool.globalInstance().start(worker)
+    assert blocker.args == [4, 3]
+    qtbot.waitUntil(lambda: sum(len(batch[0]) for batch in batches) == 3)
+    model = WatchlistModel()
+    model.set_symbols(symbols)
+    for batch in batches:
+        model.update_rows(*batch)
+    assert model.index(1, 1).data() == ""
+    assert model.index(1, 0).data(QtCore.Qt.ToolTipRole) == "no prices"
+    assert not np.isnan(model.returns[[0, 2]]).any()
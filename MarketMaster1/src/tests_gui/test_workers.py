@@ -0,0 +1,49 @@
+from marketmaster.workers import ForecastWorker
+from marketmaster.workers import UniverseWorker
+from PySide6 import QtCore
+from pytestqt import qtbot  # noqa: F401
+from tests_gui.conftest import FakePriceCache
+
+
+def test_forecast_worker_finishes(qtbot):  # noqa: F811
+    worker = ForecastWorker(7, "AAPL", 5, 1, FakePriceCache())
+    with qtbot.waitSignal(worker.signals.finished) as blocker:
+        QtCore.QThreadPool.globalInstance().start(worker)
+    job_id, forecast = blocker.args
+    assert job_id == 7
+    assert forecast.symbol == "AAPL"
+
+
+def test_canceled_forecast_worker_emits_nothing(qtbot):  # noqa: F811
+    cache = FakePriceCache()
+    worker = ForecastWorker(1, "AAPL", 5, 1, cache)
+    worker.cancel()
+    with qtbot.assertNotEmitted(worker.signals.finished, wait=200):
+        with qtbot.assertNotEmitted(worker.signals.progress, wait=200):
+            worker.run()
+    assert cache.reads == []
+
+
+def test_universe_worker_finishes(qtbot):  # noqa: F811
+    cache = FakePriceCache()
+    worker = UniverseWorker(3, "AAPL", ["AAPL", "MSFT", "GOOG"], 5, 4, cache)
+    with qtbot.waitSignal(worker.signals.finished, timeout=10000) as blocker:
+        QtCore.QThreadPool.globalInstance().start(worker)
+    job_id, matches = blocker.args
+    assert job_id == 3
+    assert len(matches) == 4
+    assert sorted(cache.reads) == ["AAPL", "AAPL", "GOOG", "MSFT"]
+
+
+def test_universe_worker_uses_the_index_it_built(qtbot, tmp_path):  # noqa: F811
+    cache = FakePriceCache()
+    for job_id in (1, 2):
+        worker = UniverseWorker(
+            job_id, "AAPL", ["AAPL", "MSFT", "GOOG"], 5, 2, cache, tmp_path
+        )
+        with qtbot.waitSignal(worker.signals.finished, timeout=10000) as blocker:
+            QtCore.QThreadPool.globalInstance().start(worker)
+        assert len(blocker.args[1]) == 2
+        qtbot.waitUntil(lambda: (tmp_path / "meta.json").exists())
+    # The second search only read the base's prices.
+    assert len(cache.reads) == 5